@@ -1,5 +1,16 @@
-import climate_risk_calc.tools.graph_designer
-from climate_risk_calc import controller
+import sys
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # headless commands, must not import the GUI
+        from climate_risk_calc import cli
+
+        sys.exit(cli.main(sys.argv[1:]))
+
+    # imported first, startup timings are measured from here
+    from climate_risk_calc.tools import timing
+
+    with timing.timed("Import GUI"):
+        from climate_risk_calc import controller
+
     controller.start_view()
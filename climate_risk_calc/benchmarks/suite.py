@@ -0,0 +1,221 @@
+"""
+Benchmark suite of the LIMITS connection and the calculator on synthetic data, e.g.
+
+    python -m climate_risk_calc benchmark --loans 1000 100000 1000000
+    python -m climate_risk_calc benchmark --save-baseline
+
+Results are written as JSON and compared against the stored baseline, timings that got slower
+than the tolerance are reported as regressions. Timings are only comparable on the machine and
+with the library versions the baseline was recorded with (see COMPARED_ENVIRONMENT), in any
+other environment the comparison is skipped. Regenerate the baseline there first with
+--save-baseline, then compare the changed code against it.
+"""
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from climate_risk_calc.benchmarks import synthetic
+from climate_risk_calc.connections import registry
+from climate_risk_calc.connections.limits_connection import LimitsConnection
+from climate_risk_calc.tools import calculator
+from climate_risk_calc.tools.shock_cube import ShockCube
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+# relative slowdown reported as regression
+TOLERANCE = 0.25
+# absolute slowdown in seconds below which differences are treated as noise
+MIN_DIFFERENCE = 0.005
+# entries of the environment that must match the baseline for the timings to be comparable
+COMPARED_ENVIRONMENT = ["python", "numpy", "pandas", "machine", "processor", "cpus"]
+
+
+def measure(func, repeat):
+    """
+    Args:
+        func: function without arguments to time
+        repeat: number of runs
+    Returns: dict with the "best" and "median" run time in seconds and all "runs"
+    """
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return {"best": min(runs), "median": statistics.median(runs), "runs": runs}
+
+
+def _connection_class(work_dir):
+    # LimitsConnection reading the synthetic data instead of LIMITS.csv
+    return type(
+        "SyntheticLimitsConnection",
+        (LimitsConnection,),
+        {
+            "source_file": os.path.join(work_dir, "scenarios.csv"),
+            "cache_dir": os.path.join(work_dir, ".cache", "limits"),
+        },
+    )
+
+
+def run(config, work_dir=None, repeat=3):
+    """
+    Generates the synthetic data and times every benchmark
+    Args:
+        config: dict with the numbers of "models", "scenarios", "regions", "sectors", "years"
+            of the scenario data, list of portfolio sizes "loans" and the evaluated "year"
+        work_dir: directory of the generated files, a temporary directory that is removed
+            afterwards if None
+        repeat: number of runs of every benchmark
+    Returns: dict with "config", "environment", "results" (name -> timings) and "memory"
+        (bytes held by the LIMITS connection and the shock cube)
+    """
+    if work_dir is None:
+        with tempfile.TemporaryDirectory(prefix="climate_risk_benchmark_") as temp_dir:
+            return run(config, temp_dir, repeat)
+    os.makedirs(work_dir, exist_ok=True)
+    labels = synthetic.get_labels(
+        n_models=config["models"],
+        n_scenarios=config["scenarios"],
+        n_regions=config["regions"],
+        n_sectors=config["sectors"],
+        n_years=config["years"],
+    )
+    connection_class = _connection_class(work_dir)
+    rows = synthetic.write_scenario_data(connection_class.source_file, labels)
+    print("[INFO] Generated " + str(rows) + " time series in " + work_dir)
+
+    results = {}
+
+    def add(name, func):
+        results[name] = measure(func, repeat)
+        print("[INFO] {}: {:.1f} ms".format(name, results[name]["best"] * 1000))
+
+    add("limits_load_csv", lambda: connection_class(use_cache=False))
+    # first load writes the columnar cache
+    connection_class()
+    add("limits_load_cached", lambda: connection_class())
+    connection = connection_class()
+    registry.use_limits_connection(connection)
+
+    model = labels["models"][0]
+    base_scenario, ref_scenario = labels["scenarios"][0], labels["scenarios"][-1]
+    sector = labels["sectors"][0]
+    variables = [synthetic.BASE_SECTOR, sector]
+    scenarios = base_scenario + "," + ref_scenario
+    add(
+        "execute_query",
+        lambda: connection.execute_query(model, scenarios, "all", variables),
+    )
+    data = connection.execute_query(model, scenarios, "all", variables)
+    base_data = data.filter(scenario=base_scenario)
+    add("get_market_shares", lambda: calculator.get_market_shares(base_data))
+    add("get_market_share_shocks", lambda: calculator.get_market_share_shocks(data))
+    add("build_shock_cube", lambda: ShockCube(connection))
+
+    for n_loans in config["loans"]:
+        file_name = os.path.join(work_dir, "loans_" + str(n_loans) + ".csv")
+        synthetic.write_loans(file_name, n_loans, labels)
+        add(
+            "get_shocks[" + str(n_loans) + "]",
+            lambda: calculator.get_shocks(
+                model, ref_scenario, config["year"], file_name, recovery_rate=0.4
+            ),
+        )
+        add(
+            "get_top_shocks[" + str(n_loans) + "]",
+            lambda: calculator.get_top_shocks(
+                config["year"],
+                file_name,
+                recovery_rate=0.4,
+                scenarios=labels["scenarios"][1:],
+                models=labels["models"],
+            ),
+        )
+
+    memory = {
+        name: usage.get("total", usage)
+        for name, usage in registry.memory_usage().items()
+    }
+    registry.reset()
+    return {
+        "config": config,
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+        "memory": memory,
+    }
+
+
+def environment_differences(report, baseline):
+    """
+    Args:
+        report: result of run()
+        baseline: stored result of run()
+    Returns: list of (entry, baseline value, current value) of the entries of
+        COMPARED_ENVIRONMENT that differ
+    """
+    before = baseline.get("environment", {})
+    after = report["environment"]
+    return [
+        (key, before.get(key), after.get(key))
+        for key in COMPARED_ENVIRONMENT
+        if before.get(key) != after.get(key)
+    ]
+
+
+def compare(report, baseline, tolerance=TOLERANCE, min_difference=MIN_DIFFERENCE):
+    """
+    Args:
+        report: result of run()
+        baseline: stored result of run()
+        tolerance: relative slowdown of the best run time reported as regression
+        min_difference: absolute slowdown in seconds below which differences are ignored
+    Returns: list of (name, baseline seconds, current seconds) of the regressions, None if
+        the configuration or the environment differ from the baseline and the timings were
+        not compared
+    """
+    comparable = True
+    if report["config"] != baseline["config"]:
+        print("[WARNING] Benchmark configuration differs from the baseline")
+        comparable = False
+    for key, before, after in environment_differences(report, baseline):
+        print(
+            "[WARNING] Baseline was recorded with {} {}, now {}".format(key, before, after)
+        )
+        comparable = False
+    if not comparable:
+        print(
+            "[WARNING] Comparison skipped, record a baseline in this environment with "
+            "--save-baseline"
+        )
+        return None
+    regressions = []
+    for name, timings in report["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before = baseline["results"][name]["best"]
+        after = timings["best"]
+        if after > before * (1 + tolerance) and after - before > min_difference:
+            regressions.append((name, before, after))
+    return regressions
+
+
+def save(report, file_name):
+    with open(file_name, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+
+
+def load(file_name):
+    with open(file_name, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,140 @@
+"""
+Generators of synthetic IAMC-formatted scenario data and credit portfolios in the layout of
+LIMITS.csv and the portfolio CSV-files, so that the calculator can be benchmarked at any scale
+"""
+import numpy as np
+import pandas as pd
+
+from climate_risk_calc.tools import calculator
+
+YEARS = [
+    2005,
+    2010,
+    2015,
+    2020,
+    2025,
+    2030,
+    2035,
+    2040,
+    2045,
+    2050,
+    2060,
+    2070,
+    2080,
+    2090,
+    2100,
+]
+BASE_SECTOR = "Secondary Energy|Electricity"
+TECHNOLOGIES = [
+    "Biomass",
+    "Coal",
+    "Gas",
+    "Geothermal",
+    "Hydro",
+    "Nuclear",
+    "Oil",
+    "Solar",
+    "Wind",
+]
+REGIONS = [
+    "AFRICA",
+    "CHINA+",
+    "EUROPE",
+    "INDIA+",
+    "LATIN_AM",
+    "MIDDLE_EAST",
+    "NORTH_AM",
+    "PAC_OECD",
+    "REF_ECON",
+    "REST_ASIA",
+]
+# number of loans written at once
+CHUNKSIZE = 1000000
+
+
+def _labels(known, count, prefix):
+    # the known labels first, so that the default top shock grid exists in the data
+    labels = list(known[:count])
+    labels.extend(prefix + str(i) for i in range(len(labels) + 1, count + 1))
+    return labels
+
+
+def get_labels(n_models=2, n_scenarios=5, n_regions=10, n_sectors=9, n_years=15):
+    """
+    Args:
+        n_models: number of models, the first are the models of the default top shock grid
+        n_scenarios: number of scenarios including the base scenario "LIMITS-Base"
+        n_regions: number of regions
+        n_sectors: number of sectors below the base sector "Secondary Energy|Electricity"
+        n_years: number of years, at most 15
+    Returns: dict with the lists of "models", "scenarios", "regions", "sectors" and "years"
+    """
+    return {
+        "models": _labels(calculator.TOP_SHOCK_MODELS, n_models, "MODEL-"),
+        "scenarios": _labels(
+            ["LIMITS-Base"] + calculator.TOP_SHOCK_SCENARIOS, n_scenarios, "SCENARIO-"
+        ),
+        "regions": _labels(REGIONS, n_regions, "REGION-"),
+        "sectors": [
+            BASE_SECTOR + "|" + t
+            for t in _labels(TECHNOLOGIES, n_sectors, "Technology ")
+        ],
+        "years": YEARS[:n_years],
+    }
+
+
+def write_scenario_data(file_name, labels, seed=0):
+    """
+    Writes one time series per model, scenario, region and variable, the base sector is the
+    sum of its sectors plus some unassigned production so that market shares stay below 100 %
+    Args:
+        file_name: path of the IAMC-formatted CSV-file to write
+        labels: dict as returned by get_labels()
+        seed: seed of the random values
+    Returns: number of written rows
+    """
+    rng = np.random.default_rng(seed)
+    sectors = labels["sectors"]
+    n_years = len(labels["years"])
+    index = pd.MultiIndex.from_product(
+        [labels["models"], labels["scenarios"], labels["regions"]],
+        names=["MODEL", "SCENARIO", "REGION"],
+    )
+    n_runs = len(index)
+    production = rng.uniform(1, 100, size=(n_runs, len(sectors), n_years))
+    total = production.sum(axis=1) * rng.uniform(1.05, 1.5, size=(n_runs, 1))
+    values = np.concatenate([total[:, np.newaxis, :], production], axis=1)
+
+    variables = [BASE_SECTOR] + sectors
+    frame = index.to_frame(index=False).loc[np.repeat(np.arange(n_runs), len(variables))]
+    frame["VARIABLE"] = np.tile(variables, n_runs)
+    frame["UNIT"] = "EJ/yr"
+    frame = frame.reset_index(drop=True)
+    years = pd.DataFrame(
+        values.reshape(-1, n_years).round(4), columns=[str(y) for y in labels["years"]]
+    )
+    pd.concat([frame, years], axis=1).to_csv(file_name, index=False, encoding="cp1252")
+    return len(frame)
+
+
+def write_loans(file_name, n_loans, labels, seed=0):
+    """
+    Writes a credit portfolio with columns region, sector and amount
+    Args:
+        file_name: path of the portfolio CSV-file to write
+        n_loans: number of loans (at least 1), written in chunks of CHUNKSIZE
+        labels: dict as returned by get_labels(), regions and sectors of the loans
+        seed: seed of the random loans
+    """
+    rng = np.random.default_rng(seed)
+    regions = np.asarray(labels["regions"], dtype=object)
+    sectors = np.asarray(labels["sectors"], dtype=object)
+    for start in range(0, n_loans, CHUNKSIZE):
+        n = min(CHUNKSIZE, n_loans - start)
+        pd.DataFrame(
+            {
+                "region": regions[rng.integers(len(regions), size=n)],
+                "sector": sectors[rng.integers(len(sectors), size=n)],
+                "amount": rng.integers(1000, 1000000, size=n),
+            }
+        ).to_csv(file_name, mode="w" if start == 0 else "a", header=start == 0, index=False)
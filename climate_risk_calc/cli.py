@@ -0,0 +1,365 @@
+"""
+Headless command line interface, e.g.
+
+    python -m climate_risk_calc evaluate loans.csv --model GCAM --scenario LIMITS-StrPol-450
+    python -m climate_risk_calc evaluate q1.csv q2.csv --top --format json
+    python -m climate_risk_calc evaluate q1.csv q2.csv q3.csv q4.csv --top --processes 4
+    python -m climate_risk_calc sync
+    python -m climate_risk_calc benchmark --loans 1000 100000
+    python -m climate_risk_calc --spans spans.json --flamegraph stacks.txt evaluate ...
+
+Only imports the calculator and connections, so it neither needs a display nor tkinter or
+matplotlib.
+"""
+import argparse
+import json
+import os
+import sys
+
+from climate_risk_calc.tools import calculator, timing
+
+
+def _output_path(output_dir, portfolio, suffix, file_format):
+    stem = os.path.splitext(os.path.basename(portfolio))[0]
+    return os.path.join(output_dir, stem + "_" + suffix + "." + file_format)
+
+
+def _write(df, path, file_format):
+    if file_format == "csv":
+        df.to_csv(path, index=False)
+    else:
+        df.to_json(path, orient="records", indent=1)
+
+
+def _evaluate_portfolio(args, portfolio):
+    """
+    Runs get_shocks (or get_top_shocks with --top) for one portfolio file
+    Args:
+        args: parsed arguments of the evaluate command
+        portfolio: portfolio CSV-file
+    Returns: path of the written result
+    """
+    levels = args.confidence_level
+    confidence_level = levels[0] if len(levels) == 1 else levels
+    if args.top:
+        df = calculator.get_top_shocks(
+            year=args.year,
+            file_name=portfolio,
+            recovery_rate=args.recovery_rate,
+            elasticity=args.elasticity,
+            scenarios=args.scenario or None,
+            models=args.model or None,
+            confidence_level=confidence_level,
+            max_workers=args.workers,
+            chunksize=args.chunksize,
+        )
+        path = _output_path(args.output_dir, portfolio, "top_shocks", args.format)
+        _write(df, path, args.format)
+    elif args.chunksize:
+        path = _output_path(args.output_dir, portfolio, "shocks", "csv")
+        statistics = calculator.write_shocks(
+            model=args.model[0],
+            ref_scenario=args.scenario[0],
+            year=args.year,
+            file_name=portfolio,
+            output_file=path,
+            recovery_rate=args.recovery_rate,
+            elasticity=args.elasticity,
+            chunksize=args.chunksize,
+            confidence_level=confidence_level,
+        )
+        with open(
+            _output_path(args.output_dir, portfolio, "statistics", "json"),
+            "w",
+            encoding="utf-8",
+        ) as f:
+            json.dump(statistics, f, indent=1, default=float)
+    else:
+        df = calculator.get_shocks(
+            model=args.model[0],
+            ref_scenario=args.scenario[0],
+            year=args.year,
+            file_name=portfolio,
+            recovery_rate=args.recovery_rate,
+            elasticity=args.elasticity,
+        )
+        path = _output_path(args.output_dir, portfolio, "shocks", args.format)
+        _write(df, path, args.format)
+    return path
+
+
+def evaluate(args):
+    """
+    Runs get_shocks (or get_top_shocks with --top) for every portfolio file, with
+    --processes the portfolios are evaluated by worker processes sharing the scenario data
+    Args:
+        args: parsed arguments of the evaluate command
+    """
+    os.makedirs(args.output_dir, exist_ok=True)
+    if not args.processes or len(args.portfolios) < 2:
+        for portfolio in args.portfolios:
+            path = _evaluate_portfolio(args, portfolio)
+            print("[INFO] " + portfolio + " -> " + path)
+        return
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    from climate_risk_calc.connections import registry, shared_data
+
+    # loaded once here, the workers map the published arrays instead of loading them
+    with shared_data.SharedData(
+        registry.get_limits_connection(), registry.get_shock_cube()
+    ) as shared:
+        with ProcessPoolExecutor(
+            max_workers=min(args.processes, len(args.portfolios)),
+            # same start method on every platform, workers never inherit the GUI or threads
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=shared_data.initialize_worker,
+            initargs=(shared.path,),
+        ) as executor:
+            paths = executor.map(
+                _evaluate_portfolio,
+                [args] * len(args.portfolios),
+                args.portfolios,
+            )
+            for portfolio, path in zip(args.portfolios, paths):
+                print("[INFO] " + portfolio + " -> " + path)
+
+
+def sync(args):
+    """
+    Downloads (or refreshes) the local mirror of the IIASA database
+    Args:
+        args: parsed arguments of the sync command
+    """
+    from climate_risk_calc.connections.iiasa_connection import read_mapping
+    from climate_risk_calc.connections.iiasa_mirror import DEFAULT_MODELS, IIASAMirror
+
+    if args.source_file:
+        from climate_risk_calc.connections.local_api import LocalAPI
+
+        api = LocalAPI(args.source_file, database=args.database)
+    else:
+        import pyam.iiasa
+
+        api = pyam.iiasa.Connection(args.database)
+    statistics = IIASAMirror(args.database).sync(
+        api,
+        models=args.model or DEFAULT_MODELS,
+        variables=args.variable or read_mapping("gcam_variables"),
+        regions=args.region or read_mapping("gcam_regions"),
+        full=args.full,
+    )
+    print(
+        "[INFO] Synced "
+        + args.database
+        + ": {fetched} runs fetched, {kept} kept, {removed} removed".format(
+            **statistics
+        )
+    )
+
+
+def benchmark(args):
+    """
+    Runs the benchmark suite on synthetic data and compares it against the baseline, the
+    comparison is skipped if the baseline was recorded in another environment
+    Args:
+        args: parsed arguments of the benchmark command
+    Returns: 1 if a benchmark got slower than the baseline, else 0
+    """
+    from climate_risk_calc.benchmarks import suite
+
+    config = {
+        "models": args.models,
+        "scenarios": args.scenarios,
+        "regions": args.regions,
+        "sectors": args.sectors,
+        "years": args.years,
+        "loans": args.loans,
+        "year": args.year,
+    }
+    report = suite.run(config, work_dir=args.work_dir, repeat=args.repeat)
+    if args.output:
+        suite.save(report, args.output)
+        print("[INFO] Results -> " + args.output)
+    if args.save_baseline:
+        suite.save(report, args.baseline)
+        print("[INFO] Baseline -> " + args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        print("[WARNING] No baseline " + args.baseline + " to compare with")
+        return 0
+    regressions = suite.compare(report, suite.load(args.baseline), args.tolerance)
+    if regressions is None:
+        return 0
+    for name, before, after in regressions:
+        print(
+            "[WARNING] Regression {}: {:.1f} ms -> {:.1f} ms".format(
+                name, before * 1000, after * 1000
+            )
+        )
+    if not regressions:
+        print("[INFO] No regressions against " + args.baseline)
+    return 1 if regressions else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m climate_risk_calc")
+    parser.add_argument(
+        "--spans",
+        default=None,
+        help="write the stage timings of the command as JSON to this file",
+    )
+    parser.add_argument(
+        "--flamegraph",
+        default=None,
+        help="write the stage timings as folded stacks (flamegraph.pl, speedscope)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p_evaluate = commands.add_parser(
+        "evaluate", help="shock credit portfolios without the GUI"
+    )
+    p_evaluate.add_argument("portfolios", nargs="+", help="portfolio CSV-file(s)")
+    p_evaluate.add_argument(
+        "--top",
+        action="store_true",
+        help="calculate top shocks over the model/scenario grid",
+    )
+    p_evaluate.add_argument(
+        "--model", nargs="+", default=[], help="model(s), one without --top"
+    )
+    p_evaluate.add_argument(
+        "--scenario",
+        nargs="+",
+        default=[],
+        help="reference scenario(s), one without --top, 'all' for every scenario",
+    )
+    p_evaluate.add_argument("--year", type=int, default=2030)
+    p_evaluate.add_argument("--recovery-rate", type=float, default=0)
+    p_evaluate.add_argument("--elasticity", type=float, default=1)
+    p_evaluate.add_argument(
+        "--confidence-level", type=float, nargs="+", default=[0.95]
+    )
+    p_evaluate.add_argument("--format", choices=["csv", "json"], default="csv")
+    p_evaluate.add_argument("--output-dir", default=".")
+    p_evaluate.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="stream the portfolio in chunks of this many loans, about "
+        "min(c, 1 - c) * loans shocks per confidence level c are kept",
+    )
+    p_evaluate.add_argument(
+        "--workers", type=int, default=None, help="threads for --top"
+    )
+    p_evaluate.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="evaluate the portfolios in this many processes sharing the scenario data",
+    )
+    p_evaluate.set_defaults(func=evaluate)
+
+    p_sync = commands.add_parser(
+        "sync", help="download or refresh the local mirror of the IIASA database"
+    )
+    p_sync.add_argument("--database", default="ngfs_phase_3")
+    p_sync.add_argument(
+        "--model", nargs="+", default=[], help="models to mirror, default: GCAM"
+    )
+    p_sync.add_argument(
+        "--variable",
+        nargs="+",
+        default=[],
+        help="variables to mirror, default: mapping/gcam_variables.txt",
+    )
+    p_sync.add_argument(
+        "--region",
+        nargs="+",
+        default=[],
+        help="regions to mirror, default: mapping/gcam_regions.txt",
+    )
+    p_sync.add_argument(
+        "--full", action="store_true", help="download all runs again"
+    )
+    p_sync.add_argument(
+        "--source-file",
+        default=None,
+        help="sync from a local IAMC file instead of the IIASA API",
+    )
+    p_sync.set_defaults(func=sync)
+
+    p_benchmark = commands.add_parser(
+        "benchmark", help="time the calculator on synthetic data"
+    )
+    p_benchmark.add_argument("--models", type=int, default=4)
+    p_benchmark.add_argument(
+        "--scenarios", type=int, default=9, help="including the base scenario"
+    )
+    p_benchmark.add_argument("--regions", type=int, default=12)
+    p_benchmark.add_argument(
+        "--sectors", type=int, default=20, help="sectors below the base sector"
+    )
+    p_benchmark.add_argument("--years", type=int, default=15, help="at most 15")
+    p_benchmark.add_argument(
+        "--loans",
+        type=int,
+        nargs="+",
+        default=[1000, 100000],
+        help="portfolio sizes, e.g. 1000 1000000 10000000",
+    )
+    p_benchmark.add_argument("--year", type=int, default=2030)
+    p_benchmark.add_argument("--repeat", type=int, default=3)
+    p_benchmark.add_argument(
+        "--work-dir", default=None, help="directory of the generated data"
+    )
+    p_benchmark.add_argument("--output", default=None, help="JSON-file of the results")
+    p_benchmark.add_argument(
+        "--baseline", default=None, help="JSON-file of the baseline results"
+    )
+    p_benchmark.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store the results as baseline instead of comparing, baselines are only "
+        "compared on the machine and with the library versions they were recorded with",
+    )
+    p_benchmark.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="relative slowdown reported as regression",
+    )
+    p_benchmark.set_defaults(func=benchmark)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "evaluate" and not args.top:
+        if len(args.model) != 1 or len(args.scenario) != 1:
+            parser.error("evaluate needs exactly one --model and --scenario without --top")
+        if args.chunksize and args.format != "csv":
+            parser.error("--chunksize writes the shocked portfolio as csv")
+    if args.command == "evaluate" and args.top and args.scenario == ["all"]:
+        args.scenario = "all"
+    if args.command == "benchmark" and args.baseline is None:
+        from climate_risk_calc.benchmarks.suite import BASELINE_FILE
+
+        args.baseline = BASELINE_FILE
+    if args.spans or args.flamegraph:
+        timing.enable_spans()
+    try:
+        return args.func(args) or 0
+    except (OSError, ValueError, KeyError) as e:
+        print("[ERROR] " + str(e), file=sys.stderr)
+        return 1
+    finally:
+        if args.spans:
+            timing.write_spans(args.spans)
+            print("[INFO] Stage timings -> " + args.spans)
+        if args.flamegraph:
+            timing.write_folded_stacks(args.flamegraph)
+            print("[INFO] Folded stacks -> " + args.flamegraph)
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+from climate_risk_calc.connections import columnar_cache
+
+
+class CodedFrame:
+    """
+    Compact IAMC data passed between the connections and the calculator: every index level
+    (model, scenario, region, variable, unit, year, ...) is held as sorted labels plus an
+    integer code per row, the values as one float array. Unlike pyam.IamDataFrame nothing
+    is validated or re-indexed, an IamDataFrame is only built for plotting and export
+    (see to_iamdataframe)
+    """
+
+    def __init__(self, columns, attributes):
+        """
+        Args:
+            columns: dict of numpy arrays as created by columnar_cache.iamdataframe_to_columns,
+                labels may contain entries no row refers to
+            attributes: attributes as created by columnar_cache.iamdataframe_to_columns
+        """
+        self.columns = columns
+        self.attributes = attributes
+
+    @classmethod
+    def from_iamdataframe(cls, iam_dataframe):
+        return cls(*columnar_cache.iamdataframe_to_columns(iam_dataframe))
+
+    @property
+    def index(self):
+        """
+        Returns: names of the index levels
+        """
+        return self.attributes["index"]
+
+    @property
+    def time_col(self):
+        return self.attributes["time_col"]
+
+    @property
+    def values(self):
+        return self.columns["value"]
+
+    def __len__(self):
+        return len(self.columns["value"])
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    def codes(self, level):
+        return self.columns[level + ".codes"]
+
+    def levels(self, level):
+        return self.columns[level + ".levels"]
+
+    def labels(self, level):
+        """
+        Args:
+            level: name of an index level, e.g. "scenario"
+        Returns: sorted list of the labels occurring in the rows
+        """
+        return self.levels(level)[np.unique(self.codes(level))].tolist()
+
+    def take(self, rows):
+        """
+        Args:
+            rows: integer positions or boolean mask of the rows to keep
+        Returns: CodedFrame of the rows, sharing the labels
+        """
+        columns = {}
+        for n in self.index:
+            columns[n + ".levels"] = self.levels(n)
+            columns[n + ".codes"] = self.codes(n)[rows]
+        columns["value"] = self.values[rows]
+        return CodedFrame(columns, self.attributes)
+
+    def filter(self, **selection):
+        """
+        Args:
+            **selection: index level -> (list of) label(s)
+        Returns: CodedFrame of the rows matching all selected labels
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for level, labels in selection.items():
+            if not isinstance(labels, (list, tuple, np.ndarray)):
+                labels = [labels]
+            selected = np.isin(self.levels(level), labels)
+            mask &= selected[self.codes(level)]
+        return self.take(mask)
+
+    def replace_level(self, level, label):
+        """
+        Returns: CodedFrame with the same single label in level for all rows
+        """
+        columns = dict(self.columns)
+        columns[level + ".levels"] = np.asarray([label])
+        columns[level + ".codes"] = np.zeros(len(self), dtype=np.int32)
+        return CodedFrame(columns, self.attributes)
+
+    def sort(self):
+        """
+        Returns: CodedFrame with rows in the order of the index levels, like IamDataFrame
+        """
+        # lexsort sorts by the last key first, labels are sorted so codes sort like labels
+        order = np.lexsort([self.codes(n) for n in reversed(self.index)])
+        return self.take(order)
+
+    def to_series(self):
+        """
+        Returns: pandas series of the values with the IAMC MultiIndex
+        """
+        index = pd.MultiIndex(
+            levels=[self.levels(n).tolist() for n in self.index],
+            codes=[self.codes(n) for n in self.index],
+            names=self.index,
+            verify_integrity=False,
+        ).remove_unused_levels()
+        return pd.Series(self.values, index=index, name="value")
+
+    @property
+    def data(self):
+        """
+        Returns: long pandas dataframe with one column per index level and "value", like
+            IamDataFrame.data
+        """
+        data = {n: self.levels(n)[self.codes(n)] for n in self.index}
+        data["value"] = self.values
+        return pd.DataFrame(data)
+
+    def to_iamdataframe(self):
+        """
+        Rows must be sorted and unique like the data of an IamDataFrame, which holds for the
+        connections' results and for sort()
+        Returns: IamDataFrame of the data, None if there is no row
+        """
+        if self.empty:
+            return None
+        return columnar_cache.restore_iamdataframe(
+            self.to_series(), self.time_col, self.attributes["extra_cols"]
+        )
@@ -0,0 +1,265 @@
+import hashlib
+import json
+import mmap
+import os
+
+import numpy as np
+import pandas as pd
+
+# bump when the on-disk layout changes, older caches are then rebuilt
+CACHE_VERSION = 1
+MANIFEST = "manifest.json"
+
+
+def file_signature(path, with_digest=True):
+    """
+    Args:
+        path: path of the source file
+        with_digest: indicator whether the sha256 of the file content should be computed
+    Returns: dict with mtime, size and (optionally) content hash of the file
+    """
+    stat = os.stat(path)
+    signature = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    if with_digest:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        signature["sha256"] = sha.hexdigest()
+    return signature
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(cache_dir, manifest):
+    tmp = os.path.join(cache_dir, MANIFEST + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, os.path.join(cache_dir, MANIFEST))
+
+
+def is_fresh(cache_dir, source_path):
+    """
+    Cheap check on mtime and size first, the content hash is only computed if these differ
+    (e.g. after a checkout that touched, but did not change the file)
+    Args:
+        cache_dir: directory of the cache
+        source_path: file the cache was built from
+    Returns: manifest of the cache if it is valid for the source file, else None
+    """
+    manifest = _read_manifest(cache_dir)
+    if manifest is None or manifest.get("version") != CACHE_VERSION:
+        return None
+    cached = manifest["source"]
+    current = file_signature(source_path, with_digest=False)
+    if current["mtime_ns"] == cached["mtime_ns"] and current["size"] == cached["size"]:
+        return manifest
+    if current["size"] != cached["size"]:
+        return None
+    current = file_signature(source_path)
+    if current["sha256"] != cached["sha256"]:
+        return None
+    # content unchanged, remember the new mtime to skip hashing next time
+    manifest["source"] = current
+    try:
+        _write_manifest(cache_dir, manifest)
+    except OSError:
+        pass
+    return manifest
+
+
+def load_columns(cache_dir, source_path=None):
+    """
+    Args:
+        cache_dir: directory of the cache
+        source_path: file the cache was built from, None for data without source file
+            (e.g. a downloaded snapshot)
+    Returns: tuple of (dict of column name -> read-only memory-mapped numpy array,
+        stored attributes), or None if there is no valid cache for the source file
+    """
+    if source_path is None:
+        manifest = _read_manifest(cache_dir)
+        if manifest is not None and manifest.get("version") != CACHE_VERSION:
+            manifest = None
+    else:
+        manifest = is_fresh(cache_dir, source_path)
+    if manifest is None:
+        return None
+    try:
+        columns = {
+            name: np.load(os.path.join(cache_dir, name + ".npy"), mmap_mode="r")
+            for name in manifest["columns"]
+        }
+    except (OSError, ValueError):
+        return None
+    return columns, manifest.get("attributes", {})
+
+
+def store_columns(cache_dir, signature, columns, attributes=None):
+    """
+    Writes the columns as .npy files, the manifest is written last so that an interrupted
+    write never produces a cache that is considered valid
+    Args:
+        cache_dir: directory of the cache
+        signature: file_signature of the source file, taken before it was read, None for
+            data without source file
+        columns: dict of column name -> numpy array (no object dtype)
+        attributes: json-serializable dict stored alongside the columns
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_path = os.path.join(cache_dir, MANIFEST)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    for name, array in columns.items():
+        tmp = os.path.join(cache_dir, name + ".tmp.npy")
+        np.save(tmp, np.ascontiguousarray(array), allow_pickle=False)
+        os.replace(tmp, os.path.join(cache_dir, name + ".npy"))
+    _write_manifest(
+        cache_dir,
+        {
+            "version": CACHE_VERSION,
+            "source": signature,
+            "columns": list(columns),
+            "attributes": attributes or {},
+        },
+    )
+
+
+def code_dtype(n_labels):
+    """
+    Args:
+        n_labels: number of labels of an index level
+    Returns: smallest signed integer dtype holding the codes (and -1) of the labels
+    """
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_labels <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def compact_columns(columns, value_dtype=None):
+    """
+    Casts codes to the smallest dtype for their labels (caches written before codes were
+    stored compactly hold int32) and optionally the values to value_dtype
+    Args:
+        columns: dict of numpy arrays as created by iamdataframe_to_columns
+        value_dtype: dtype of the values, unchanged if None
+    Returns: dict of numpy arrays, columns that are already compact are not copied
+    """
+    compact = dict(columns)
+    for name in columns:
+        if not name.endswith(".codes"):
+            continue
+        dtype = code_dtype(len(columns[name[: -len(".codes")] + ".levels"]))
+        if columns[name].dtype.itemsize > np.dtype(dtype).itemsize:
+            compact[name] = np.asarray(columns[name]).astype(dtype)
+    if value_dtype is not None and columns["value"].dtype != value_dtype:
+        # np.asarray: a converted np.memmap would be an np.memmap held in memory
+        compact["value"] = np.asarray(columns["value"]).astype(value_dtype)
+    return compact
+
+
+def is_mapped(array):
+    """
+    Args:
+        array: numpy array
+    Returns: indicator whether the data of array lies in a memory-mapped file, i.e. array or
+        one of its bases is the mapping (copies of an np.memmap are np.memmap as well, but
+        are held in memory)
+    """
+    while array is not None:
+        if isinstance(array, mmap.mmap):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def memory_usage(arrays):
+    """
+    Args:
+        arrays: iterable of numpy arrays
+    Returns: dict with the "bytes" of all arrays and the "mapped" bytes of those backed by a
+        memory-mapped file, which are only resident once read
+    """
+    total, mapped = 0, 0
+    for array in arrays:
+        total += array.nbytes
+        if is_mapped(array):
+            mapped += array.nbytes
+    return {"bytes": total, "mapped": mapped}
+
+
+def iamdataframe_to_columns(iam_dataframe):
+    """
+    Args:
+        iam_dataframe: validated IamDataFrame
+    Returns: dict of numpy arrays (levels and codes per index level, values) and the
+        attributes needed to restore the IamDataFrame
+    """
+    data = iam_dataframe._data
+    columns = {}
+    for name, level, codes in zip(data.index.names, data.index.levels, data.index.codes):
+        columns[name + ".levels"] = np.asarray(level.to_list())
+        columns[name + ".codes"] = np.asarray(codes, dtype=code_dtype(len(level)))
+    columns["value"] = data.to_numpy(dtype=np.float64)
+    attributes = {
+        "index": list(data.index.names),
+        "time_col": iam_dataframe.time_col,
+        "extra_cols": list(iam_dataframe.extra_cols),
+    }
+    return columns, attributes
+
+
+def iamdataframe_from_columns(columns, attributes):
+    """
+    Rebuilds an IamDataFrame from cached columns without re-running pyam's validation,
+    the cached data was validated when the cache was written
+    Args:
+        columns: dict of numpy arrays as created by iamdataframe_to_columns
+        attributes: attributes as created by iamdataframe_to_columns
+    Returns: IamDataFrame
+    """
+    names = attributes["index"]
+    index = pd.MultiIndex(
+        levels=[columns[n + ".levels"].tolist() for n in names],
+        codes=[columns[n + ".codes"] for n in names],
+        names=names,
+        verify_integrity=False,
+    )
+    data = pd.Series(columns["value"], index=index, name="value")
+    return restore_iamdataframe(
+        data, attributes["time_col"], attributes["extra_cols"]
+    )
+
+
+def restore_iamdataframe(data, time_col="year", extra_cols=()):
+    """
+    Creates an IamDataFrame from data that pyam already formatted and validated,
+    i.e. the (subset of the) sorted, duplicate-free `_data` series of an IamDataFrame
+    Args:
+        data: pandas series with the IAMC index
+        time_col: name of the time index level
+        extra_cols: names of additional index levels
+    Returns: IamDataFrame
+    """
+    # pyam imports matplotlib, only load it once an IamDataFrame is needed
+    import pyam
+    from pyam.plotting import PlotAccessor
+
+    # mirrors IamDataFrame._init for already formatted data
+    df = pyam.IamDataFrame.__new__(pyam.IamDataFrame)
+    df._data = data
+    df.time_col = time_col
+    df.extra_cols = list(extra_cols)
+    df.meta = pd.DataFrame(index=data.index.droplevel(data.index.names[2:]).unique())
+    df.exclude = False
+    df._set_attributes()
+    df.plot = PlotAccessor(df)
+    df._compute = None
+    return df
@@ -1,64 +1,198 @@
-import pyam.iiasa
+import functools
 import os
 
+import numpy as np
+
+from climate_risk_calc.connections import query_cache
+from climate_risk_calc.connections.coded_frame import CodedFrame
+from climate_risk_calc.connections.iiasa_mirror import IIASAMirror
+from climate_risk_calc.tools import timing
+from climate_risk_calc.tools.variable_tree import VariableTree
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_mapping(name):
+    file_name = os.path.join(os.path.dirname(__file__), "mapping", name + ".txt")
+    with open(file_name, "r", encoding="utf-8") as f:
+        return tuple(f.read().split(","))
+
+
+def read_mapping(name):
+    """
+    The files are parsed once per process
+    Args:
+        name: name of the mapping file, e.g. "gcam_regions"
+    Returns: list of the comma separated entries of mapping/<name>.txt
+    """
+    return list(_parse_mapping(name))
+
 
 class IIASAConnection:
     wildcard = "all"
+    cache_root = os.path.join(os.path.dirname(__file__), ".cache", "iiasa")
 
     # note: for shorter loading times and ease of use, only ngfs_phase_3 database is considered here
-    def __init__(self, database="ngfs_phase_3"):
+    def __init__(
+        self,
+        database="ngfs_phase_3",
+        offline=False,
+        api=None,
+        use_cache=True,
+        use_mirror=True,
+    ):
         """
         Args:
             database: string of name of database/project to connect with
+            offline: indicator whether queries are only served from the mirror and the cache,
+                no connection is opened then
+            api: object with the interface of pyam.iiasa.Connection used instead of the
+                IIASA API, e.g. a LocalAPI
+            use_cache: indicator whether query results are cached on disk
+            use_mirror: indicator whether the local mirror (see IIASAMirror) is used if synced
+        """
+        if offline and not use_cache:
+            raise ValueError("Offline mode needs the query cache")
+        self.database = database
+        self.offline = offline
+        self.cache = None
+        if use_cache:
+            self.cache = query_cache.QueryCache(os.path.join(self.cache_root, database))
+        self.mirror = IIASAMirror(database).load() if use_mirror else None
+        self._con = api
+        self._variable_tree = None
+
+    @property
+    def con(self):
+        """
+        Returns: connection to the IIASA API, opened on first use
+        """
+        if self._con is None:
+            if self.offline:
+                raise ConnectionError(self.database + " is not available offline")
+            import pyam.iiasa
+
+            self._con = pyam.iiasa.Connection(self.database)
+        return self._con
+
+    def _mirror_labels(self, dimension):
+        return list(self.mirror.row_index.labels[dimension])
+
+    def _in_mirror(self, model, region, variable):
+        """
+        Returns: indicator whether the selection lies within the mirrored subset
         """
-        self.con = pyam.iiasa.Connection(database)
+        if self.mirror is None:
+            return False
+        config = self.mirror.attributes["config"]
+        for value, mirrored in [
+            (model, config["models"]),
+            (region, config["regions"]),
+            (variable, config["variables"]),
+        ]:
+            if value == "*":
+                continue
+            if not set(query_cache.normalize(value)) <= set(mirrored):
+                return False
+        return True
+
+    def _from_cache(self, key):
+        if self.cache is None:
+            return None
+        return self.cache.get(key, allow_expired=self.offline)
+
+    def _to_cache(self, key, params, columns, attributes=None):
+        if self.cache is None:
+            return
+        try:
+            self.cache.put(key, params, columns, attributes)
+        except OSError as e:
+            print("[WARNING] Could not write IIASA query cache: " + str(e))
+
+    def _not_cached(self, what):
+        return ConnectionError(
+            what + " of " + self.database + " is not cached, not available offline"
+        )
 
     def get_connections(self):
         """
         Returns: possible databases to connect with
         """
+        if self.offline:
+            return [self.database]
         return self.con.valid_connections
 
     def get_models(self):
         """
         Returns: list of all models available for the connected database
         """
-        return self.con.models().to_list()
+        if self.mirror is not None:
+            return self._mirror_labels("model")
+        key, params = query_cache.make_key(self.database, request="models")
+        cached = self._from_cache(key)
+        if cached is not None:
+            return cached[0]["model"].tolist()
+        if self.offline:
+            raise self._not_cached("Model list")
+        models = self.con.models().to_list()
+        self._to_cache(key, params, {"model": np.asarray(models, dtype=str)})
+        return models
 
     def get_scenarios(self):
         """
         Returns: list of all climate scenarios available for the connected database
         """
-        file_name = os.path.join(
-            os.path.dirname(__file__), "mapping/gcam_scenarios.txt"
-        )
-        return open(file_name, "r", encoding="utf-8").read().split(",")
+        if self.mirror is not None:
+            return self._mirror_labels("scenario")
+        return read_mapping("gcam_scenarios")
 
     def get_regions(self):
         """
         Returns: list of all regions available for the connected database
         """
-        file_name = os.path.join(os.path.dirname(__file__), "mapping/gcam_regions.txt")
-        return open(file_name, "r", encoding="utf-8").read().split(",")
+        if self.mirror is not None:
+            return self._mirror_labels("region")
+        return read_mapping("gcam_regions")
 
     def get_variables(self):
         """
         Returns: list of all variables available for the connected database
         """
-        file_name = os.path.join(
-            os.path.dirname(__file__), "mapping/gcam_variables.txt"
-        )
-        return open(file_name, "r", encoding="utf-8").read().split(",")
+        if self.mirror is not None:
+            return self._mirror_labels("variable")
+        return read_mapping("gcam_variables")
 
+    @property
+    def variable_tree(self):
+        """
+        Returns: VariableTree of get_variables(), built on first use
+        """
+        if self._variable_tree is None:
+            self._variable_tree = VariableTree(self.get_variables())
+        return self._variable_tree
+
+    def memory_usage(self):
+        """
+        Query results are cached on disk, only the local mirror is held by the connection
+        Returns: dict of part -> dict with "bytes" and memory-"mapped" bytes of the mirror,
+            see IndexedData.memory_usage, None if no mirror is used
+        """
+        if self.mirror is None:
+            return None
+        return self.mirror.memory_usage()
+
+    @timing.spanned()
     def execute_query(self, model, scenario, region, variable):
         """
+        Selections within the synced mirror are served from it like LIMITS data, other
+        results are cached on disk, identical queries are served from the cache until it expires
         Args:
             model: (list of) model(s)
             scenario: (list of) scenario(s), allowing wildcards
             region: (list of) region(s), allowing wildcards
             variable: (list of) variable(s)
 
-        Returns: IamDataframe containing the results of the query
+        Returns: CodedFrame containing the results of the query, None if nothing matches,
+            use to_iamdataframe() for plotting and export
         """
         if not isinstance(region, list):
             region = [region]
@@ -68,14 +202,37 @@ class IIASAConnection:
         if region[0].lower() == self.wildcard:
             region = "*"
 
-        params = []
-        for P in [model, scenario, region, variable]:
-            if not isinstance(P, list):
-                params.append([P])
-            else:
-                params.append(P)
+        if self._in_mirror(model, region, variable):
+            selection = {
+                "model": model,
+                "scenario": scenario,
+                "region": region,
+                "variable": variable,
+            }
+            return self.mirror.select(
+                **{
+                    d: query_cache.normalize(v)
+                    for d, v in selection.items()
+                    if v != "*"
+                }
+            )
 
-        df = self.con.query(
-            model=model, scenario=scenario, variable=variable, region=region
+        key, params = query_cache.make_key(
+            self.database, model=model, scenario=scenario, region=region, variable=variable
         )
-        return df
+        cached = self._from_cache(key)
+        if cached is not None:
+            return CodedFrame(*cached)
+        if self.offline:
+            raise self._not_cached("Query " + str(params))
+
+        with timing.span("IIASA API query"):
+            df = self.con.query(
+                model=model, scenario=scenario, variable=variable, region=region
+            )
+        # empty results are not cached, they are usually a faulty selection
+        if df is None or df.empty:
+            return None
+        result = CodedFrame.from_iamdataframe(df)
+        self._to_cache(key, params, result.columns, result.attributes)
+        return result
@@ -0,0 +1,112 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from climate_risk_calc.connections import columnar_cache
+from climate_risk_calc.connections.indexed_data import IndexedData
+
+# models mirrored by default, the mapping files describe the GCAM subset of ngfs_phase_3
+DEFAULT_MODELS = ["GCAM 5.3+ NGFS"]
+
+
+class IIASAMirror:
+    """
+    Local columnar snapshot of a configured subset (models, variables, regions) of an IIASA
+    database. A sync only downloads the runs (model/scenario) whose version changed since
+    the last sync
+    """
+
+    mirror_root = os.path.join(os.path.dirname(__file__), ".cache", "iiasa_mirror")
+
+    def __init__(self, database="ngfs_phase_3"):
+        """
+        Args:
+            database: string of name of the mirrored database/project
+        """
+        self.database = database
+        self.mirror_dir = os.path.join(self.mirror_root, database)
+
+    def load(self):
+        """
+        Returns: IndexedData of the snapshot, None if it was never synced
+        """
+        loaded = columnar_cache.load_columns(self.mirror_dir)
+        if loaded is None:
+            return None
+        return IndexedData(*loaded)
+
+    def sync(self, api, models, variables, regions, full=False):
+        """
+        Args:
+            api: pyam.iiasa.Connection (or LocalAPI) of the database
+            models: list of models to mirror
+            variables: list of variables to mirror
+            regions: list of regions to mirror
+            full: indicator whether all runs should be downloaded again
+        Returns: dict with the numbers of "fetched", "kept" and "removed" runs
+        """
+        config = {
+            "models": sorted(models),
+            "variables": sorted(variables),
+            "regions": sorted(regions),
+        }
+        current = self.load()
+        # a changed configuration needs a full download
+        if current is not None and (full or current.attributes.get("config") != config):
+            current = None
+        if current is not None:
+            # copied into memory, the memory-mapped files are replaced below
+            current = IndexedData(
+                {name: np.array(c) for name, c in current.columns.items()},
+                current.attributes,
+            )
+        stored = {}
+        if current is not None:
+            stored = {(m, s): v for m, s, v in current.attributes["runs"]}
+
+        index = api.index(model=config["models"])
+        runs = {(m, s): int(v) for (m, s), v in index["version"].items()}
+        changed = [run for run, version in runs.items() if stored.get(run) != version]
+        removed = [run for run in stored if run not in runs]
+        statistics = {
+            "fetched": len(changed),
+            "kept": len(runs) - len(changed),
+            "removed": len(removed),
+        }
+        if current is not None and not changed and not removed:
+            return statistics
+
+        parts = []
+        time_col, extra_cols = "year", []
+        if current is not None:
+            data = current.dataframe._data
+            time_col, extra_cols = current.dataframe.time_col, current.dataframe.extra_cols
+            outdated = data.index.droplevel(data.index.names[2:]).isin(changed + removed)
+            parts.append(data[~outdated])
+        for model in sorted({m for m, _ in changed}):
+            df = api.query(
+                model=model,
+                scenario=sorted(s for m, s in changed if m == model),
+                variable=config["variables"],
+                region=config["regions"],
+            )
+            if df is not None and not df.empty:
+                time_col, extra_cols = df.time_col, df.extra_cols
+                parts.append(df._data)
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            raise ValueError(
+                "No data of " + self.database + " matches the mirror configuration"
+            )
+
+        data = pd.concat(parts).sort_index()
+        data.index = data.index.remove_unused_levels()
+        snapshot = columnar_cache.restore_iamdataframe(data, time_col, extra_cols)
+        columns, attributes = columnar_cache.iamdataframe_to_columns(snapshot)
+        attributes["config"] = config
+        attributes["runs"] = [[m, s, v] for (m, s), v in sorted(runs.items())]
+        attributes["synced"] = time.time()
+        columnar_cache.store_columns(self.mirror_dir, None, columns, attributes)
+        return statistics
@@ -0,0 +1,120 @@
+import threading
+
+from climate_risk_calc.connections import columnar_cache
+from climate_risk_calc.connections.coded_frame import CodedFrame
+from climate_risk_calc.connections.row_index import RowIndex
+from climate_risk_calc.tools import timing
+
+
+class IndexedData:
+    """
+    IAMC data held as integer coded numpy columns (see columnar_cache.iamdataframe_to_columns)
+    with a RowIndex over model, scenario, region and variable. Queries select rows through
+    the index and return them as CodedFrame, no IamDataFrame is built
+    """
+
+    dimensions = ["model", "scenario", "region", "variable"]
+
+    def __init__(
+        self, columns, attributes, dataframe=None, value_dtype=None, row_index=None
+    ):
+        """
+        Args:
+            columns: dict of numpy arrays as created by iamdataframe_to_columns
+            attributes: attributes as created by iamdataframe_to_columns
+            dataframe: IamDataFrame the columns were created from, if already at hand
+            value_dtype: dtype the values are held in (e.g. np.float32), as stored if None
+            row_index: RowIndex over the columns, if already at hand
+        """
+        self.columns = columnar_cache.compact_columns(columns, value_dtype)
+        self.attributes = attributes
+        self._dataframe = dataframe
+        self._row_index = row_index
+        self._lock = threading.Lock()
+
+    @property
+    def dataframe(self):
+        """
+        Returns: IamDataFrame of all data, created from the columns on first use
+        """
+        if self._dataframe is None:
+            with self._lock:
+                if self._dataframe is None:
+                    with timing.span("build IamDataFrame"):
+                        self._dataframe = columnar_cache.iamdataframe_from_columns(
+                            self.columns, self.attributes
+                        )
+        return self._dataframe
+
+    @property
+    def row_index(self):
+        """
+        Returns: RowIndex over model, scenario, region and variable, built on first use
+        """
+        if self._row_index is None:
+            with self._lock:
+                if self._row_index is None:
+                    labels, codes, _ = self.get_coded_data()
+                    self._row_index = RowIndex(
+                        {d: labels[d] for d in self.dimensions},
+                        {d: codes[d] for d in self.dimensions},
+                    )
+        return self._row_index
+
+    def get_coded_data(self):
+        """
+        Returns: tuple of (dict of dimension -> list of labels, dict of dimension -> integer
+            code of every row, numpy array of values), rows in the order of dataframe
+        """
+        labels = {}
+        codes = {}
+        for name in self.attributes["index"]:
+            labels[name] = self.columns[name + ".levels"].tolist()
+            codes[name] = self.columns[name + ".codes"]
+        return labels, codes, self.columns["value"]
+
+    def memory_usage(self):
+        """
+        Returns: dict of part -> dict with "bytes" and memory-"mapped" bytes for the "codes",
+            "labels" and "values" of the columns, the "row_index" and the IamDataFrame
+            ("dataframe", 0 until it is used), plus the "total"
+        """
+        columns = self.columns
+        usage = {
+            "codes": columnar_cache.memory_usage(
+                columns[n + ".codes"] for n in self.attributes["index"]
+            ),
+            "labels": columnar_cache.memory_usage(
+                columns[n + ".levels"] for n in self.attributes["index"]
+            ),
+            "values": columnar_cache.memory_usage([columns["value"]]),
+            "row_index": {"bytes": 0, "mapped": 0},
+            "dataframe": {"bytes": 0, "mapped": 0},
+        }
+        if self._row_index is not None:
+            # the codes of the index are shared with the columns
+            usage["row_index"] = columnar_cache.memory_usage(
+                list(self._row_index.positions.values())
+                + list(self._row_index.offsets.values())
+            )
+        if self._dataframe is not None:
+            usage["dataframe"]["bytes"] = int(
+                self._dataframe._data.memory_usage(index=True, deep=True)
+                + self._dataframe.meta.memory_usage(index=True, deep=True).sum()
+            )
+        usage["total"] = {
+            key: sum(part[key] for part in usage.values()) for key in ("bytes", "mapped")
+        }
+        return usage
+
+    @timing.spanned()
+    def select(self, **selection):
+        """
+        Args:
+            **selection: dimension -> list of labels, dimensions not given are not filtered
+        Returns: CodedFrame of the matching rows, None if no row matches
+        """
+        rows = self.row_index.select(**selection)
+        if len(rows) == 0:
+            return None
+        return CodedFrame(self.columns, self.attributes).take(rows)
@@ -1,87 +1,190 @@
 import os
+import threading
+import numpy as np
 import pandas as pd
-import pyam
+
+from climate_risk_calc.connections import columnar_cache
+from climate_risk_calc.connections.indexed_data import IndexedData
+from climate_risk_calc.tools import timing
+from climate_risk_calc.tools.variable_tree import VariableTree
 
 
 class LimitsConnection:
     wildcard = "all"
+    source_file = os.path.join(os.path.dirname(__file__), "LIMITS.csv")
+    cache_dir = os.path.join(os.path.dirname(__file__), ".cache", "limits")
 
-    def __init__(self):
-        df = pd.read_csv(
-            os.path.join(os.path.dirname(__file__), "LIMITS.csv"),
-            encoding="cp1252",
-            na_filter=False,
-        )
-        self.limits_dataframe = pyam.IamDataFrame(df)
-
-    def get_models(self):
+    @timing.spanned("LimitsConnection.load")
+    def __init__(self, use_cache=True, float32=None):
         """
-        Returns: list of models from the LIMITS project/database
+        Args:
+            use_cache: indicator whether the binary cache of LIMITS.csv should be used,
+                it is (re)built whenever the CSV-file changed
+            float32: indicator whether the values are held as float32 instead of float64,
+                if None the environment variable CLIMATE_RISK_FLOAT32=1 enables it.
+                Halves the memory of the values and of the shock cube, but values and
+                market shares only keep about 7 significant digits. Market share shocks
+                differ by up to 4e-7 (absolute) from float64, i.e. a loan shock by up to
+                4e-7 * amount * (1 - recovery rate) * elasticity. Relative to the shock this
+                is about 2e-7 typically, but up to 1e-3 for shocks close to zero, where the
+                reference and base market shares almost cancel
         """
-        return self.limits_dataframe.data["model"].unique().tolist()
+        if float32 is None:
+            float32 = os.environ.get("CLIMATE_RISK_FLOAT32") == "1"
+        self.value_dtype = np.float32 if float32 else np.float64
+        self._catalog = None
+        self._variable_tree = None
+        self._lock = threading.Lock()
+        cached = None
+        if use_cache:
+            with timing.span("load LIMITS cache"):
+                cached = columnar_cache.load_columns(self.cache_dir, self.source_file)
+        if cached is not None:
+            self.data = IndexedData(*cached, value_dtype=self.value_dtype)
+            return
 
-    def get_scenarios(self, model=None):
+        import pyam
+
+        signature = columnar_cache.file_signature(self.source_file)
+        with timing.span("read LIMITS.csv"):
+            df = pd.read_csv(self.source_file, encoding="cp1252", na_filter=False)
+        with timing.span("build IamDataFrame"):
+            limits_dataframe = pyam.IamDataFrame(df)
+        columns, attributes = columnar_cache.iamdataframe_to_columns(limits_dataframe)
+        # the IamDataFrame is not kept, it is rebuilt from the columns if needed
+        del df, limits_dataframe
+        self.data = IndexedData(columns, attributes, value_dtype=self.value_dtype)
+        if use_cache:
+            try:
+                columnar_cache.store_columns(
+                    self.cache_dir, signature, columns, attributes
+                )
+            except OSError as e:
+                print("[WARNING] Could not write LIMITS cache: " + str(e))
+
+    @classmethod
+    def from_data(cls, data):
         """
         Args:
-            model: model for which to get scenarios
-        Returns: list of scenarios
+            data: IndexedData of the LIMITS data, e.g. attached from shared memory
+        Returns: LimitsConnection over data, neither LIMITS.csv nor the cache are read
+        """
+        connection = cls.__new__(cls)
+        connection.value_dtype = data.columns["value"].dtype.type
+        connection._catalog = None
+        connection._variable_tree = None
+        connection._lock = threading.Lock()
+        connection.data = data
+        return connection
+
+    @property
+    def limits_dataframe(self):
+        """
+        Returns: IamDataFrame of the LIMITS data, created from the columns on first use
+        """
+        return self.data.dataframe
+
+    @property
+    def row_index(self):
         """
-        if model is None:
-            df = self.limits_dataframe.data["scenario"].unique().tolist()
-            df = [
+        Returns: RowIndex over model, scenario, region and variable, built on first use
+        """
+        return self.data.row_index
+
+    @property
+    def catalog(self):
+        """
+        Returns: dict of model (None for all models) -> dict with the filtered and ordered
+            "scenarios", "regions" and "energy_variables" of the model, built on first use
+        """
+        if self._catalog is None:
+            row_index = self.row_index
+            with self._lock:
+                if self._catalog is None:
+                    self._catalog = self._build_catalog(row_index)
+        return self._catalog
+
+    @property
+    def variable_tree(self):
+        """
+        Returns: VariableTree of all LIMITS variables, built on first use
+        """
+        if self._variable_tree is None:
+            row_index = self.row_index
+            with self._lock:
+                if self._variable_tree is None:
+                    self._variable_tree = VariableTree(row_index.labels["variable"])
+        return self._variable_tree
+
+    def _build_catalog(self, row_index):
+        def unique_labels(dimension, rows):
+            # labels in order of first appearance like pandas' unique()
+            codes = pd.unique(row_index.codes[dimension][rows])
+            return [row_index.labels[dimension][c] for c in codes]
+
+        def entry(rows):
+            scenarios = [
                 e
-                for e in df
+                for e in unique_labels("scenario", rows)
                 if "-EE" not in e and "-PC" not in e and "2030-500" not in e
             ]
-            return df
+            variables = sorted(unique_labels("variable", rows))
+            return {
+                "scenarios": scenarios,
+                "regions": unique_labels("region", rows),
+                "energy_variables": [v for v in variables if "Energy" in v],
+            }
 
-        df = (
-            self.limits_dataframe.data.query("model == @model")["scenario"]
-            .unique()
-            .tolist()
-        )
-        df = [
-            e for e in df if "-EE" not in e and "-PC" not in e and "2030-500" not in e
-        ]
+        all_rows = np.arange(len(row_index.codes["model"]))
+        catalog = {None: entry(all_rows)}
+        catalog[None]["models"] = unique_labels("model", all_rows)
+        for code, model in enumerate(row_index.labels["model"]):
+            rows = np.sort(row_index.rows("model", [code]))
+            if len(rows):
+                catalog[model] = entry(rows)
+        return catalog
+
+    def _catalog_list(self, key, model):
+        if not isinstance(model, list):
+            return list(self.catalog.get(model, {}).get(key, []))
+        # several models: union in order of the models in the data
+        result = []
+        for m in self.catalog[None]["models"]:
+            if m in model:
+                result.extend(e for e in self.catalog[m][key] if e not in result)
+        if key == "energy_variables":
+            result.sort()
+        return result
+
+    def get_models(self):
+        """
+        Returns: list of models from the LIMITS project/database
+        """
+        return list(self.catalog[None]["models"])
 
-        return df
+    def get_scenarios(self, model=None):
+        """
+        Args:
+            model: (list of) model(s) for which to get scenarios
+        Returns: list of scenarios
+        """
+        return self._catalog_list("scenarios", model)
 
     def get_regions(self, model=None):
         """
         Args:
-            model: model for which to get regions
+            model: (list of) model(s) for which to get regions
         Returns: list of regions
         """
-
-        if model is None:
-            return self.limits_dataframe.data["region"].unique().tolist()
-
-        return (
-            self.limits_dataframe.data.query("model == @model")["region"]
-            .unique()
-            .tolist()
-        )
+        return self._catalog_list("regions", model)
 
     def get_energy_variables(self, model=None):
         """
         Args:
-            model: model for which to get variables related to energy sectors
+            model: (list of) model(s) for which to get variables related to energy sectors
         Returns: list of energy variables
         """
-        if model is None:
-            vars = self.limits_dataframe.data["variable"].unique().tolist()
-            vars.sort()
-            vars = [v for v in vars if "Energy" in v]
-            return vars
-
-        vars = (
-            self.limits_dataframe.data.query("model == @model")["variable"]
-            .unique()
-            .tolist()
-        )
-        vars.sort()
-        vars = [v for v in vars if "Energy" in v]
-        return vars
+        return self._catalog_list("energy_variables", model)
 
     def get_sample_regions(self):
         """
@@ -117,15 +220,29 @@ class LimitsConnection:
             "LIMITS-Base,LIMITS-StrPol-450",
         ]
 
-    def execute_query(self, model, scenario, region, variable):
+    def memory_usage(self):
+        """
+        Returns: dict of part -> dict with "bytes" and memory-"mapped" bytes of the data held
+            by the connection, see IndexedData.memory_usage
+        """
+        return self.data.memory_usage()
+
+    def get_coded_data(self):
+        """
+        Returns: tuple of (dict of dimension -> list of labels, dict of dimension -> integer
+            code of every row, numpy array of values), rows in the order of limits_dataframe
+        """
+        return self.data.get_coded_data()
+
+    def expand_selection(self, model, scenario, region, variable):
         """
         Args:
             model: (list of) model(s)
-            scenario: (list of) scenario(s), allowing wildcards
+            scenario: comma separated scenario(s), allowing wildcards
             region: (list of) region(s), allowing wildcards
             variable: (list of) variable(s)
 
-        Returns: IamDataframe containing the results of the query
+        Returns: list of [models, scenarios, regions, variables] with wildcards resolved
         """
         scenario = scenario.split(",")
         params = []
@@ -149,15 +266,21 @@ class LimitsConnection:
             params[2] = self.get_regions(model=model)
         elif "sample" in params[2][0].lower():
             params[2] = self.get_sample_regions()
+        return params
 
-        query = (
-            "MODEL in @params[0] & SCENARIO in @params[1] "
-            "& REGION in @params[2] & VARIABLE in @params[3]"
-        ).lower()
-        df = self.limits_dataframe.data.query(query)
-
-        if df.empty:
-            return None
+    @timing.spanned()
+    def execute_query(self, model, scenario, region, variable):
+        """
+        Args:
+            model: (list of) model(s)
+            scenario: comma separated scenario(s), allowing wildcards
+            region: (list of) region(s), allowing wildcards
+            variable: (list of) variable(s)
 
-        df = pyam.IamDataFrame(data=df)
-        return df
+        Returns: CodedFrame containing the results of the query, None if nothing matches,
+            use to_iamdataframe() for plotting and export
+        """
+        params = self.expand_selection(model, scenario, region, variable)
+        return self.data.select(
+            model=params[0], scenario=params[1], region=params[2], variable=params[3]
+        )
@@ -0,0 +1,52 @@
+import pandas as pd
+
+
+class LocalAPI:
+    """
+    Stand-in for pyam.iiasa.Connection that serves an IAMC-formatted file, so that the
+    IIASA data path can be used and tested without network
+    """
+
+    def __init__(self, file_name, database="local"):
+        """
+        Args:
+            file_name: IAMC-formatted CSV- or Excel-file
+            database: name reported as the only valid connection
+        """
+        import pyam
+
+        self.data = pyam.IamDataFrame(file_name)
+        self.valid_connections = [database]
+        self.query_count = 0
+        # (model, scenario) -> version reported by index(), 1 if not set
+        self.versions = {}
+
+    def models(self):
+        """
+        Returns: pandas series of all models, like pyam.iiasa.Connection.models
+        """
+        return pd.Series(self.data.model, name="model")
+
+    def index(self, default_only=True, **kwargs):
+        """
+        Args:
+            default_only: ignored, there is only one version of every run
+            **kwargs: filters by model and scenario, allowing "*" wildcards
+        Returns: pandas dataframe indexed by model and scenario with column "version",
+            like pyam.iiasa.Connection.index
+        """
+        data = self.data.filter(**kwargs) if kwargs else self.data
+        runs = data.data[["model", "scenario"]].drop_duplicates()
+        runs["version"] = [
+            self.versions.get(run, 1) for run in runs.itertuples(index=False, name=None)
+        ]
+        return runs.set_index(["model", "scenario"])
+
+    def query(self, **kwargs):
+        """
+        Args:
+            **kwargs: filters as in pyam.iiasa.Connection.query, allowing "*" wildcards
+        Returns: IamDataFrame with the matching data
+        """
+        self.query_count += 1
+        return self.data.filter(**kwargs)
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# bump when the on-disk layout changes, older entries are then dropped
+CACHE_VERSION = 1
+INDEX = "index.json"
+# entries older than this are fetched again when online
+DEFAULT_TTL = 24 * 60 * 60
+# least recently used entries are evicted beyond this size
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def normalize(value):
+    """
+    Args:
+        value: query parameter, a string or a list of strings
+    Returns: sorted list of distinct strings, so that "GCAM" and ["GCAM"] give the same key
+    """
+    if not isinstance(value, (list, tuple)):
+        value = [value]
+    return sorted({str(v) for v in value})
+
+
+def make_key(database, **params):
+    """
+    Args:
+        database: name of the database the query runs against
+        **params: query parameters, e.g. model, scenario, region and variable
+    Returns: tuple of (hex digest used as file name, normalized parameters)
+    """
+    normalized = {"database": database}
+    normalized.update({name: normalize(value) for name, value in params.items()})
+    text = json.dumps(normalized, sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest(), normalized
+
+
+class QueryCache:
+    """
+    Persistent cache of query results. Every entry is a compressed .npz file of numpy
+    columns, an index file keeps the parameters, age and size of all entries
+    """
+
+    def __init__(self, cache_dir, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir: directory of the cache
+            ttl: seconds after which an entry is expired
+            max_bytes: maximum total size of all entries
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = None
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".npz")
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(
+                    os.path.join(self.cache_dir, INDEX), "r", encoding="utf-8"
+                ) as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = None
+            if index is None or index.get("version") != CACHE_VERSION:
+                index = {"version": CACHE_VERSION, "entries": {}}
+            self._index = index
+        return self._index["entries"]
+
+    def _write_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = os.path.join(self.cache_dir, INDEX + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, indent=1)
+        os.replace(tmp, os.path.join(self.cache_dir, INDEX))
+
+    def get(self, key, allow_expired=False):
+        """
+        Args:
+            key: key as returned by make_key
+            allow_expired: indicator whether entries older than ttl are returned, e.g. offline
+        Returns: tuple of (dict of column name -> numpy array, attributes) or None
+        """
+        with self._lock:
+            entries = self._load_index()
+            entry = entries.get(key)
+            if entry is None:
+                return None
+            now = time.time()
+            if not allow_expired and now - entry["created"] > self.ttl:
+                return None
+            try:
+                with np.load(self._path(key), allow_pickle=False) as npz:
+                    columns = {name: npz[name] for name in npz.files}
+            except (OSError, ValueError):
+                del entries[key]
+                return None
+            entry["last_used"] = now
+            try:
+                self._write_index()
+            except OSError:
+                pass
+            return columns, entry["attributes"]
+
+    def put(self, key, params, columns, attributes=None):
+        """
+        Stores the columns and evicts the least recently used entries beyond max_bytes
+        Args:
+            key: key as returned by make_key
+            params: normalized parameters as returned by make_key, kept for inspection
+            columns: dict of column name -> numpy array (no object dtype)
+            attributes: json-serializable dict stored alongside the columns
+        """
+        with self._lock:
+            entries = self._load_index()
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = os.path.join(self.cache_dir, key + ".tmp.npz")
+            np.savez_compressed(tmp, **columns)
+            os.replace(tmp, self._path(key))
+            now = time.time()
+            entries[key] = {
+                "params": params,
+                "created": now,
+                "last_used": now,
+                "size": os.path.getsize(self._path(key)),
+                "attributes": attributes or {},
+            }
+            self._evict(entries)
+            self._write_index()
+
+    def _evict(self, entries):
+        total = sum(e["size"] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= entries[key]["size"]
+            del entries[key]
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        """
+        Removes all entries
+        """
+        with self._lock:
+            entries = self._load_index()
+            for key in list(entries):
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            entries.clear()
+            self._write_index()
+
+    def size(self):
+        """
+        Returns: total size of all entries in bytes
+        """
+        with self._lock:
+            return sum(e["size"] for e in self._load_index().values())
@@ -0,0 +1,138 @@
+import os
+import threading
+
+from climate_risk_calc.connections.limits_connection import LimitsConnection
+from climate_risk_calc.tools import timing
+
+_lock = threading.Lock()
+_limits_connection = None
+_shock_cube = None
+_iiasa_connection = None
+_evaluation_cache = None
+# incremented by reset(), part of the key of cached evaluations
+_data_version = 0
+
+
+def get_limits_connection():
+    """
+    The returned connection is shared by all views and calculations of the process and
+    must be treated as read-only
+    Returns: process-wide LimitsConnection, loaded on first use
+    """
+    global _limits_connection
+    if _limits_connection is None:
+        with _lock:
+            if _limits_connection is None:
+                with timing.timed("Load LIMITS data"):
+                    _limits_connection = LimitsConnection()
+    return _limits_connection
+
+
+def use_limits_connection(limits_connection, shock_cube=None):
+    """
+    Replaces the shared LimitsConnection, e.g. by one over synthetic data for benchmarks
+    Args:
+        limits_connection: LimitsConnection used by all views and calculations from now on
+        shock_cube: ShockCube of limits_connection if already at hand, built on first use
+            if None
+    """
+    global _limits_connection, _shock_cube, _data_version
+    with _lock:
+        _limits_connection = limits_connection
+        _shock_cube = shock_cube
+        _data_version += 1
+        if _evaluation_cache is not None:
+            _evaluation_cache.clear()
+
+
+def get_shock_cube():
+    """
+    Returns: process-wide ShockCube of the shared LimitsConnection, built on first use
+    """
+    global _shock_cube
+    if _shock_cube is None:
+        # imported here, the calculator itself depends on this module
+        from climate_risk_calc.tools.shock_cube import ShockCube
+
+        limits_connection = get_limits_connection()
+        with _lock:
+            if _shock_cube is None:
+                with timing.timed("Build shock cube"):
+                    _shock_cube = ShockCube(limits_connection)
+    return _shock_cube
+
+
+def get_iiasa_connection():
+    """
+    The environment variable CLIMATE_RISK_OFFLINE=1 serves IIASA queries from the cache only,
+    CLIMATE_RISK_IIASA_FILE=<IAMC file> replaces the IIASA API by a local LocalAPI
+    Returns: process-wide IIASAConnection, connected on first use
+    """
+    global _iiasa_connection
+    if _iiasa_connection is None:
+        # imported here, pyam.iiasa is slow to import and only needed for IIASA queries
+        from climate_risk_calc.connections.iiasa_connection import IIASAConnection
+
+        with _lock:
+            if _iiasa_connection is None:
+                with timing.timed("Connect to IIASA"):
+                    api = None
+                    if os.environ.get("CLIMATE_RISK_IIASA_FILE"):
+                        from climate_risk_calc.connections.local_api import LocalAPI
+
+                        api = LocalAPI(os.environ["CLIMATE_RISK_IIASA_FILE"])
+                    _iiasa_connection = IIASAConnection(
+                        offline=os.environ.get("CLIMATE_RISK_OFFLINE") == "1", api=api
+                    )
+    return _iiasa_connection
+
+
+def get_evaluation_cache():
+    """
+    Returns: process-wide EvaluationCache of loan evaluations and top shock tables
+    """
+    global _evaluation_cache
+    if _evaluation_cache is None:
+        # imported here, the evaluation cache depends on the calculator
+        from climate_risk_calc.tools.evaluation_cache import EvaluationCache
+
+        with _lock:
+            if _evaluation_cache is None:
+                _evaluation_cache = EvaluationCache()
+    return _evaluation_cache
+
+
+def memory_usage():
+    """
+    Returns: dict of "LIMITS", "IIASA" and "shock cube" -> memory usage report of the shared
+        objects loaded so far (see LimitsConnection.memory_usage)
+    """
+    usage = {}
+    if _limits_connection is not None:
+        usage["LIMITS"] = _limits_connection.memory_usage()
+    if _iiasa_connection is not None and _iiasa_connection.mirror is not None:
+        usage["IIASA"] = _iiasa_connection.memory_usage()
+    if _shock_cube is not None:
+        usage["shock cube"] = _shock_cube.memory_usage()
+    return usage
+
+
+def get_data_version():
+    """
+    Returns: version of the shared data, changes whenever the connections are reset
+    """
+    return _data_version
+
+
+def reset():
+    """
+    Drops the shared connections, they are reloaded on next use (e.g. after LIMITS.csv changed)
+    """
+    global _limits_connection, _shock_cube, _iiasa_connection, _data_version
+    with _lock:
+        _limits_connection = None
+        _shock_cube = None
+        _iiasa_connection = None
+        _data_version += 1
+        if _evaluation_cache is not None:
+            _evaluation_cache.clear()
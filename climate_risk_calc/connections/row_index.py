@@ -0,0 +1,86 @@
+import numpy as np
+
+
+class RowIndex:
+    """
+    Row positions per label for every integer coded dimension of a table.
+    A selection over several dimensions is the intersection of the precomputed row sets,
+    its cost grows with the smallest row set instead of the size of the table
+    """
+
+    def __init__(self, labels, codes, positions=None, offsets=None):
+        """
+        Args:
+            labels: dict of dimension -> list of labels
+            codes: dict of dimension -> integer code (position in labels) of every row
+            positions: dict of dimension -> rows grouped by code as built by a RowIndex over
+                the same codes (e.g. attached from shared memory), computed if None
+            offsets: dict of dimension -> start of every code in positions, with positions
+        """
+        self.labels = labels
+        self.codes = {d: np.asarray(c) for d, c in codes.items()}
+        self.lookup = {d: {label: i for i, label in enumerate(labels[d])} for d in codes}
+        if positions is not None:
+            self.positions = positions
+            self.offsets = offsets
+            return
+        self.positions = {}
+        self.offsets = {}
+        for dimension, dimension_codes in self.codes.items():
+            # rows grouped by code: rows of code i are positions[offsets[i]:offsets[i + 1]]
+            order = np.argsort(dimension_codes, kind="stable")
+            if len(order) <= np.iinfo(np.int32).max:
+                order = order.astype(np.int32)
+            self.positions[dimension] = order
+            self.offsets[dimension] = np.searchsorted(
+                dimension_codes[order], np.arange(len(labels[dimension]) + 1)
+            )
+
+    def get_codes(self, dimension, labels):
+        """
+        Args:
+            dimension: name of the dimension
+            labels: list of labels, labels not in the table are ignored
+        Returns: numpy array of codes of the labels
+        """
+        lookup = self.lookup[dimension]
+        return np.array([lookup[l] for l in labels if l in lookup], dtype=np.int64)
+
+    def count(self, dimension, codes):
+        """
+        Returns: number of rows having one of the codes in dimension
+        """
+        offsets = self.offsets[dimension]
+        return int((offsets[codes + 1] - offsets[codes]).sum())
+
+    def rows(self, dimension, codes):
+        """
+        Returns: unsorted numpy array of positions of rows having one of the codes in dimension
+        """
+        offsets = self.offsets[dimension]
+        positions = self.positions[dimension]
+        return np.concatenate(
+            [positions[offsets[c] : offsets[c + 1]] for c in codes]
+            + [np.empty(0, dtype=positions.dtype)]
+        )
+
+    def select(self, **selection):
+        """
+        Args:
+            **selection: dimension -> list of labels, dimensions not given are not filtered
+        Returns: sorted numpy array of positions of the rows matching all dimensions
+        """
+        codes = {d: self.get_codes(d, labels) for d, labels in selection.items()}
+        if not codes:
+            return np.arange(len(next(iter(self.codes.values()))))
+        # start from the smallest row set and filter it by the other dimensions
+        first = min(codes, key=lambda d: self.count(d, codes[d]))
+        rows = self.rows(first, codes[first])
+        for dimension, dimension_codes in codes.items():
+            if dimension == first or len(rows) == 0:
+                continue
+            mask = np.zeros(len(self.labels[dimension]), dtype=bool)
+            mask[dimension_codes] = True
+            rows = rows[mask[self.codes[dimension][rows]]]
+        rows.sort()
+        return rows
@@ -0,0 +1,161 @@
+"""
+Publishing of the loaded scenario data to worker processes, e.g.
+
+    with SharedData(get_limits_connection(), get_shock_cube()) as shared:
+        with ProcessPoolExecutor(initializer=initialize_worker, initargs=(shared.path,)):
+            ...
+
+The owner writes the columns, the row index and the shock cube once as .npy files into a
+directory in shared memory (/dev/shm where available, else the temp directory). Workers
+memory-map them read-only, so all processes share the same pages instead of parsing
+LIMITS.csv and building the shock cube each. The directory is removed by close(), at exit
+of the owner, or by the next owner if the owning process died.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+from climate_risk_calc.connections import columnar_cache, registry
+from climate_risk_calc.connections.indexed_data import IndexedData
+from climate_risk_calc.connections.limits_connection import LimitsConnection
+from climate_risk_calc.connections.row_index import RowIndex
+from climate_risk_calc.tools import timing
+from climate_risk_calc.tools.shock_cube import ShockCube
+
+SHARED_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+PREFIX = "climate_risk_shared_"
+
+
+def _owner_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # e.g. no permission to signal the process, it exists
+        return True
+    return True
+
+
+def remove_stale(root=SHARED_ROOT):
+    """
+    Removes directories left behind by owners that did not exit cleanly
+    Args:
+        root: directory containing the published data
+    Returns: number of removed directories
+    """
+    removed = 0
+    for name in os.listdir(root):
+        if not name.startswith(PREFIX):
+            continue
+        try:
+            pid = int(name[len(PREFIX) :].split("_")[0])
+        except ValueError:
+            continue
+        if pid != os.getpid() and not _owner_alive(pid):
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+            removed += 1
+    return removed
+
+
+class SharedData:
+    """
+    Scenario data of a LimitsConnection (and its ShockCube) published for worker processes,
+    owned by the publishing process. Only the path is passed to the workers (see attach)
+    """
+
+    @timing.spanned("SharedData.publish")
+    def __init__(self, limits_connection, shock_cube=None, root=SHARED_ROOT):
+        """
+        Args:
+            limits_connection: LimitsConnection with the data to publish
+            shock_cube: ShockCube of limits_connection to publish, workers build their own
+                on first use if None
+            root: directory in which the data is published
+        """
+        remove_stale(root)
+        self.path = tempfile.mkdtemp(prefix=PREFIX + str(os.getpid()) + "_", dir=root)
+        atexit.register(self.close)
+        data = limits_connection.data
+        row_index = data.row_index
+        columns = dict(data.columns)
+        for dimension, positions in row_index.positions.items():
+            prefix = "row_index." + dimension
+            columns[prefix + ".positions"] = positions
+            columns[prefix + ".offsets"] = row_index.offsets[dimension]
+        if shock_cube is not None:
+            columns["shock_cube.shares"] = shock_cube.shares
+            columns["shock_cube.shocks"] = shock_cube.shocks
+            columns["shock_cube.share_codes"] = shock_cube.share_codes
+        attributes = dict(data.attributes)
+        attributes["row_index"] = list(row_index.positions)
+        attributes["shock_cube"] = shock_cube is not None
+        try:
+            columnar_cache.store_columns(self.path, None, columns, attributes)
+        except BaseException:
+            self.close()
+            raise
+        self.nbytes = sum(c.nbytes for c in columns.values())
+
+    def close(self):
+        """
+        Removes the published data, workers that still have it mapped keep their mapping
+        """
+        if self.path is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.path = None
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@timing.spanned("SharedData.attach")
+def attach(path):
+    """
+    Args:
+        path: path of data published by SharedData
+    Returns: tuple of LimitsConnection and ShockCube (None if not published) over read-only
+        memory-mapped arrays of the published data
+    """
+    loaded = columnar_cache.load_columns(path)
+    if loaded is None:
+        raise ValueError("No shared scenario data at " + path)
+    arrays, attributes = loaded
+    columns = {
+        name: array
+        for name, array in arrays.items()
+        if not name.startswith(("row_index.", "shock_cube."))
+    }
+    dimensions = attributes["row_index"]
+    row_index = RowIndex(
+        {d: columns[d + ".levels"].tolist() for d in dimensions},
+        {d: columns[d + ".codes"] for d in dimensions},
+        positions={d: arrays["row_index." + d + ".positions"] for d in dimensions},
+        offsets={d: arrays["row_index." + d + ".offsets"] for d in dimensions},
+    )
+    data = IndexedData(columns, attributes, row_index=row_index)
+    limits_connection = LimitsConnection.from_data(data)
+    shock_cube = None
+    if attributes["shock_cube"]:
+        shock_cube = ShockCube.from_arrays(
+            limits_connection,
+            arrays["shock_cube.shares"],
+            arrays["shock_cube.shocks"],
+            arrays["shock_cube.share_codes"],
+        )
+    return limits_connection, shock_cube
+
+
+def initialize_worker(path):
+    """
+    Initializer of worker processes, e.g. of a ProcessPoolExecutor: the calculator of the
+    worker uses the published data
+    Args:
+        path: path of data published by SharedData
+    """
+    registry.use_limits_connection(*attach(path))
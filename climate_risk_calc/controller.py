@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import ttk
+from climate_risk_calc.tools import timing
 from climate_risk_calc.views.v_home_screen import HomeScreen
 
 
@@ -14,13 +15,20 @@ def start_view():
     root.resizable(False, False)
     root.columnconfigure(0, weight=1)
     root.rowconfigure(0, weight=1)
-    frame = HomeScreen(root)
-    frame.initialize()
-    frame.grid(row=0, column=0, sticky="nsew")
-    frame.tkraise()
+    with timing.timed("Build home screen"):
+        frame = HomeScreen(root)
+        frame.initialize()
+        frame.grid(row=0, column=0, sticky="nsew")
+        frame.tkraise()
+    root.after_idle(show_startup_report)
     root.mainloop()
     print("[INFO] Program terminated")
 
 
+def show_startup_report():
+    timing.mark("First window shown")
+    timing.report()
+
+
 def switch_view(new_view):
     new_view.tkraise()
@@ -1,87 +1,222 @@
-from math import ceil
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+import numpy as np
 import pandas as pd
-import pyam
 
+from climate_risk_calc.connections.coded_frame import CodedFrame
 from climate_risk_calc.connections.limits_connection import LimitsConnection
+from climate_risk_calc.connections.registry import get_limits_connection, get_shock_cube
+from climate_risk_calc.tools import timing
+from climate_risk_calc.tools.risk_statistics import ShockStatistics
+from climate_risk_calc.tools.variable_tree import VariableTree
 
+# default grid of get_top_shocks
+TOP_SHOCK_MODELS = ["GCAM", "WITCH"]
+TOP_SHOCK_SCENARIOS = [
+    "LIMITS-RefPol-450",
+    "LIMITS-RefPol-500",
+    "LIMITS-StrPol-450",
+    "LIMITS-StrPol-500",
+]
+# number of loans read at once when streaming a portfolio
+CHUNKSIZE = 100000
+SHOCK_HIGHLIGHT_COLUMNS = [
+    "min_shock",
+    "max_shock",
+    "total_neg",
+    "total_pos",
+    "total_neg_rel",
+]
 
-def get_base_sector(variable):
+
+def _label_codes(frame, other, level):
+    # codes of the rows of other in the labels of frame, -1 for labels frame does not have
+    labels = frame.levels(level)
+    other_labels = other.levels(level)
+    if len(labels) == 0:
+        return np.full(len(other), -1)
+    positions = np.searchsorted(labels, other_labels).clip(max=len(labels) - 1)
+    positions[labels[positions] != other_labels] = -1
+    return positions[other.codes(level)]
+
+
+def _matching_rows(frame, other, levels):
     """
     Args:
-        variable: String of sector variable like "Secondary Energy|Electricity|Coal"
-    Returns: Base sector of variable, i.e. removing the last subpart: "Secondary Energy|Electricity"
+        frame: CodedFrame
+        other: CodedFrame
+        levels: index levels on which the rows are matched
+    Returns: numpy array with the row of other matching every row of frame, -1 if none
     """
-    base = str.rsplit(variable, "|", 1)
-    return base[0]
+    shape = [len(frame.levels(level)) for level in levels]
+    keys = np.ravel_multi_index([frame.codes(level) for level in levels], shape)
+    other_codes = [_label_codes(frame, other, level) for level in levels]
+    valid = np.logical_and.reduce([codes >= 0 for codes in other_codes])
+    if not valid.any():
+        return np.full(len(frame), -1)
+    other_keys = np.ravel_multi_index([codes[valid] for codes in other_codes], shape)
+    other_rows = np.flatnonzero(valid)
+    order = np.argsort(other_keys, kind="stable")
+    other_keys, other_rows = other_keys[order], other_rows[order]
+    positions = np.searchsorted(other_keys, keys).clip(max=len(other_keys) - 1)
+    return np.where(other_keys[positions] == keys, other_rows[positions], -1)
+
+
+def _with_values(frame, values):
+    # like pyam, rows without value (e.g. 0 / 0) are dropped
+    result = CodedFrame(dict(frame.columns, value=values), frame.attributes)
+    return result.take(~np.isnan(values))
 
 
+@timing.spanned()
 def get_market_share_shocks(dataframe, as_percent=True, show_till_2050=False):
     """
     Args:
-        dataframe: dataframe with necessary data, i.e. data for 2 scenarios, 1 sector, x regions
+        dataframe: CodedFrame (or IamDataFrame) with necessary data, i.e. data for 2 scenarios,
+            1 sector, x regions
         as_percent: indicator whether shocks should be returned as percentages
         show_till_2050: indicator whether data after 2050 should be omitted
-    Returns: IamDataframe with market share shock data
+    Returns: CodedFrame with market share shock data
     """
-    scenarios = dataframe.data["scenario"].unique().tolist()
-    scenarios = sorted(scenarios, key=len)
+    if not isinstance(dataframe, CodedFrame):
+        dataframe = CodedFrame.from_iamdataframe(dataframe)
+    scenarios = sorted(dataframe.labels("scenario"), key=len)
     if len(scenarios) != 2:
         raise ValueError("Scenarios not valid")
     base_scenario_df = get_market_shares(dataframe.filter(scenario=scenarios[0]))
     compared_scenario_df = get_market_shares(dataframe.filter(scenario=scenarios[1]))
-    shocks = pd.DataFrame()
-    shocks["shock"] = (
-        compared_scenario_df["value"] - base_scenario_df["value"]
-    ) / base_scenario_df["value"]
+    # rows of the same region and year in both scenarios
+    rows = _matching_rows(
+        compared_scenario_df,
+        base_scenario_df,
+        [n for n in compared_scenario_df.index if n != "scenario"],
+    )
+    compared_scenario_df = compared_scenario_df.take(rows >= 0)
+    base_values = base_scenario_df.values[rows[rows >= 0]]
+    shocks = (compared_scenario_df.values - base_values) / base_values
     if as_percent:
-        shocks["shock"] = shocks["shock"] * 100
-    shock_iamdf = compared_scenario_df.data
-    shock_iamdf["value"] = shocks["shock"]
-    shock_iamdf["variable"] = "shock"
+        shocks = shocks * 100
+    shock_df = _with_values(compared_scenario_df, shocks).replace_level(
+        "variable", "shock"
+    )
     if show_till_2050:
-        shock_iamdf.query("year <=2050", inplace=True)
-    return pyam.IamDataFrame(shock_iamdf)
+        time_col = shock_df.time_col
+        shock_df = shock_df.take(
+            shock_df.levels(time_col)[shock_df.codes(time_col)] <= 2050
+        )
+    return shock_df.sort()
 
 
+@timing.spanned()
 def get_market_shares(dataframe, as_percent=True):
     """
     Args:
-        dataframe: dataframe with necessary data, i.e. data for 2 scenarios, 1 sector, x regions
+        dataframe: CodedFrame (or IamDataFrame) with necessary data, i.e. data for a sector
+            and its base sector
         as_percent: indicator whether shocks should be returned as percentages
-    Returns: IamDataframe with market share data
+    Returns: CodedFrame with market share data
     """
-    variables = dataframe.data["variable"].unique().tolist()
-    variables = sorted(variables, key=len)
-    market_shares = dataframe.divide(
-        a=variables[1], b=variables[0], name="Market Share", ignore_units=True
+    if not isinstance(dataframe, CodedFrame):
+        dataframe = CodedFrame.from_iamdataframe(dataframe)
+    variables = dataframe.labels("variable")
+    pairs = VariableTree(variables).share_pairs()
+    if len(pairs) != 1:
+        raise ValueError(
+            "Variables must be one sector and its base sector: " + str(variables)
+        )
+    sector, base_sector = pairs[0]
+    sector_df = dataframe.filter(variable=sector)
+    base_sector_df = dataframe.filter(variable=base_sector)
+    # units are ignored, the shares are matched on all other index levels
+    rows = _matching_rows(
+        sector_df,
+        base_sector_df,
+        [n for n in dataframe.index if n not in ("variable", "unit")],
     )
+    sector_df = sector_df.take(rows >= 0)
+    market_shares = sector_df.values / base_sector_df.values[rows[rows >= 0]]
     if as_percent:
-        market_shares = market_shares.multiply(
-            a="Market Share", b=100, name="Market Share", ignore_units=True
+        market_shares = market_shares * 100
+    market_shares = _with_values(sector_df, market_shares)
+    market_shares = market_shares.replace_level("variable", "Market Share")
+    return market_shares.replace_level("unit", "unknown").sort()
+
+
+@timing.spanned()
+def get_shock_table(model, ref_scenario, pairs, year):
+    """
+    Looks up the clipped market share shock of every distinct (region, sector) pair
+    Args:
+        model: model for which to calculate shocks
+        ref_scenario: reference scenario compared to the base scenario
+        pairs: dataframe with columns "region" and "sector"
+        year: year for which to calculate shocks
+    Returns: pandas dataframe with columns "region", "sector" and "shock"
+    """
+    table = pairs[["region", "sector"]].drop_duplicates().reset_index(drop=True)
+    shocks = get_shock_cube().lookup_shocks(
+        model, ref_scenario, table["region"], table["sector"], year
+    )
+    missing = np.isnan(shocks)
+    if missing.any():
+        raise ValueError(
+            "No shock data in " + str(year) + " for (region, sector): "
+            + ", ".join(str(p) for p in table[missing].itertuples(index=False, name=None))
         )
-    return market_shares
+    shocks[shocks >= 1] = 1
+    table["shock"] = shocks
+    return table
+
 
+def _factorize_portfolio(loans):
+    """
+    Args:
+        loans: credit portfolio dataframe with columns "region" and "sector"
+    Returns: tuple of (integer code of every loan, dataframe of the distinct (region, sector) pairs)
+    """
+    codes, pairs = pd.MultiIndex.from_frame(loans[["region", "sector"]]).factorize()
+    return codes, pairs.to_frame(index=False, name=["region", "sector"])
 
-def get_single_shock(dataframe_source, region, sector, year):
+
+@timing.spanned()
+def get_loan_shocks(loans, model, ref_scenario, year):
     """
     Args:
-        dataframe_source: dataframe with necessary data
-        region: region for which to calculate shock
-        sector: sector for which to calculate shock
-        year: year for which to calculate shock
-    Returns: single shock as float
-    """
-    base_sector = get_base_sector(sector)
-    sectors = [sector, base_sector]
-    df = pyam.IamDataFrame(
-        dataframe_source.data.query("variable in @sectors & region == @region")
+        loans: credit portfolio dataframe with columns "region" and "sector"
+        model: model for which to calculate shocks
+        ref_scenario: reference scenario compared to the base scenario
+        year: year of shock occurrence
+    Returns: numpy array with the clipped market share shock of every loan, not yet
+        scaled by amount, recovery rate and elasticity (see scale_shocks)
+    """
+    # one shock per distinct (region, sector), applied to all loans by their pair code
+    codes, pairs = _factorize_portfolio(loans)
+    shock_table = get_shock_table(model, ref_scenario, pairs=pairs, year=year)
+    return shock_table["shock"].to_numpy()[codes]
+
+
+@timing.spanned()
+def scale_shocks(amounts, loan_shocks, recovery_rate, elasticity):
+    """
+    Returns: numpy array with the shock of every loan, amount * (1 - recovery_rate) * elasticity * shock
+    """
+    return amounts * (1 - recovery_rate) * elasticity * loan_shocks
+
+
+def _scale_shocks(
+    amounts, codes, pairs, model, ref_scenario, year, recovery_rate, elasticity
+):
+    """
+    Returns: scale_shocks for an already factorized portfolio
+    """
+    shock_table = get_shock_table(model, ref_scenario, pairs=pairs, year=year)
+    return scale_shocks(
+        amounts, shock_table["shock"].to_numpy()[codes], recovery_rate, elasticity
     )
-    shocks = get_market_share_shocks(df, as_percent=False).data
-    shocks.loc[shocks["value"] >= 1, "value"] = 1
-    shocks = shocks.query("year == @year")
-    return shocks["value"].item()
 
 
+@timing.spanned()
 def get_shocks(model, ref_scenario, year, file_name, recovery_rate=0, elasticity=1):
     """
     Args:
@@ -94,113 +229,380 @@ def get_shocks(model, ref_scenario, year, file_name, recovery_rate=0, elasticity
     Returns: credit portfolio dataframe with added column "shock"
     """
     pd.set_option("display.float_format", "{:.2f}".format)
-    loans = pd.read_csv(file_name, encoding="UTF-8")
-    lc = LimitsConnection()
-    scenarios = "LIMITS-Base," + ref_scenario
-    variables = loans["sector"].unique().tolist()
-    all_sectors = []
-    # reduce repeated querying of large dataset by filtering as much as possible before For-loop
-    for var in variables:
-        all_sectors.append(var)
-        all_sectors.append(get_base_sector(var))
-    all_sectors = list(set(all_sectors))
-    df = pyam.IamDataFrame(
-        lc.execute_query(
-            model=model, scenario=scenarios, region="all", variable=all_sectors
-        )
+    with timing.span("read portfolio"):
+        loans = pd.read_csv(file_name, encoding="UTF-8")
+    loans["shock"] = scale_shocks(
+        loans["amount"].to_numpy(dtype=float),
+        get_loan_shocks(loans, model, ref_scenario, year),
+        recovery_rate,
+        elasticity,
     )
-    loans["shock"] = 0
-
-    for index in loans.index:
-        loans.at[index, "shock"] = (
-            loans.at[index, "amount"]
-            * (1 - recovery_rate)
-            * elasticity
-            * get_single_shock(
-                dataframe_source=df,
-                region=loans.at[index, "region"],
-                sector=loans.at[index, "sector"],
-                year=year,
-            )
-        )
-    loans = loans
     return loans
 
 
-def get_top_shocks(
+def _portfolio_summary(file_name, chunksize):
+    """
+    Args:
+        file_name: file path of credit portfolio CSV-file
+        chunksize: number of loans read at once
+    Returns: tuple of (number of loans, total amount), reading only the amount column
+    """
+    n_entries, total = 0, 0
+    with pd.read_csv(
+        file_name, encoding="UTF-8", usecols=["amount"], chunksize=chunksize
+    ) as chunks:
+        for chunk in chunks:
+            n_entries += chunk.shape[0]
+            total += chunk["amount"].sum()
+    return n_entries, total
+
+
+@timing.spanned()
+def write_shocks(
+    model,
+    ref_scenario,
     year,
     file_name,
+    output_file,
     recovery_rate=0,
     elasticity=1,
-    scenarios=None,
-    models=None,
+    chunksize=CHUNKSIZE,
     confidence_level=0.95,
 ):
     """
+    Streaming variant of get_shocks for portfolios that do not fit into memory, the portfolio
+    is shocked chunk by chunk and written to output_file
     Args:
+        model: model for which to calculate shocks
+        ref_scenario: reference scenario for which to calculate shocks
         year: year of shock occurrence
         file_name: file path of credit portfolio CSV-file
+        output_file: file path of the CSV-file the shocked portfolio is written to
         recovery_rate: assumed recovery rate
         elasticity: assumed elasticity
-        scenarios: list of scenarios for which to calculate shocks
-        models: list of models for which to calculate shocks
-        confidence_level: confidence level for calculating Value at Risk
-    Returns: pandas dataframe with shock highlight data
+        chunksize: number of loans read at once
+        confidence_level: (list of) confidence level(s) for Value at Risk and expected shortfall
+    Returns: dict with the shock highlights of the portfolio, see ShockStatistics.result
     """
-    loans = pd.read_csv(file_name, encoding="UTF-8")
-    total = loans["amount"].sum()
-    n_entries = loans.shape[0]
-    # value_at_risk_index = n_entries - floor(n_entries * confidence_level)
-    value_at_risk_index = ceil(n_entries * confidence_level)
-    scenarios = [
-        "LIMITS-RefPol-450",
-        "LIMITS-RefPol-500",
-        "LIMITS-StrPol-450",
-        "LIMITS-StrPol-500",
-    ]
-    models = ["GCAM", "WITCH"]
-    shock_highlights = []
-    for model in models:
-        for scenario in scenarios:
-            df = get_shocks(
+    levels = confidence_level if isinstance(confidence_level, list) else [confidence_level]
+    n_entries, total = _portfolio_summary(file_name, chunksize)
+    statistics = ShockStatistics(n_entries, total, levels)
+    first = True
+    with pd.read_csv(file_name, encoding="UTF-8", chunksize=chunksize) as chunks:
+        for loans in chunks:
+            codes, pairs = _factorize_portfolio(loans)
+            loans["shock"] = _scale_shocks(
+                loans["amount"].to_numpy(dtype=float),
+                codes,
+                pairs,
                 model,
-                ref_scenario=scenario,
-                year=year,
-                recovery_rate=recovery_rate,
-                elasticity=elasticity,
-                file_name=file_name,
+                ref_scenario,
+                year,
+                recovery_rate,
+                elasticity,
             )
-            df = df.sort_values(["shock"], ascending=[False])
-            df = df.reset_index(drop=True)
-            shock_highlights.append(
-                [
-                    model,
-                    scenario,
-                    df.min(axis=0)["shock"],
-                    df.max(axis=0)["shock"],
-                    df.query("shock < 0").sum(axis=0)["shock"],
-                    df.query("shock > 0").sum(axis=0)["shock"],
-                    df.query("shock < 0").sum(axis=0)["shock"] / total,
-                    df.at[value_at_risk_index, "shock"],
-                ]
+            statistics.update(loans["shock"].to_numpy())
+            loans.to_csv(
+                output_file, mode="w" if first else "a", header=first, index=False
             )
-    top_shocks = pd.DataFrame(
-        data=shock_highlights,
-        columns=(
-            "model",
-            "scenario",
-            "min_shock",
-            "max_shock",
-            "total_neg",
-            "total_pos",
-            "total_neg_rel",
-            "project_VaR",
-        ),
+            first = False
+    return statistics.result()
+
+
+@timing.spanned()
+def get_scenario_grid(models=None, scenarios=None):
+    """
+    Args:
+        models: list of models, defaults to TOP_SHOCK_MODELS
+        scenarios: list of scenarios, "all" for every scenario of the model in the catalog,
+            defaults to TOP_SHOCK_SCENARIOS
+    Returns: list of (model, scenario) tuples in deterministic order
+    """
+    if models is None:
+        models = TOP_SHOCK_MODELS
+    if scenarios is None:
+        scenarios = TOP_SHOCK_SCENARIOS
+    grid = []
+    for model in models:
+        if isinstance(scenarios, str) and scenarios.lower() == LimitsConnection.wildcard:
+            model_scenarios = [
+                s
+                for s in get_limits_connection().get_scenarios(model)
+                if s != get_shock_cube().base_scenario
+            ]
+        else:
+            model_scenarios = scenarios
+        grid.extend((model, scenario) for scenario in model_scenarios)
+    return grid
+
+
+@timing.spanned()
+def get_shock_trajectory_table(model, ref_scenario, pairs, years):
+    """
+    Looks up the clipped market share shocks of every distinct (region, sector) pair for
+    several years at once
+    Args:
+        model: model for which to calculate shocks
+        ref_scenario: reference scenario compared to the base scenario
+        pairs: dataframe with columns "region" and "sector", distinct pairs
+        years: list of years
+    Returns: numpy array with one row per pair and one column per year, NaN where the
+        scenario data has no shock
+    """
+    shocks = get_shock_cube().lookup_shock_trajectories(
+        model, ref_scenario, pairs["region"], pairs["sector"], years
+    )
+    shocks[shocks >= 1] = 1
+    return shocks
+
+
+def _trajectory_years(years):
+    if years is None:
+        return [int(y) for y in get_shock_cube().labels["year"]]
+    return list(years)
+
+
+@timing.spanned()
+def get_shock_trajectories(
+    model, ref_scenario, file_name, recovery_rate=0, elasticity=1, years=None
+):
+    """
+    Trajectory mode of get_shocks: shocks of every loan in every year in one pass
+    Args:
+        model: model for which to calculate shocks
+        ref_scenario: reference scenario compared to the base scenario
+        file_name: file path of credit portfolio CSV-file
+        recovery_rate: assumed recovery rate
+        elasticity: assumed elasticity
+        years: list of years, defaults to all years of the scenario data
+    Returns: loans × years matrix as pandas dataframe: the portfolio columns and one column
+        of shocks per year, NaN where the scenario data has no shock
+    """
+    years = _trajectory_years(years)
+    with timing.span("read portfolio"):
+        loans = pd.read_csv(file_name, encoding="UTF-8")
+    codes, pairs = _factorize_portfolio(loans)
+    table = get_shock_trajectory_table(model, ref_scenario, pairs, years)
+    shocks = scale_shocks(
+        loans["amount"].to_numpy(dtype=float)[:, np.newaxis],
+        table[codes],
+        recovery_rate,
+        elasticity,
     )
+    return pd.concat([loans, pd.DataFrame(shocks, columns=years)], axis=1)
+
+
+@timing.spanned()
+def get_portfolio_trajectories(
+    file_name,
+    recovery_rate=0,
+    elasticity=1,
+    scenarios=None,
+    models=None,
+    years=None,
+):
+    """
+    Portfolio totals per model/scenario and year. Loans of the same (region, sector) pair
+    share their shocks, so the totals are computed on the summed amounts of every pair
+    instead of a loans × years matrix
+    Args:
+        file_name: file path of credit portfolio CSV-file
+        recovery_rate: assumed recovery rate
+        elasticity: assumed elasticity
+        scenarios: list of scenarios, "all" for every scenario of the models, defaults to
+            TOP_SHOCK_SCENARIOS
+        models: list of models, defaults to TOP_SHOCK_MODELS
+        years: list of years, defaults to all years of the scenario data
+    Returns: pandas dataframe with columns model, scenario, year, total_neg, total_pos and
+        total_neg_rel in grid and year order, NaN in years without shock data for a loan
+    """
+    years = _trajectory_years(years)
+    with timing.span("read portfolio"):
+        loans = pd.read_csv(file_name, encoding="UTF-8")
+    amounts = loans["amount"].to_numpy(dtype=float)
+    total = amounts.sum()
+    codes, pairs = _factorize_portfolio(loans)
+    # positive and negative amounts apart, their shocks have opposite signs
+    pair_amounts = [
+        np.bincount(codes, weights=np.maximum(amounts, 0), minlength=len(pairs)),
+        np.bincount(codes, weights=np.minimum(amounts, 0), minlength=len(pairs)),
+    ]
+    rows = []
+    for model, scenario in get_scenario_grid(models, scenarios):
+        table = get_shock_trajectory_table(model, scenario, pairs, years)
+        total_neg = np.zeros(len(years))
+        total_pos = np.zeros(len(years))
+        for weights in pair_amounts:
+            shocks = scale_shocks(
+                weights[:, np.newaxis], table, recovery_rate, elasticity
+            )
+            total_neg += np.nansum(np.minimum(shocks, 0), axis=0)
+            total_pos += np.nansum(np.maximum(shocks, 0), axis=0)
+        missing = np.isnan(table).any(axis=0)
+        total_neg[missing] = np.nan
+        total_pos[missing] = np.nan
+        rows.append(
+            pd.DataFrame(
+                {
+                    "model": model,
+                    "scenario": scenario,
+                    "year": years,
+                    "total_neg": total_neg,
+                    "total_pos": total_pos,
+                    "total_neg_rel": total_neg / total,
+                }
+            )
+        )
+    return pd.concat(rows, ignore_index=True)
+
+
+@timing.spanned()
+def get_top_shock_statistics(
+    year,
+    file_name,
+    recovery_rate=0,
+    elasticity=1,
+    scenarios=None,
+    models=None,
+    confidence_level=0.95,
+    max_workers=None,
+    chunksize=None,
+    progress=None,
+):
+    """
+    Args:
+        year: year of shock occurrence
+        file_name: file path of credit portfolio CSV-file
+        recovery_rate: assumed recovery rate
+        elasticity: assumed elasticity
+        scenarios: list of scenarios for which to calculate shocks, "all" for every
+            scenario of the models, defaults to TOP_SHOCK_SCENARIOS
+        models: list of models for which to calculate shocks, defaults to TOP_SHOCK_MODELS
+        confidence_level: (list of) confidence level(s) for calculating Value at Risk and
+            expected shortfall
+        max_workers: number of threads evaluating the model/scenario grid, defaults to
+            the number of cores
+        chunksize: if given, the portfolio is streamed in chunks of this many loans
+            instead of being loaded at once
+        progress: function called with a message after every model/scenario cell, an
+            exception raised by it aborts the calculation
+    Returns: pandas dataframe with unrounded shock highlight data in grid order, without
+        rows if the grid is empty
+    """
+    levels = confidence_level if isinstance(confidence_level, list) else [confidence_level]
+    # a single confidence level keeps the plain column names
+    suffixes = [""] if len(levels) == 1 else ["_" + format(c, "g") for c in levels]
+    columns = ["model", "scenario"] + SHOCK_HIGHLIGHT_COLUMNS
+    columns += ["project_VaR" + x for x in suffixes]
+    columns += ["expected_shortfall" + x for x in suffixes]
+    grid = get_scenario_grid(models, scenarios)
+    if not grid:
+        return pd.DataFrame(columns=columns)
+    if chunksize is None:
+        with timing.span("read portfolio"):
+            loans = pd.read_csv(file_name, encoding="UTF-8")
+        n_entries, total = loans.shape[0], loans["amount"].sum()
+        reader = nullcontext([loans])
+    else:
+        n_entries, total = _portfolio_summary(file_name, chunksize)
+        reader = pd.read_csv(file_name, encoding="UTF-8", chunksize=chunksize)
+    statistics = [ShockStatistics(n_entries, total, levels) for _ in grid]
+    # build the shared cube before the workers start using it
+    get_shock_cube()
+
+    # the cells only share read-only data, each cell updates its own statistics
+    with reader as chunks, ThreadPoolExecutor(
+        max_workers=max_workers or os.cpu_count()
+    ) as executor:
+        for loans in chunks:
+            amounts = loans["amount"].to_numpy(dtype=float)
+            codes, pairs = _factorize_portfolio(loans)
+
+            def evaluate(i):
+                model, scenario = grid[i]
+                statistics[i].update(
+                    _scale_shocks(
+                        amounts,
+                        codes,
+                        pairs,
+                        model,
+                        scenario,
+                        year,
+                        recovery_rate,
+                        elasticity,
+                    )
+                )
+                if progress is not None:
+                    progress("Evaluated " + model + ", " + scenario)
+
+            list(executor.map(timing.propagated(evaluate), range(len(grid))))
+            if progress is not None:
+                progress(
+                    "Evaluated "
+                    + str(statistics[0].count)
+                    + " of "
+                    + str(n_entries)
+                    + " loans"
+                )
+    results = [(list(cell), stats.result()) for cell, stats in zip(grid, statistics)]
+    shock_highlights = [
+        cell
+        + [stats[c] for c in SHOCK_HIGHLIGHT_COLUMNS]
+        + stats["project_VaR"]
+        + stats["expected_shortfall"]
+        for cell, stats in results
+    ]
+    return pd.DataFrame(data=shock_highlights, columns=columns)
+
+
+@timing.spanned()
+def round_top_shocks(top_shocks):
+    """
+    Args:
+        top_shocks: dataframe as returned by get_top_shock_statistics
+    Returns: dataframe with rounded shock highlights, sorted by scenario
+    """
+    columns = top_shocks.columns
     top_shocks = top_shocks.round({"total_neg": 2})
-    top_shocks = top_shocks.round({"project_VaR": 2})
+    top_shocks = top_shocks.round({c: 2 for c in columns if c.startswith("project_VaR")})
+    top_shocks = top_shocks.round(
+        {c: 2 for c in columns if c.startswith("expected_shortfall")}
+    )
     top_shocks = top_shocks.round({"min_shock": 2})
     top_shocks = top_shocks.round({"max_shock": 2})
 
-    top_shocks.sort_values(by="scenario", ascending=True, inplace=True)
+    top_shocks.sort_values(by="scenario", ascending=True, inplace=True, kind="stable")
     return top_shocks
+
+
+@timing.spanned()
+def get_top_shocks(
+    year,
+    file_name,
+    recovery_rate=0,
+    elasticity=1,
+    scenarios=None,
+    models=None,
+    confidence_level=0.95,
+    max_workers=None,
+    chunksize=None,
+    progress=None,
+):
+    """
+    Args: as get_top_shock_statistics
+    Returns: pandas dataframe with shock highlight data
+    """
+    return round_top_shocks(
+        get_top_shock_statistics(
+            year,
+            file_name,
+            recovery_rate=recovery_rate,
+            elasticity=elasticity,
+            scenarios=scenarios,
+            models=models,
+            confidence_level=confidence_level,
+            max_workers=max_workers,
+            chunksize=chunksize,
+            progress=progress,
+        )
+    )
@@ -0,0 +1,171 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from climate_risk_calc.connections import columnar_cache
+from climate_risk_calc.connections.registry import get_data_version
+from climate_risk_calc.tools import calculator
+
+# memory bound of all cached results
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _key_part(value):
+    # lists are not hashable, "all" and None stay as they are
+    return tuple(value) if isinstance(value, list) else value
+
+
+class EvaluationCache:
+    """
+    LRU cache of loan evaluations and top shock tables, bounded by the memory of the cached
+    results. Entries are keyed on the portfolio content, the data version, model/scenario
+    and year and hold the results for recovery rate 0 and elasticity 1. Shocks are linear in
+    (1 - recovery_rate) * elasticity, other slider values only rescale a cached entry
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            max_bytes: maximum memory of all cached results
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, size in bytes)
+        self._size = 0
+        self._digests = {}  # file name -> (mtime/size signature, sha256)
+        self._lock = threading.Lock()
+
+    def portfolio_digest(self, file_name):
+        """
+        The content is only hashed again if mtime or size of the file changed
+        Args:
+            file_name: file path of credit portfolio CSV-file
+        Returns: sha256 of the file content
+        """
+        signature = columnar_cache.file_signature(file_name, with_digest=False)
+        known = self._digests.get(file_name)
+        if known is not None and known[0] == signature:
+            return known[1]
+        digest = columnar_cache.file_signature(file_name)["sha256"]
+        self._digests[file_name] = (signature, digest)
+        return digest
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def _put(self, key, value, size):
+        with self._lock:
+            if size > self.max_bytes:
+                return
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def size(self):
+        """
+        Returns: memory of all cached results in bytes
+        """
+        return self._size
+
+    def get_shocks(
+        self, model, ref_scenario, year, file_name, recovery_rate=0, elasticity=1
+    ):
+        """
+        Cached calculator.get_shocks, same arguments and result
+        """
+        key = (
+            "shocks",
+            self.portfolio_digest(file_name),
+            get_data_version(),
+            model,
+            ref_scenario,
+            year,
+        )
+        entry = self._get(key)
+        if entry is None:
+            loans = pd.read_csv(file_name, encoding="UTF-8")
+            loan_shocks = calculator.get_loan_shocks(loans, model, ref_scenario, year)
+            entry = (loans, loan_shocks)
+            self._put(
+                key, entry, loans.memory_usage(deep=True).sum() + loan_shocks.nbytes
+            )
+        loans, loan_shocks = entry
+        shocked = loans.copy()
+        shocked["shock"] = calculator.scale_shocks(
+            shocked["amount"].to_numpy(dtype=float),
+            loan_shocks,
+            recovery_rate,
+            elasticity,
+        )
+        return shocked
+
+    def get_top_shocks(
+        self,
+        year,
+        file_name,
+        recovery_rate=0,
+        elasticity=1,
+        scenarios=None,
+        models=None,
+        confidence_level=0.95,
+        progress=None,
+    ):
+        """
+        Cached calculator.get_top_shocks, same arguments and result up to floating point
+        rounding of the rescaled statistics
+        """
+        factor = (1 - recovery_rate) * elasticity
+        if factor < 0:
+            # a negative factor swaps the order of the shocks, the statistics do not scale
+            return calculator.get_top_shocks(
+                year,
+                file_name,
+                recovery_rate=recovery_rate,
+                elasticity=elasticity,
+                scenarios=scenarios,
+                models=models,
+                confidence_level=confidence_level,
+                progress=progress,
+            )
+        key = (
+            "top_shocks",
+            self.portfolio_digest(file_name),
+            get_data_version(),
+            _key_part(models),
+            _key_part(scenarios),
+            year,
+            _key_part(confidence_level),
+        )
+        statistics = self._get(key)
+        if statistics is None:
+            statistics = calculator.get_top_shock_statistics(
+                year,
+                file_name,
+                scenarios=scenarios,
+                models=models,
+                confidence_level=confidence_level,
+                progress=progress,
+            )
+            self._put(key, statistics, statistics.memory_usage(deep=True).sum())
+        scaled = statistics.copy()
+        linear = [c for c in scaled.columns if c not in ("model", "scenario")]
+        scaled[linear] = scaled[linear] * factor
+        return calculator.round_top_shocks(scaled)
@@ -1,4 +1,7 @@
-from matplotlib import pyplot as plt
+import numpy as np
+
+# series of a series graph that get an own legend entry
+MAX_LEGEND_ENTRIES = 10
 
 
 def graph_market_shocks(ms, ms_shocks, scenarios, axis1, axis2):
@@ -12,31 +15,44 @@ def graph_market_shocks(ms, ms_shocks, scenarios, axis1, axis2):
         axis1: axis on which to plot market shares
         axis2: axis on which to plot market share shocks
     """
-    years = list(range(2005, 2051, 5))
-    years.extend(list(range(2060, 2101, 10)))
-    base_ms = ms.data.query("scenario == @scenarios[0]")["value"].reset_index(drop=True)
-    ref_ms = ms.data.query("scenario == @scenarios[1]")["value"].reset_index(drop=True)
-    shocks = ms_shocks["value"].reset_index(drop=True)
-
-    axis1.plot(years, base_ms, color="blue", linestyle="-", label=scenarios[0])
-    axis1.plot(years, ref_ms, color="blue", linestyle="--", label=scenarios[1])
+    base = ms.data.query("scenario == @scenarios[0]")
+    ref = ms.data.query("scenario == @scenarios[1]")
+    shock_data = ms_shocks.data
+    shocks = shock_data["value"]
+    # the years are taken from the data, every source has its own time grid
+    time_col = ms.time_col
+    x_min = min(base[time_col].min(), ref[time_col].min())
+    x_max = max(base[time_col].max(), ref[time_col].max())
+
+    axis1.plot(
+        base[time_col], base["value"], color="blue", linestyle="-", label=scenarios[0]
+    )
+    axis1.plot(
+        ref[time_col], ref["value"], color="blue", linestyle="--", label=scenarios[1]
+    )
     axis1.set_ylabel("Market Share %")
     axis1.set_xlabel("Year")
     axis1.set_ylim([0, None])
-    axis1.set_xlim([2005, 2100])
+    axis1.set_xlim([x_min, x_max])
     axis1.spines["left"].set_color("blue")
     axis1.tick_params(axis="y", colors="blue")
     axis1.yaxis.label.set_color("blue")
 
-    axis2.plot(years, shocks, color="red", linestyle="--", label="Base to Reference")
+    axis2.plot(
+        shock_data[ms_shocks.time_col],
+        shocks,
+        color="red",
+        linestyle="--",
+        label="Base to Reference",
+    )
     axis2.set_ylabel("Market Share Shock %")
     axis2.set_ylim([min(shocks), max(shocks)])
-    axis2.set_xlim([2005, 2100])
+    axis2.set_xlim([x_min, x_max])
     axis2.spines["right"].set_color("red")
     axis2.tick_params(axis="y", colors="red")
     axis2.yaxis.label.set_color("red")
 
-    plt.title("Market share and respective shocks")
+    axis1.set_title("Market share and respective shocks")
     lines, labels = axis1.get_legend_handles_labels()
     lines2, labels2 = axis2.get_legend_handles_labels()
     axis2.legend(lines + lines2, labels + labels2)
@@ -52,23 +68,133 @@ def graph_market_shares(data, axis, variable):
     """
     data.plot(ax=axis)
     region = data["region"].unique()
-    plt.ylabel("Market share (%)")
-    plt.xlabel("Year")
-    plt.title("Market share of " + variable + " in " + region[0])
+    axis.set_ylabel("Market share (%)")
+    axis.set_xlabel("Year")
+    axis.set_title("Market share of " + variable + " in " + region[0])
+
+
+def _series(data):
+    """
+    Args:
+        data: CodedFrame of IAMC data
+    Returns: x values, matrix of the values (series x time, NaN where a series has no data)
+        and the labels of every series built from the index levels that differ between series
+    """
+    time_col = data.time_col
+    levels = [n for n in data.index if n != time_col]
+    keys, series = np.unique(
+        np.stack([data.codes(n) for n in levels], axis=1), axis=0, return_inverse=True
+    )
+    series = series.ravel()
+    times, time = np.unique(data.codes(time_col), return_inverse=True)
+    x = data.levels(time_col)[times]
+    if time_col == "time":
+        from matplotlib import dates
+
+        x = dates.date2num(x)
+    values = np.full((len(keys), len(times)), np.nan)
+    values[series, time.ravel()] = data.values
+
+    varying = [i for i, n in enumerate(levels) if len(np.unique(keys[:, i])) > 1]
+    if not varying:
+        varying = [levels.index("variable")]
+    labels = [
+        ", ".join(str(data.levels(levels[i])[key[i]]) for i in varying) for key in keys
+    ]
+    return np.asarray(x, dtype=float), values, labels
 
 
-def simple_graph(data, axis, title, linestyle):
+def _decimate(x, values, max_points):
+    # evenly spaced time steps, the first and the last are always kept
+    if max_points is None or len(x) <= max_points:
+        return x, values
+    keep = np.unique(np.linspace(0, len(x) - 1, max(max_points, 2)).round().astype(int))
+    return x[keep], values[:, keep]
+
+
+def series_graph(
+    data,
+    axis,
+    title,
+    linestyle="solid",
+    max_points=None,
+    max_legend=MAX_LEGEND_ENTRIES,
+):
     """
+    Draws all series as one LineCollection instead of one line per series like pyam's plot,
+    so that hundreds of series (e.g. all regions or scenarios) are drawn quickly. The x-axis
+    is taken from the time steps in the data
     Directly manipulates passed axis -> no return value
     Args:
-        data: data to plot, data for one variable, one region, etc
+        data: CodedFrame (or IamDataFrame) to plot, one series per model, scenario, region,
+            variable and unit
         axis: axis on which the plot is drawn
         title: title of the plot
         linestyle: linestyle of the plot
+        max_points: maximum number of time steps drawn per series, all if None
+        max_legend: maximum number of series with a legend entry, the rest is summarized
     """
-    data.plot(
-        ax=axis,
-        legend=True,
-        title=title,
-        linestyle=linestyle,
+    from matplotlib import rcParams
+    from matplotlib.collections import LineCollection
+    from matplotlib.lines import Line2D
+
+    from climate_risk_calc.connections.coded_frame import CodedFrame
+
+    if not isinstance(data, CodedFrame):
+        data = CodedFrame.from_iamdataframe(data)
+    x, values, labels = _series(data)
+    x, values = _decimate(x, values, max_points)
+
+    # gaps of a series are skipped, like pyam which only plots existing data points
+    segments = []
+    for row in values:
+        valid = ~np.isnan(row)
+        segments.append(np.column_stack([x[valid], row[valid]]))
+    cycle = rcParams["axes.prop_cycle"].by_key()["color"]
+    colors = [cycle[i % len(cycle)] for i in range(len(segments))]
+    axis.add_collection(
+        LineCollection(segments, colors=colors, linestyles=linestyle, linewidths=1.5)
     )
+    axis.autoscale_view()
+
+    handles = [
+        Line2D([], [], color=colors[i], linestyle=linestyle, label=labels[i])
+        for i in range(min(max_legend, len(labels)))
+    ]
+    if len(labels) > max_legend:
+        handles.append(
+            Line2D(
+                [],
+                [],
+                color="none",
+                label="... and " + str(len(labels) - max_legend) + " more",
+            )
+        )
+    axis.legend(handles=handles)
+    axis.set_title(title)
+    axis.set_xlabel(data.time_col.capitalize())
+    axis.set_ylabel(", ".join(data.labels("unit")))
+
+
+def graph_trajectories(trajectories, axis):
+    """
+    Directly manipulates passed axis -> no return value
+    Args:
+        trajectories: dataframe of portfolio totals per model, scenario and year, as
+            calculator.get_portfolio_trajectories
+        axis: axis on which the plot is drawn
+    """
+    for (model, scenario), data in trajectories.groupby(
+        ["model", "scenario"], sort=False
+    ):
+        axis.plot(
+            data["year"],
+            data["total_neg"],
+            marker="o",
+            markersize=3,
+            label=model + ", " + scenario,
+        )
+    axis.set_ylabel("Total negative shock")
+    axis.set_xlabel("Year")
+    axis.legend()
+    axis.set_title("Potential portfolio losses over time")
@@ -0,0 +1,136 @@
+from math import ceil
+
+import numpy as np
+
+
+def value_at_risk_position(n_entries, confidence_level):
+    """
+    Position of the Value at Risk in the ascending order of n_entries shocks, i.e. the entry
+    at index ceil(n * confidence_level) of the descending order, clamped to the last entry
+    so that a confidence level of 1.0 yields the largest loss
+    Args:
+        n_entries: number of shocks
+        confidence_level: confidence level between 0 and 1
+    Returns: position as int
+    """
+    if not 0 <= confidence_level <= 1:
+        raise ValueError("Confidence level must be between 0 and 1")
+    descending_index = min(ceil(n_entries * confidence_level), n_entries - 1)
+    return n_entries - 1 - descending_index
+
+
+def _select(values, indices):
+    # values with the entries at indices in sorted position (np.partition)
+    if not indices:
+        return values
+    return np.partition(values, sorted(set(indices)))
+
+
+class ShockStatistics:
+    """
+    Accumulates the shock highlights of a portfolio chunk by chunk. For every confidence level
+    only the shorter side of the Value at Risk is kept: the lowest (1 - confidence level) * n
+    shocks, or the highest confidence level * n shocks, whose sum is subtracted from the sum
+    of all shocks for the expected shortfall. At most about n / 2 values are kept, far fewer
+    for confidence levels close to 0 or 1
+    """
+
+    def __init__(self, n_entries, total, confidence_levels=(0.95,)):
+        """
+        Args:
+            n_entries: number of loans in the portfolio
+            total: total amount of the credit portfolio
+            confidence_levels: list of confidence levels for Value at Risk and expected shortfall
+        """
+        self.n_entries = n_entries
+        self.total = total
+        self.confidence_levels = list(confidence_levels)
+        self.positions = [
+            value_at_risk_position(n_entries, c) for c in self.confidence_levels
+        ]
+        # the lower tail of a position p holds p + 1 shocks, the upper tail n - p
+        self.from_below = [p + 1 <= n_entries - p for p in self.positions]
+        self.low_size = max(
+            [p + 1 for p, low in zip(self.positions, self.from_below) if low] + [0]
+        )
+        self.high_size = max(
+            [n_entries - p for p, low in zip(self.positions, self.from_below) if not low]
+            + [0]
+        )
+        self.low = np.empty(0)
+        self.high = np.empty(0)
+        self.count = 0
+        self.min_shock = np.inf
+        self.max_shock = -np.inf
+        self.total_neg = 0.0
+        self.total_pos = 0.0
+
+    def update(self, shocks):
+        """
+        Args:
+            shocks: numpy array of shocks of the next chunk of loans
+        """
+        shocks = np.asarray(shocks, dtype=float)
+        if len(shocks) == 0:
+            return
+        self.count += len(shocks)
+        self.min_shock = min(self.min_shock, shocks.min())
+        self.max_shock = max(self.max_shock, shocks.max())
+        self.total_neg += np.minimum(shocks, 0).sum()
+        self.total_pos += np.maximum(shocks, 0).sum()
+        if self.low_size:
+            low = np.concatenate([self.low, shocks])
+            if len(low) > self.low_size:
+                low = np.partition(low, self.low_size - 1)[: self.low_size]
+            self.low = low
+        if self.high_size:
+            high = np.concatenate([self.high, shocks])
+            if len(high) > self.high_size:
+                high = np.partition(high, len(high) - self.high_size)[-self.high_size :]
+            self.high = high
+
+    def _value_at_risk(self, position, from_below, low, high):
+        # Value at Risk and expected shortfall of the shocks up to position (ascending)
+        if from_below:
+            return low[position], low[: position + 1].mean()
+        # position of the Value at Risk in the upper tail, the shocks above it are excluded
+        upper = len(high) - (self.n_entries - position)
+        above = high[upper + 1 :].sum()
+        return high[upper], (self.total_neg + self.total_pos - above) / (position + 1)
+
+    def result(self):
+        """
+        Returns: dict with min_shock, max_shock, total_neg, total_pos, total_neg_rel and lists
+            project_VaR and expected_shortfall, one entry per confidence level.
+            total_neg_rel is 0 for portfolios without loans or with a total amount of 0
+        """
+        if self.count != self.n_entries:
+            raise ValueError(
+                "Expected " + str(self.n_entries) + " shocks, got " + str(self.count)
+            )
+        if self.count == 0:
+            nan_list = [np.nan] * len(self.confidence_levels)
+            return {
+                "min_shock": np.nan,
+                "max_shock": np.nan,
+                "total_neg": 0.0,
+                "total_pos": 0.0,
+                "total_neg_rel": 0.0,
+                "project_VaR": nan_list,
+                "expected_shortfall": list(nan_list),
+            }
+        positions = list(zip(self.positions, self.from_below))
+        low = _select(self.low, [p for p, b in positions if b])
+        high = _select(
+            self.high, [len(self.high) - (self.n_entries - p) for p, b in positions if not b]
+        )
+        results = [self._value_at_risk(p, b, low, high) for p, b in positions]
+        return {
+            "min_shock": self.min_shock,
+            "max_shock": self.max_shock,
+            "total_neg": self.total_neg,
+            "total_pos": self.total_pos,
+            "total_neg_rel": self.total_neg / self.total if self.total else 0.0,
+            "project_VaR": [var for var, _ in results],
+            "expected_shortfall": [shortfall for _, shortfall in results],
+        }
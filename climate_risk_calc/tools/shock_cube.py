@@ -0,0 +1,223 @@
+import numpy as np
+
+from climate_risk_calc.connections.coded_frame import CodedFrame
+from climate_risk_calc.tools import timing
+from climate_risk_calc.tools.variable_tree import VariableTree
+
+
+class ShockCube:
+    """
+    Dense, precomputed market shares and market share shocks of the LIMITS data.
+    Axes are integer coded: (model, scenario, region, variable, year)
+    """
+
+    base_scenario = "LIMITS-Base"
+    dimensions = ["model", "scenario", "region", "variable", "year"]
+
+    @timing.spanned("ShockCube.build")
+    def __init__(self, limits_connection):
+        """
+        Args:
+            limits_connection: LimitsConnection with the data to precompute
+        """
+        labels, codes, values = limits_connection.get_coded_data()
+        self._set_labels(labels)
+        shape = tuple(len(self.labels[d]) for d in self.dimensions)
+        # float32 if the connection holds float32 values, only shares and shocks are kept
+        cube = np.full(shape, np.nan, dtype=values.dtype)
+        cube[tuple(codes[d] for d in self.dimensions)] = values
+
+        # share variables: every variable whose base sector is part of the data as well
+        variable_codes = self.codes["variable"]
+        pairs = self.variable_tree.share_pairs(self.labels["variable"])
+        children = [variable_codes[child] for child, _ in pairs]
+        parents = [variable_codes[parent] for _, parent in pairs]
+        self.share_codes = np.full(len(variable_codes), -1)
+        self.share_codes[children] = np.arange(len(children))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # in percent like calculator.get_market_shares
+            self.shares = (
+                cube[:, :, :, children, :] / cube[:, :, :, parents, :] * 100
+            )
+            if self.base_scenario in self.codes["scenario"]:
+                base = self.shares[:, [self.codes["scenario"][self.base_scenario]]]
+                self.shocks = (self.shares - base) / base
+            else:
+                self.shocks = np.full(self.shares.shape, np.nan)
+
+    @classmethod
+    def from_arrays(cls, limits_connection, shares, shocks, share_codes):
+        """
+        Args:
+            limits_connection: LimitsConnection the arrays were computed from
+            shares: market share cube of a ShockCube of the same data
+            shocks: shock cube of that ShockCube
+            share_codes: share_codes of that ShockCube
+        Returns: ShockCube using the arrays (e.g. attached from shared memory) as they are
+        """
+        shock_cube = cls.__new__(cls)
+        shock_cube._set_labels(limits_connection.get_coded_data()[0])
+        shock_cube.share_codes = share_codes
+        shock_cube.shares = shares
+        shock_cube.shocks = shocks
+        return shock_cube
+
+    def _set_labels(self, labels):
+        self.labels = {d: labels[d] for d in self.dimensions}
+        self.codes = {
+            d: {label: i for i, label in enumerate(self.labels[d])}
+            for d in self.dimensions
+        }
+        self.variable_tree = VariableTree(self.labels["variable"])
+
+    def _code(self, dimension, label):
+        try:
+            return self.codes[dimension][label]
+        except KeyError:
+            raise ValueError("Unknown " + dimension + ": " + str(label)) from None
+
+    def _share_code(self, variable):
+        code = self.share_codes[self._code("variable", variable)]
+        if code < 0:
+            raise ValueError("No base sector data for variable: " + variable)
+        return code
+
+    def memory_usage(self):
+        """
+        Returns: dict with the "bytes" of the market share and shock cubes
+        """
+        return {"bytes": self.shares.nbytes + self.shocks.nbytes, "mapped": 0}
+
+    def market_share(self, model, scenario, region, variable, year):
+        """
+        Returns: market share of variable within its base sector in percent
+        """
+        return self.shares[
+            self._code("model", model),
+            self._code("scenario", scenario),
+            self._code("region", region),
+            self._share_code(variable),
+            self._code("year", year),
+        ]
+
+    def shock(self, model, scenario, region, variable, year):
+        """
+        Returns: relative change of the market share of scenario compared to the base scenario
+        """
+        return self.shocks[
+            self._code("model", model),
+            self._code("scenario", scenario),
+            self._code("region", region),
+            self._share_code(variable),
+            self._code("year", year),
+        ]
+
+    def lookup_shocks(self, model, scenario, regions, variables, year):
+        """
+        Args:
+            model: model
+            scenario: compared scenario
+            regions: array-like of regions
+            variables: array-like of variables, same length as regions
+            year: year
+        Returns: numpy array of shocks, one for every (region, variable) pair
+        """
+        region_codes = np.array([self._code("region", r) for r in regions], dtype=int)
+        share_codes = np.array([self._share_code(v) for v in variables], dtype=int)
+        return self.shocks[
+            self._code("model", model),
+            self._code("scenario", scenario),
+            region_codes,
+            share_codes,
+            self._code("year", year),
+        ]
+
+    def lookup_shock_trajectories(self, model, scenario, regions, variables, years):
+        """
+        Args:
+            model: model
+            scenario: compared scenario
+            regions: array-like of regions
+            variables: array-like of variables, same length as regions
+            years: list of years
+        Returns: numpy array of shocks with one row for every (region, variable) pair and
+            one column for every year
+        """
+        region_codes = np.array([self._code("region", r) for r in regions], dtype=int)
+        share_codes = np.array([self._share_code(v) for v in variables], dtype=int)
+        year_codes = np.array([self._code("year", y) for y in years], dtype=int)
+        shocks = self.shocks[self._code("model", model), self._code("scenario", scenario)]
+        return shocks[region_codes, share_codes][:, year_codes]
+
+    def _to_frame(self, cube, model, scenarios, regions, variable, name, scale=1):
+        scenarios, regions = sorted(scenarios), sorted(regions)
+        years = np.asarray(self.labels["year"])
+        scenario_codes, region_codes, year_codes = np.meshgrid(
+            np.arange(len(scenarios)),
+            np.arange(len(regions)),
+            np.arange(len(years)),
+            indexing="ij",
+        )
+        values = cube[
+            self._code("model", model),
+            [self._code("scenario", s) for s in scenarios],
+        ][:, [self._code("region", r) for r in regions], self._share_code(variable)]
+        n_rows = values.size
+        columns = {
+            "model.levels": np.asarray([model]),
+            "model.codes": np.zeros(n_rows, dtype=np.int32),
+            "scenario.levels": np.asarray(scenarios),
+            "scenario.codes": scenario_codes.ravel().astype(np.int32),
+            "region.levels": np.asarray(regions),
+            "region.codes": region_codes.ravel().astype(np.int32),
+            "variable.levels": np.asarray([name]),
+            "variable.codes": np.zeros(n_rows, dtype=np.int32),
+            "unit.levels": np.asarray(["unknown"]),
+            "unit.codes": np.zeros(n_rows, dtype=np.int32),
+            "year.levels": years,
+            "year.codes": year_codes.ravel().astype(np.int32),
+            "value": values.ravel() * scale,
+        }
+        attributes = {
+            "index": ["model", "scenario", "region", "variable", "unit", "year"],
+            "time_col": "year",
+            "extra_cols": [],
+        }
+        frame = CodedFrame(columns, attributes)
+        # like pyam, years without value are dropped
+        return frame.take(~np.isnan(frame.values))
+
+    def market_shares(self, model, scenarios, regions, variable):
+        """
+        Args:
+            model: model
+            scenarios: list of scenarios
+            regions: list of regions
+            variable: variable, share is relative to its base sector
+        Returns: CodedFrame with market share data, as calculator.get_market_shares
+        """
+        return self._to_frame(
+            self.shares, model, scenarios, regions, variable, "Market Share"
+        )
+
+    def market_share_shocks(self, model, scenario, region, variable, as_percent=True):
+        """
+        Args:
+            model: model
+            scenario: scenario compared to the base scenario
+            region: region
+            variable: variable, share is relative to its base sector
+            as_percent: indicator whether shocks should be returned as percentages
+        Returns: CodedFrame with market share shock data, as
+            calculator.get_market_share_shocks
+        """
+        return self._to_frame(
+            self.shocks,
+            model,
+            [scenario],
+            [region],
+            variable,
+            "shock",
+            scale=100 if as_percent else 1,
+        )
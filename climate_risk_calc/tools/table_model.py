@@ -0,0 +1,204 @@
+import operator
+import re
+
+import numpy as np
+import pandas as pd
+
+from climate_risk_calc.tools import timing
+
+# rows per page of a paged table
+DEFAULT_PAGE_SIZE = 100
+NUMBER_FILTER = re.compile(
+    r"^\s*(<=|>=|!=|==|=|<|>)?\s*([-+]?[0-9.]+(?:[eE][-+]?\d+)?)\s*$"
+)
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+class TableModel:
+    """
+    Rows of a table kept as numpy arrays: numeric columns as they are, text columns as
+    integer codes into sorted labels. Sorting and filtering only reorder an array of row
+    positions, text is created for the rows of the requested page alone, so that tables of
+    millions of rows can be shown page by page
+    """
+
+    def __init__(self, columns, labels=None, decimals=None):
+        """
+        Args:
+            columns: dict column name -> numpy array, all of the same length
+            labels: dict column name -> sorted array of labels for columns holding codes
+            decimals: dict column name -> number of decimals shown of a float column
+        """
+        self.columns = columns
+        self.labels = labels or {}
+        self.decimals = decimals or {}
+        self.n_rows = len(next(iter(columns.values()))) if columns else 0
+        self.filters = {}
+        self.sort_keys = []
+        self.order = np.arange(self.n_rows)
+
+    @classmethod
+    def from_dataframe(cls, df, decimals=None):
+        """
+        Text columns are factorized once, numeric columns are used without copy
+        Args:
+            df: pandas dataframe
+            decimals: dict column name -> number of decimals shown of a float column
+        """
+        columns, labels = {}, {}
+        for name in df.columns:
+            values = df[name]
+            if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(
+                values
+            ):
+                columns[str(name)] = values.to_numpy()
+            else:
+                if not pd.api.types.is_string_dtype(values):
+                    values = values.astype(str)
+                codes, uniques = pd.factorize(values, sort=True)
+                columns[str(name)] = codes
+                labels[str(name)] = np.asarray(uniques, dtype=object)
+        return cls(columns, labels, decimals)
+
+    @classmethod
+    def from_coded_frame(cls, data, decimals=None):
+        """
+        The codes and labels of the index levels are used as they are
+        Args:
+            data: CodedFrame
+            decimals: dict column name -> number of decimals shown of a float column
+        """
+        columns, labels = {}, {}
+        for name in data.index:
+            level_labels = data.levels(name)
+            if name == data.time_col and np.issubdtype(level_labels.dtype, np.number):
+                columns[name] = level_labels[data.codes(name)]
+            else:
+                columns[name] = data.codes(name)
+                labels[name] = level_labels
+        columns["value"] = data.values
+        return cls(columns, labels, decimals)
+
+    @property
+    def column_names(self):
+        return list(self.columns)
+
+    def __len__(self):
+        """
+        Returns: number of rows passing the filters
+        """
+        return len(self.order)
+
+    @timing.spanned("TableModel.sort")
+    def sort(self, keys):
+        """
+        Args:
+            keys: list of (column name, ascending) tuples, the first is the primary key
+        """
+        self.sort_keys = list(keys)
+        self._apply()
+
+    def set_filter(self, name, text):
+        """
+        Numeric columns are filtered by comparisons like ">100", "<= 0.5" or "0", text
+        columns by case-insensitive substrings of the labels
+        Args:
+            name: column name
+            text: filter expression, an empty text removes the filter of the column
+        Raises: ValueError if a numeric filter can not be parsed
+        """
+        if not text:
+            self.filters.pop(name, None)
+        elif name in self.labels:
+            self.filters[name] = text.lower()
+        else:
+            match = NUMBER_FILTER.match(text)
+            if match is None:
+                raise ValueError("Invalid filter for " + name + ": " + text)
+            compare = OPERATORS[match.group(1) or "="]
+            self.filters[name] = (compare, float(match.group(2)))
+        self._apply()
+
+    def clear_filters(self):
+        self.filters = {}
+        self._apply()
+
+    def _mask(self, name, condition):
+        values = self.columns[name]
+        if name in self.labels:
+            # the labels are searched, not the rows
+            selected = np.asarray(
+                [condition in str(label).lower() for label in self.labels[name]],
+                dtype=bool,
+            )
+            if len(selected) == 0:
+                return np.zeros(len(values), dtype=bool)
+            return selected[values]
+        compare, number = condition
+        return compare(values, number)
+
+    @timing.spanned("TableModel.apply")
+    def _apply(self):
+        if self.filters:
+            mask = np.ones(self.n_rows, dtype=bool)
+            for name, condition in self.filters.items():
+                mask &= self._mask(name, condition)
+            order = np.flatnonzero(mask)
+        else:
+            order = np.arange(self.n_rows)
+        if self.sort_keys:
+            # stable sorts from the last key to the primary key
+            for name, ascending in reversed(self.sort_keys):
+                values = self.columns[name][order]
+                if ascending:
+                    order = order[np.argsort(values, kind="stable")]
+                else:
+                    order = order[_argsort_descending(values)]
+        self.order = order
+
+    def n_pages(self, page_size=DEFAULT_PAGE_SIZE):
+        return max(1, -(-len(self) // page_size))
+
+    def rows(self, start, stop):
+        """
+        Args:
+            start: first position in the sorted and filtered rows
+            stop: position after the last row
+        Returns: list of tuples of formatted values
+        """
+        positions = self.order[start:stop]
+        formatted = [
+            self._format(name, self.columns[name][positions]) for name in self.columns
+        ]
+        return list(zip(*formatted))
+
+    def page(self, number, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Args:
+            number: page number starting at 0
+            page_size: rows per page
+        Returns: list of tuples of formatted values of the rows on the page
+        """
+        return self.rows(number * page_size, (number + 1) * page_size)
+
+    def _format(self, name, values):
+        if name in self.labels:
+            return self.labels[name][values].tolist()
+        if np.issubdtype(values.dtype, np.floating) and name in self.decimals:
+            return [str(v) for v in np.round(values, self.decimals[name]).tolist()]
+        return [str(v) for v in values.tolist()]
+
+
+def _argsort_descending(values):
+    # stable like the ascending sort, equal values keep their order and NaN stays last
+    if np.issubdtype(values.dtype, np.unsignedinteger):
+        values = values.astype(np.int64)
+    return np.argsort(-values, kind="stable")
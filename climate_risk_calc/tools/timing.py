@@ -0,0 +1,280 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+# reference point of all timings, the entry point imports this module first
+_process_start = time.perf_counter()
+_records = []
+_reported = 0
+
+# spans of the stage instrumentation, switched on by enable_spans() or CLIMATE_RISK_SPANS=1
+_spans_enabled = os.environ.get("CLIMATE_RISK_SPANS") == "1"
+# number of spans kept, older spans are dropped so a long session does not grow unbounded
+MAX_SPANS = 100000
+_spans = deque(maxlen=MAX_SPANS)  # (name, path, thread id, start, duration, self time)
+_span_total = 0  # number of spans recorded, including the dropped ones
+_spans_lock = threading.Lock()
+_span_stacks = threading.local()
+_no_span = nullcontext()
+
+
+def elapsed():
+    """
+    Returns: seconds since the program started
+    """
+    return time.perf_counter() - _process_start
+
+
+@contextmanager
+def timed(label):
+    """
+    Records how long the enclosed block takes, e.g. with timed("Load LIMITS data"): ...
+    Args:
+        label: description of the timed step
+    """
+    start = elapsed()
+    try:
+        yield
+    finally:
+        _records.append((label, start, elapsed() - start))
+
+
+def mark(label):
+    """
+    Records a point in time without duration, e.g. when the first window is shown
+    Args:
+        label: description of the point in time
+    """
+    _records.append((label, elapsed(), 0.0))
+
+
+def report():
+    """
+    Prints all timings recorded since the last report
+    """
+    global _reported
+    for label, start, duration in _records[_reported:]:
+        if duration:
+            print(
+                "[INFO] {}: {:.0f} ms (started at {:.0f} ms)".format(
+                    label, duration * 1000, start * 1000
+                )
+            )
+        else:
+            print("[INFO] {} at {:.0f} ms".format(label, start * 1000))
+    _reported = len(_records)
+
+
+def enable_spans(enabled=True):
+    """
+    Switches the stage instrumentation on or off at runtime
+    Args:
+        enabled: indicator whether spans should be recorded
+    """
+    global _spans_enabled
+    _spans_enabled = enabled
+
+
+def spans_enabled():
+    return _spans_enabled
+
+
+def clear_spans():
+    with _spans_lock:
+        _spans.clear()
+
+
+def span_count():
+    """
+    Returns: number of spans recorded so far, e.g. to summarize only the spans of one action
+    """
+    return _span_total
+
+
+def _recorded_spans(since=0):
+    """
+    Args:
+        since: number of recorded spans to skip, see span_count()
+    Returns: list of the kept spans recorded after the first since spans
+    """
+    with _spans_lock:
+        skip = since - (_span_total - len(_spans))
+        spans = list(_spans)
+    return spans[max(skip, 0) :]
+
+
+@contextmanager
+def _recorded_span(name):
+    stack = getattr(_span_stacks, "stack", None)
+    if stack is None:
+        stack = _span_stacks.stack = []
+    # [name, time spent in nested spans]
+    frame = [name, 0.0]
+    stack.append(frame)
+    start = elapsed()
+    try:
+        yield
+    finally:
+        duration = elapsed() - start
+        path = ";".join(_current_path())
+        stack.pop()
+        if stack:
+            stack[-1][1] += duration
+        _append_span(
+            (name, path, threading.get_ident(), start, duration, duration - frame[1])
+        )
+
+
+def _current_path():
+    # names of the enclosing spans, starting with those propagated from another thread
+    stack = getattr(_span_stacks, "stack", None) or []
+    return getattr(_span_stacks, "parent", []) + [f[0] for f in stack]
+
+
+def _append_span(record):
+    global _span_total
+    with _spans_lock:
+        _spans.append(record)
+        _span_total += 1
+
+
+def span(name):
+    """
+    Records the enclosed block as span if spans are enabled, e.g. with span("read CSV"): ...
+    Nested spans of the same thread form a stack, see propagated() for other threads
+    Args:
+        name: name of the stage
+    Returns: context manager, a shared no-op one if spans are disabled
+    """
+    if not _spans_enabled:
+        return _no_span
+    return _recorded_span(name)
+
+
+def spanned(name=None):
+    """
+    Decorator recording every call of the function as span if spans are enabled
+    Args:
+        name: name of the stage, defaults to the qualified name of the function
+    """
+
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _spans_enabled:
+                return func(*args, **kwargs)
+            with _recorded_span(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def propagated(func):
+    """
+    Wraps func so that the spans it records on another thread, e.g. in a ThreadPoolExecutor,
+    are nested under the spans enclosing the call of propagated(). Their time is not
+    subtracted from the self time of the enclosing spans, which wait for them concurrently
+    Args:
+        func: function to run on another thread
+    Returns: wrapped function, func itself if spans are disabled
+    """
+    if not _spans_enabled:
+        return func
+    parent = _current_path()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        previous = getattr(_span_stacks, "parent", [])
+        _span_stacks.parent = parent
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _span_stacks.parent = previous
+
+    return wrapper
+
+
+def span_statistics(since=0):
+    """
+    Args:
+        since: number of spans to skip, see span_count()
+    Returns: dict of name -> dict with "count", "total", "self" and "max" seconds, ordered
+        by descending self time, only the last MAX_SPANS spans are included
+    """
+    statistics = {}
+    for name, _, _, _, duration, self_time in _recorded_spans(since):
+        entry = statistics.setdefault(
+            name, {"count": 0, "total": 0.0, "self": 0.0, "max": 0.0}
+        )
+        entry["count"] += 1
+        entry["total"] += duration
+        entry["self"] += self_time
+        entry["max"] = max(entry["max"], duration)
+    return dict(sorted(statistics.items(), key=lambda item: -item[1]["self"]))
+
+
+def span_summary(since=0, limit=3):
+    """
+    Args:
+        since: number of spans to skip, see span_count()
+        limit: number of stages shown
+    Returns: one line with the stages that took the most time (self time), e.g. for the
+        info bar
+    """
+    statistics = span_statistics(since)
+    if not statistics:
+        return ""
+    return "Timings: " + ", ".join(
+        "{} {:.0f} ms ({}x)".format(name, entry["self"] * 1000, entry["count"])
+        for name, entry in list(statistics.items())[:limit]
+    )
+
+
+def write_spans(file_name):
+    """
+    Writes the aggregated statistics and the kept spans as JSON, "dropped" is the number of
+    spans that were dropped because more than MAX_SPANS were recorded
+    Args:
+        file_name: path of the JSON-file
+    """
+    spans = _recorded_spans()
+    report = {
+        "statistics": span_statistics(),
+        "dropped": span_count() - len(spans),
+        "spans": [
+            {
+                "name": name,
+                "path": path,
+                "thread": thread,
+                "start": start,
+                "duration": duration,
+                "self": self_time,
+            }
+            for name, path, thread, start, duration, self_time in spans
+        ],
+    }
+    with open(file_name, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+
+
+def write_folded_stacks(file_name):
+    """
+    Writes the spans in the folded stack format ("outer;inner <microseconds>" per line) of
+    flamegraph.pl, readable by speedscope and other flame graph viewers
+    Args:
+        file_name: path of the text file
+    """
+    stacks = {}
+    for _, path, _, _, _, self_time in _recorded_spans():
+        stacks[path] = stacks.get(path, 0.0) + self_time
+    with open(file_name, "w", encoding="utf-8") as f:
+        for path, self_time in stacks.items():
+            f.write(path + " " + str(int(round(self_time * 1e6))) + "\n")
@@ -0,0 +1,143 @@
+class VariableTree:
+    """
+    Trie over the "|" separated segments of IAMC variable names, e.g.
+    "Secondary Energy|Electricity|Coal" is a child of "Secondary Energy|Electricity".
+    Every node has an integer id, intermediate nodes that are no variable themselves are
+    kept so that the hierarchy is complete
+    """
+
+    separator = "|"
+
+    def __init__(self, variables=()):
+        """
+        Args:
+            variables: iterable of variable names
+        """
+        self.names = []  # id -> full name
+        self.parents = []  # id -> id of the parent node, -1 for top level sectors
+        self.children = []  # id -> dict of segment -> id of the child node
+        self.is_variable = []  # id -> indicator whether the node was added as variable
+        self.roots = {}  # segment -> id of the top level nodes
+        self.ids = {}  # full name -> id
+        for variable in variables:
+            self.add(variable)
+
+    def add(self, variable):
+        """
+        Args:
+            variable: variable name
+        Returns: id of the variable
+        """
+        node = -1
+        children = self.roots
+        for segment in variable.split(self.separator):
+            child = children.get(segment)
+            if child is None:
+                child = len(self.names)
+                name = segment
+                if node >= 0:
+                    name = self.names[node] + self.separator + segment
+                self.names.append(name)
+                self.parents.append(node)
+                self.children.append({})
+                self.is_variable.append(False)
+                self.ids[name] = child
+                children[segment] = child
+            node = child
+            children = self.children[node]
+        self.is_variable[node] = True
+        return node
+
+    def __contains__(self, variable):
+        node = self.ids.get(variable)
+        return node is not None and self.is_variable[node]
+
+    def __len__(self):
+        return sum(self.is_variable)
+
+    def get_id(self, variable):
+        """
+        Returns: id of the variable, None if it is not part of the tree
+        """
+        return self.ids.get(variable)
+
+    def get_parent(self, variable):
+        """
+        Args:
+            variable: variable name
+        Returns: name of the parent (base sector) of the variable, None for top level sectors
+            and variables that are not part of the tree
+        """
+        node = self.ids.get(variable)
+        if node is None or self.parents[node] < 0:
+            return None
+        return self.names[self.parents[node]]
+
+    def get_children(self, variable):
+        """
+        Args:
+            variable: variable name
+        Returns: list of the names of the direct sub-sectors that are variables
+        """
+        node = self.ids.get(variable)
+        if node is None:
+            return []
+        return [
+            self.names[c] for c in self.children[node].values() if self.is_variable[c]
+        ]
+
+    def share_pairs(self, variables=None):
+        """
+        Explicit (sector, base sector) pairs for market share calculations
+        Args:
+            variables: iterable of variables to pair, defaults to all variables of the tree
+        Returns: list of (child, parent) tuples in the order of variables, where both are
+            variables
+        """
+        if variables is None:
+            variables = [n for n, v in zip(self.names, self.is_variable) if v]
+        else:
+            variables = list(variables)
+        selected = set(variables)
+        pairs = []
+        for variable in variables:
+            parent = self.get_parent(variable)
+            if parent is not None and parent in selected and parent in self:
+                pairs.append((variable, parent))
+        return pairs
+
+    def complete(self, prefix, limit=None):
+        """
+        Autocompletion: walks the trie along the complete segments of prefix and collects
+        the variables below the children matching the last, partial segment
+        Args:
+            prefix: beginning of a variable name, e.g. "Secondary Energy|El"
+            limit: maximum number of returned variables
+        Returns: list of variables starting with prefix, parents before their children
+        """
+        *path, partial = prefix.split(self.separator)
+        children = self.roots
+        for segment in path:
+            node = children.get(segment)
+            if node is None:
+                return []
+            children = self.children[node]
+        stack = sorted(
+            (c for s, c in children.items() if s.startswith(partial)),
+            key=lambda c: self.names[c],
+            reverse=True,
+        )
+        result = []
+        # depth first in name order
+        while stack and (limit is None or len(result) < limit):
+            node = stack.pop()
+            if self.is_variable[node]:
+                result.append(self.names[node])
+            stack.extend(
+                sorted(
+                    self.children[node].values(),
+                    key=lambda c: self.names[c],
+                    reverse=True,
+                )
+            )
+        return result
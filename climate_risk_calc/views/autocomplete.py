@@ -0,0 +1,28 @@
+NAVIGATION_KEYS = {"Up", "Down", "Left", "Right", "Return", "Escape", "Tab"}
+
+
+def bind_autocomplete(combobox, get_tree, get_values, limit=200):
+    """
+    Narrows the drop-down list of a variable combobox to the variables starting with the
+    typed text, searched in a VariableTree
+    Args:
+        combobox: ttk.Combobox with variables
+        get_tree: function returning the VariableTree to search, None if not loaded yet
+        get_values: function returning the list of selectable variables
+        limit: maximum number of proposed variables
+    """
+
+    def on_key_release(event):
+        if event.keysym in NAVIGATION_KEYS:
+            return
+        tree = get_tree()
+        if tree is None:
+            return
+        text = combobox.get()
+        values = get_values()
+        if text:
+            selectable = set(values)
+            values = [v for v in tree.complete(text) if v in selectable]
+        combobox.configure(values=values[:limit])
+
+    combobox.bind("<KeyRelease>", on_key_release)
@@ -0,0 +1,142 @@
+import tkinter as tk
+from tkinter import messagebox
+from tkinter import ttk
+
+from climate_risk_calc.tools.table_model import DEFAULT_PAGE_SIZE
+
+font = "Arial 9"
+
+
+class PagedTable(tk.Frame):
+    """
+    Table showing one page of a TableModel in a ttk.Treeview. Only the rows of the shown
+    page are formatted and inserted, a click on a column heading sorts by the column,
+    the filter bar filters the rows of the model
+    """
+
+    def __init__(self, master, model, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Args:
+            master: parent widget
+            model: TableModel with the rows
+            page_size: rows per page
+        """
+        super().__init__(master, background="white")
+        self.model = model
+        self.page_size = page_size
+        self.page_number = 0
+        self.page_text = tk.StringVar()
+        self.filter_text = tk.StringVar()
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        filter_bar = tk.Frame(self, background="white")
+        filter_bar.columnconfigure(1, weight=1)
+        self.cbox_filter_column = ttk.Combobox(
+            filter_bar, values=model.column_names, state="readonly", font=font
+        )
+        self.cbox_filter_column.set(model.column_names[0])
+        entry_filter = ttk.Entry(filter_bar, textvariable=self.filter_text, font=font)
+        entry_filter.bind("<Return>", lambda event: self.apply_filter())
+        btn_filter = tk.Button(
+            filter_bar,
+            text="Filter",
+            background="white",
+            command=self.apply_filter,
+            font=font,
+        )
+        btn_clear = tk.Button(
+            filter_bar,
+            text="Clear filters",
+            background="white",
+            command=self.clear_filters,
+            font=font,
+        )
+        self.cbox_filter_column.grid(row=0, column=0, sticky=tk.NSEW, padx=3, pady=3)
+        entry_filter.grid(row=0, column=1, sticky=tk.NSEW, padx=3, pady=3)
+        btn_filter.grid(row=0, column=2, sticky=tk.NSEW, padx=3, pady=3)
+        btn_clear.grid(row=0, column=3, sticky=tk.NSEW, padx=3, pady=3)
+        filter_bar.grid(row=0, column=0, columnspan=2, sticky=tk.NSEW)
+
+        self.tree = ttk.Treeview(
+            self, columns=model.column_names, show="headings", selectmode="browse"
+        )
+        for name in model.column_names:
+            self.tree.heading(name, text=name, command=lambda n=name: self.sort_by(n))
+            self.tree.column(name, width=120, stretch=True)
+        scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.grid(row=1, column=0, sticky=tk.NSEW)
+        scrollbar.grid(row=1, column=1, sticky=tk.NS)
+        self.tree.bind("<Next>", lambda event: self.show_page(self.page_number + 1))
+        self.tree.bind("<Prior>", lambda event: self.show_page(self.page_number - 1))
+
+        page_bar = tk.Frame(self, background="white")
+        page_bar.columnconfigure(2, weight=1)
+        for column, text, command in [
+            (0, "<<", lambda: self.show_page(0)),
+            (1, "<", lambda: self.show_page(self.page_number - 1)),
+            (3, ">", lambda: self.show_page(self.page_number + 1)),
+            (4, ">>", lambda: self.show_page(self.model.n_pages(self.page_size) - 1)),
+        ]:
+            tk.Button(
+                page_bar, text=text, background="white", command=command, font=font
+            ).grid(row=0, column=column, padx=3, pady=3)
+        tk.Label(
+            page_bar, textvariable=self.page_text, background="white", font=font
+        ).grid(row=0, column=2, sticky=tk.NSEW)
+        page_bar.grid(row=2, column=0, columnspan=2, sticky=tk.NSEW)
+
+        self.update_headings()
+        self.show_page(0)
+
+    def show_page(self, number):
+        """
+        Replaces the shown rows by the rows of the page
+        Args:
+            number: page number starting at 0, clipped to the existing pages
+        """
+        self.page_number = min(max(number, 0), self.model.n_pages(self.page_size) - 1)
+        self.tree.delete(*self.tree.get_children())
+        for row in self.model.page(self.page_number, self.page_size):
+            self.tree.insert("", tk.END, values=row)
+        start = self.page_number * self.page_size
+        self.page_text.set(
+            "Rows {} - {} of {}".format(
+                min(start + 1, len(self.model)),
+                min(start + self.page_size, len(self.model)),
+                len(self.model),
+            )
+        )
+
+    def sort_by(self, name):
+        """
+        Sorts by the column, descending if the table is already sorted ascending by it
+        """
+        keys = self.model.sort_keys
+        ascending = not (keys and keys[0] == (name, True))
+        self.model.sort([(name, ascending)])
+        self.update_headings()
+        self.show_page(0)
+
+    def update_headings(self):
+        # arrow at the primary sort column
+        keys = self.model.sort_keys
+        for column in self.model.column_names:
+            arrow = ""
+            if keys and keys[0][0] == column:
+                arrow = " ▲" if keys[0][1] else " ▼"
+            self.tree.heading(column, text=column + arrow)
+
+    def apply_filter(self):
+        try:
+            self.model.set_filter(self.cbox_filter_column.get(), self.filter_text.get())
+        except ValueError as error:
+            messagebox.showwarning(message=str(error), title="Filter error")
+            return
+        self.show_page(0)
+
+    def clear_filters(self):
+        self.filter_text.set("")
+        self.model.clear_filters()
+        self.show_page(0)
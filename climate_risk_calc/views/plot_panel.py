@@ -0,0 +1,56 @@
+import tkinter as tk
+
+
+class PlotPanel(tk.Frame):
+    """
+    Frame with one persistent matplotlib figure, canvas and navigation toolbar that every
+    plot of an explorer is drawn on. The figure is created without pyplot, so it is not kept
+    in pyplot's figure registry, and only its axes are replaced between plots
+    """
+
+    def __init__(self, master):
+        # matplotlib is only imported once something is plotted
+        from matplotlib.backends.backend_tkagg import (
+            FigureCanvasTkAgg,
+            NavigationToolbar2Tk,
+        )
+        from matplotlib.figure import Figure
+
+        super().__init__(master, background="white")
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=5)
+        self.rowconfigure(1, weight=1)
+        self.figure = Figure()
+        self.canvas = FigureCanvasTkAgg(self.figure, self)
+        self.canvas.get_tk_widget().grid(row=0, column=0, sticky=tk.NSEW)
+        self.toolbar = NavigationToolbar2Tk(self.canvas, self, pack_toolbar=False)
+        self.toolbar.grid(row=1, column=0, sticky=tk.NSEW, padx=5, pady=5)
+
+    def new_axes(self, twin=False):
+        """
+        Removes the previous plot from the figure
+        Args:
+            twin: indicator whether a second y-axis sharing the x-axis is needed
+        Returns: axis, or tuple of both axes if twin
+        """
+        self.figure.clear()
+        axis = self.figure.add_subplot()
+        if twin:
+            return axis, axis.twinx()
+        return axis
+
+    def draw(self):
+        """
+        Schedules redrawing the canvas and shows the panel
+        """
+        self.canvas.draw_idle()
+        # the zoom/pan history belongs to the previous plot
+        self.toolbar.update()
+        self.tkraise()
+
+    def close(self):
+        """
+        Releases the figure and the widgets, e.g. when the explorer is destroyed
+        """
+        self.figure.clear()
+        self.destroy()
@@ -0,0 +1,150 @@
+import queue
+import threading
+
+from climate_risk_calc.tools import timing
+
+
+class TaskCancelled(Exception):
+    """
+    Raised inside a task that was cancelled or replaced by a newer task
+    """
+
+
+class Task:
+    """
+    Handle passed to the function running on the worker thread
+    """
+
+    def __init__(self, runner, generation):
+        self.runner = runner
+        self.generation = generation
+        self.cancelled = threading.Event()
+
+    def check(self):
+        """
+        Raises TaskCancelled if the task is no longer wanted, call it between expensive steps
+        """
+        if self.cancelled.is_set():
+            raise TaskCancelled()
+
+    def progress(self, message):
+        """
+        Shows message in the info bar, can be called from any thread
+        Args:
+            message: progress message
+        """
+        self.check()
+        self.runner.messages.put((self.generation, "progress", message))
+
+
+class TaskRunner:
+    """
+    Runs calculations and queries on a worker thread so that the Tk main loop stays
+    responsive. Results are handed back to the main thread by after() polling, results of
+    cancelled tasks, superseded tasks or tasks whose selection changed are dropped.
+    If spans are enabled (see timing.enable_spans), the info bar shows the stage timings of
+    every finished task
+    """
+
+    poll_interval = 50
+
+    def __init__(self, widget, on_progress):
+        """
+        Args:
+            widget: Tk widget used for after() polling
+            on_progress: function called on the main thread with progress messages
+        """
+        self.widget = widget
+        self.on_progress = on_progress
+        self.messages = queue.Queue()
+        self.task = None
+        self.generation = 0
+        self.polling = False
+        self.on_done = None
+        self.on_error = None
+        self.selection = None
+        self.submitted_selection = None
+        self.first_span = 0
+
+    def submit(self, func, on_done, description, on_error=None, selection=None):
+        """
+        Cancels the running task and starts func(task) on a worker thread
+        Args:
+            func: function computing the result, gets the Task as only argument
+            on_done: function called on the main thread with the result
+            description: message shown while the task runs
+            on_error: function called on the main thread with a raised exception
+            selection: function returning the current UI selection, the result is dropped
+                if it changed while the task was running
+        """
+        self.cancel(message=None)
+        self.generation += 1
+        self.task = Task(self, self.generation)
+        self.on_done = on_done
+        self.on_error = on_error
+        self.selection = selection
+        self.submitted_selection = selection() if selection is not None else None
+        self.first_span = timing.span_count()
+        self.on_progress(description)
+        threading.Thread(target=self._run, args=(self.task, func), daemon=True).start()
+        if not self.polling:
+            self.polling = True
+            self.widget.after(self.poll_interval, self._poll)
+
+    def cancel(self, message="Cancelled"):
+        """
+        Cancels the running task, its result will be dropped
+        Args:
+            message: message shown in the info bar, None to keep the current one
+        """
+        if self.task is None:
+            return
+        self.task.cancelled.set()
+        self.task = None
+        if message is not None:
+            self.on_progress(message)
+
+    def is_running(self):
+        return self.task is not None
+
+    def _run(self, task, func):
+        try:
+            result = func(task)
+        except TaskCancelled:
+            return
+        except Exception as e:
+            self.messages.put((task.generation, "error", e))
+            return
+        self.messages.put((task.generation, "done", result))
+
+    def _poll(self):
+        while True:
+            try:
+                generation, kind, payload = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if self.task is None or generation != self.generation:
+                continue
+            if kind == "progress":
+                self.on_progress(payload)
+                continue
+            self.task = None
+            if (
+                self.selection is not None
+                and self.selection() != self.submitted_selection
+            ):
+                self.on_progress("Selection changed, result discarded")
+            elif kind == "done":
+                self.on_progress("")
+                self.on_done(payload)
+                # stage timings of the task and of showing its result
+                if timing.spans_enabled():
+                    self.on_progress(timing.span_summary(since=self.first_span))
+            elif self.on_error is not None:
+                self.on_error(payload)
+            else:
+                self.on_progress("[ERROR] " + str(payload))
+        if self.task is not None:
+            self.widget.after(self.poll_interval, self._poll)
+        else:
+            self.polling = False
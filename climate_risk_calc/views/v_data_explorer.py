@@ -1,17 +1,22 @@
 import tkinter as tk
-import climate_risk_calc
 from tkinter import messagebox
 from tkinter import ttk
 
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-from pandastable import Table
-import climate_risk_calc.tools.graph_designer
 from climate_risk_calc import controller
-from climate_risk_calc.connections.iiasa_connection import IIASAConnection
-from climate_risk_calc.connections.limits_connection import LimitsConnection
+from climate_risk_calc.connections.registry import (
+    get_iiasa_connection,
+    get_limits_connection,
+)
+from climate_risk_calc.tools import timing
+from climate_risk_calc.tools.table_model import TableModel
+from climate_risk_calc.views.autocomplete import bind_autocomplete
+from climate_risk_calc.views.paged_table import PagedTable
+from climate_risk_calc.views.plot_panel import PlotPanel
+from climate_risk_calc.views.task_runner import TaskRunner
 
 font = "Arial 9"
+# time steps drawn per series, more are not distinguishable on screen
+MAX_POINTS = 1000
 
 
 class DataExplorer(tk.Frame):
@@ -33,16 +38,23 @@ class DataExplorer(tk.Frame):
         self.cbox_model = None
         self.cbox_source = None
         self.info_bar = None
+        # data sources, connected on first use
         self.ic = None
         self.lc = None
         self.graph_view = "G"
         self.table_view = "T"
         self.current_view = self.graph_view
         self.home_screen = None
+        self.info_text = None
+        self.task_runner = None
+        self.variable_tree = None
+        self.variable_values = []
+        self.plot_panel = None
+        self.table_frame = None
 
     def initialize(self):
-        self.ic = IIASAConnection()
-        self.lc = LimitsConnection()
+        self.info_text = tk.StringVar()
+        self.task_runner = TaskRunner(self, self.info_text.set)
         self.view_switch_button_text = tk.StringVar()
         self.view_switch_button_text.set("Switch to Table")
 
@@ -85,6 +97,8 @@ class DataExplorer(tk.Frame):
         self.graph_screen.columnconfigure(0, weight=1)
 
         self.table_screen = tk.Frame(master=self.plot_screen, background="white")
+        self.table_screen.rowconfigure(0, weight=1)
+        self.table_screen.columnconfigure(0, weight=1)
         self.placeholder.grid(row=0, column=0, sticky="nsew")
         self.graph_screen.grid(row=0, column=0, sticky="nsew")
         self.table_screen.grid(row=0, column=0, sticky="nsew")
@@ -102,6 +116,11 @@ class DataExplorer(tk.Frame):
         self.cbox_model = ttk.Combobox(var_selection)
         self.cbox_scenario = ttk.Combobox(var_selection)
         self.cbox_variable = ttk.Combobox(var_selection)
+        bind_autocomplete(
+            self.cbox_variable,
+            lambda: self.variable_tree,
+            lambda: self.variable_values,
+        )
         self.cbox_region = ttk.Combobox(var_selection)
         self.cbox_region.bind("<<ComboboxSelected>>", self.disable_region2)
         self.cbox_region2 = ttk.Combobox(var_selection)
@@ -176,11 +195,19 @@ class DataExplorer(tk.Frame):
 
         lbl_info = tk.Label(
             master=self.info_bar,
-            text="",
+            textvariable=self.info_text,
             font="Arial 11",
             background="lightblue",
         )
         lbl_info.grid(row=0, column=1, sticky="w", padx=10, pady=5)
+        btn_cancel = tk.Button(
+            master=self.info_bar,
+            text="Cancel",
+            background="white",
+            command=self.task_runner.cancel,
+            font="Arial 11",
+        )
+        btn_cancel.grid(row=0, column=1, sticky="e", padx=5, pady=3)
         btn_back_home = tk.Button(
             master=self.info_bar,
             text="Home",
@@ -231,56 +258,97 @@ class DataExplorer(tk.Frame):
         if regions_[1] == "":
             regions_ = regions_[0]
 
-        # get data as IamDataFrame
-        df = None
-        if self.cbox_source.get() == "IIASA":
-            df = self.ic.execute_query(
-                model=model_, scenario=scenario_, variable=variable_, region=regions_
-            )
-        elif self.cbox_source.get() == "LIMITS":
-            df = self.lc.execute_query(
+        # get data as IamDataFrame on a worker thread
+        source = self.cbox_source.get()
+        view = self.current_view
+
+        @timing.spanned("DataExplorer.on_load")
+        def query(task):
+            con = self.get_connection(source)
+            if con is None:
+                return None
+            return con.execute_query(
                 model=model_, scenario=scenario_, variable=variable_, region=regions_
             )
+
+        self.task_runner.submit(
+            query,
+            lambda df: self.show_data(df, view, model_, scenario_, variable_, regions_),
+            description="Loading data from " + source + " ...",
+            on_error=self.show_error,
+            selection=self.get_selection,
+        )
+
+    @timing.spanned()
+    def show_data(self, df, view, model_, scenario_, variable_, regions_):
         if df is None:
             messagebox.showwarning(
                 message="Dataframe is empty!", title="Empty dataframe"
             )
             return
-        if self.current_view == self.graph_view:
-            fig, ax = plt.subplots()
-            ax.clear()
-            canvas = FigureCanvasTkAgg(figure=fig, master=self.graph_screen)
-            canvas.get_tk_widget().grid(row=0, column=0, sticky="nsew", padx=0, pady=0)
-            toolbar_frame = tk.Frame(master=self.plot_screen, background="white")
-            toolbar_frame.rowconfigure(0, weight=1)
-            toolbar_frame.columnconfigure(0, weight=1)
-            toolbar_frame.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
-
-            navigation_toolbar = NavigationToolbar2Tk(
-                canvas=canvas, window=toolbar_frame
-            )
-            navigation_toolbar.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
+        if view == self.graph_view:
+            import climate_risk_calc.tools.graph_designer
+
+            # one figure and canvas for all plots, created on first use
+            if self.plot_panel is None:
+                self.plot_panel = PlotPanel(self.graph_screen)
+                self.plot_panel.grid(row=0, column=0, sticky="nsew", rowspan=2)
+            ax = self.plot_panel.new_axes()
             title = model_ + ", " + scenario_ + ", " + regions_ + ", " + variable_
-            climate_risk_calc.tools.graph_designer.simple_graph(df, ax, title, "solid")
-            canvas.draw()
+            # all series in one collection, "All" regions or scenarios are hundreds of lines
+            climate_risk_calc.tools.graph_designer.series_graph(
+                df, ax, title, "solid", max_points=MAX_POINTS
+            )
+            self.plot_panel.draw()
             self.graph_screen.tkraise()
             self.graph_screen.tkraise()
-        elif self.current_view == self.table_view:
-            pt = Table(
-                parent=self.table_screen,
-                dataframe=df.data.sort_values(
-                    ["region", "year"], ascending=[True, True]
-                ),
-            )
-            pt.grid(row=1, column=1, sticky=tk.NSEW)
-            pt.show()
-            pt.update()
+        elif view == self.table_view:
+            # the previous table is destroyed instead of stacking a new one on top
+            if self.table_frame is not None:
+                self.table_frame.destroy()
+            model = TableModel.from_coded_frame(df)
+            model.sort([("region", True), (df.time_col, True)])
+            self.table_frame = PagedTable(self.table_screen, model)
+            self.table_frame.grid(row=0, column=0, sticky=tk.NSEW)
             self.table_screen.tkraise()
             self.table_screen.tkraise()
-            pt.update()
+
+    def get_selection(self):
+        """
+        Returns: tuple of all selected values, a running query is stale once it changes
+        """
+        return (
+            self.cbox_source.get(),
+            self.cbox_model.get(),
+            self.cbox_variable.get(),
+            self.cbox_scenario.get(),
+            self.cbox_region.get(),
+            self.cbox_region2.get(),
+            self.current_view,
+        )
+
+    def show_error(self, error):
+        self.info_text.set("")
+        messagebox.showwarning(message=str(error), title="Query error")
+
+    def get_connection(self, source):
+        """
+        Connects to the data source on first use, may be called from the worker thread
+        Args:
+            source: "IIASA" or "LIMITS"
+        Returns: connection of the source or None
+        """
+        if source == "IIASA":
+            if self.ic is None:
+                self.ic = get_iiasa_connection()
+            return self.ic
+        elif source == "LIMITS":
+            if self.lc is None:
+                self.lc = get_limits_connection()
+            return self.lc
+        return None
 
     def fill_boxes(self, event):
-        con = None
         for C in {
             self.cbox_model,
             self.cbox_variable,
@@ -289,20 +357,42 @@ class DataExplorer(tk.Frame):
             self.cbox_region2,
         }:
             C.set("")
-        if self.cbox_source.get() == "IIASA":
-            con = self.ic
-            self.cbox_model.configure(values=con.get_models())
-            self.cbox_scenario.configure(values=con.get_scenarios() + ["All"])
-            self.cbox_variable.configure(values=con.get_variables())
-            self.cbox_region.configure(values=con.get_regions() + ["All"])
-            self.cbox_region2.configure(values=con.get_regions())
-        elif self.cbox_source.get() == "LIMITS":
-            con = self.lc
-            self.cbox_model.configure(values=con.get_models())
-            self.cbox_scenario.configure(values=con.get_scenarios() + ["All"])
-            self.cbox_variable.configure(values=con.get_energy_variables())
-            self.cbox_region.configure(values=con.get_regions() + ["All", "Sample"])
-            self.cbox_region2.configure(values=con.get_regions())
+        source = self.cbox_source.get()
+
+        def get_values(task):
+            con = self.get_connection(source)
+            if source == "IIASA":
+                values = {
+                    self.cbox_model: con.get_models(),
+                    self.cbox_scenario: con.get_scenarios() + ["All"],
+                    self.cbox_variable: con.get_variables(),
+                    self.cbox_region: con.get_regions() + ["All"],
+                    self.cbox_region2: con.get_regions(),
+                }
+            else:
+                values = {
+                    self.cbox_model: con.get_models(),
+                    self.cbox_scenario: con.get_scenarios() + ["All"],
+                    self.cbox_variable: con.get_energy_variables(),
+                    self.cbox_region: con.get_regions() + ["All", "Sample"],
+                    self.cbox_region2: con.get_regions(),
+                }
+            # built here, the tree of all IIASA variables takes a moment
+            return values, con.variable_tree
+
+        def set_values(result):
+            values, self.variable_tree = result
+            self.variable_values = values[self.cbox_variable]
+            for C, v in values.items():
+                C.configure(values=v)
+
+        self.task_runner.submit(
+            get_values,
+            set_values,
+            description="Connecting to " + source + " ...",
+            on_error=self.show_error,
+            selection=self.cbox_source.get,
+        )
 
     def switch_view(self):
         if self.current_view == self.graph_view:
@@ -1,8 +1,7 @@
 import tkinter as tk
 from tkinter import ttk
-import climate_risk_calc.views.v_scenario_explorer as scenario_explorer
-import climate_risk_calc.views.v_data_explorer as data_explorer
 from climate_risk_calc import controller
+from climate_risk_calc.tools import timing
 
 
 class HomeScreen(tk.Frame):
@@ -13,6 +12,8 @@ class HomeScreen(tk.Frame):
     def __init__(self, master):
         super().__init__(master, background="white")
         self.master = master
+        self.dataexplorer = None
+        self.scenexplorer = None
 
     def initialize(self):
         self.columnconfigure(0, weight=1)
@@ -24,8 +25,6 @@ class HomeScreen(tk.Frame):
         self.rowconfigure(2, weight=1)
         self.rowconfigure(3, weight=2)
         self.rowconfigure(4, weight=1)
-        dataexplorer = data_explorer.DataExplorer(self.master)
-        scenexplorer = scenario_explorer.ScenarioExplorer(self.master)
 
         lbl_title = ttk.Label(
             self,
@@ -37,12 +36,12 @@ class HomeScreen(tk.Frame):
         btn_to_dataexplorer = ttk.Button(
             self,
             text="Data Explorer",
-            command=lambda: controller.switch_view(dataexplorer),
+            command=self.open_data_explorer,
         )
         btn_to_scenarioexplorer = ttk.Button(
             self,
             text="Mode Explorer",
-            command=lambda: controller.switch_view(scenexplorer),
+            command=self.open_scenario_explorer,
         )
         lbl_dataexplorer = tk.Label(
             self,
@@ -62,6 +61,14 @@ class HomeScreen(tk.Frame):
             justify="left",
             anchor="nw",
         )
+        # stage timings shown in the info bar of the explorers
+        self.spans_enabled = tk.BooleanVar(value=timing.spans_enabled())
+        chk_timings = ttk.Checkbutton(
+            self,
+            text="Show stage timings",
+            variable=self.spans_enabled,
+            command=lambda: timing.enable_spans(self.spans_enabled.get()),
+        )
         lbl_background = tk.Label(
             self,
             text="Program created for Bachelor Thesis by Henri Dannenhöfer",
@@ -76,11 +83,33 @@ class HomeScreen(tk.Frame):
         lbl_dataexplorer.grid(row=1, column=2, sticky=tk.NSEW, padx=5, pady=5)
         lbl_scenexplorer.grid(row=2, column=2, sticky=tk.NSEW, padx=5, pady=5)
         lbl_background.grid(row=0, column=2, sticky=tk.NSEW, padx=5, pady=5)
-
-        dataexplorer.initialize()
-        dataexplorer.grid(row=0, column=0, sticky="nsew")
-        dataexplorer.set_home_screen(self)
-        scenexplorer.initialize()
-        scenexplorer.grid(row=0, column=0, sticky="nsew")
-        scenexplorer.set_home_screen(self)
+        chk_timings.grid(row=4, column=1, sticky="w", padx=5, pady=5)
         self.tkraise()
+
+    def open_data_explorer(self):
+        # the explorers and their imports are built on first navigation
+        if self.dataexplorer is None:
+            with timing.timed("Build Data Explorer"):
+                from climate_risk_calc.views.v_data_explorer import DataExplorer
+
+                self.dataexplorer = self.build_explorer(DataExplorer)
+            timing.report()
+        controller.switch_view(self.dataexplorer)
+
+    def open_scenario_explorer(self):
+        if self.scenexplorer is None:
+            with timing.timed("Build Scenario Explorer"):
+                from climate_risk_calc.views.v_scenario_explorer import (
+                    ScenarioExplorer,
+                )
+
+                self.scenexplorer = self.build_explorer(ScenarioExplorer)
+            timing.report()
+        controller.switch_view(self.scenexplorer)
+
+    def build_explorer(self, explorer_class):
+        explorer = explorer_class(self.master)
+        explorer.initialize()
+        explorer.grid(row=0, column=0, sticky="nsew")
+        explorer.set_home_screen(self)
+        return explorer
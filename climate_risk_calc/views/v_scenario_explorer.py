@@ -2,14 +2,18 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter.filedialog import askopenfilename
 import pandas as pd
-from matplotlib import pyplot as plt
-from matplotlib.backends._backend_tk import NavigationToolbar2Tk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from pandastable import Table
 from climate_risk_calc import controller
-import climate_risk_calc.tools.graph_designer
-import climate_risk_calc.tools.calculator
-from climate_risk_calc.connections.limits_connection import LimitsConnection
+from climate_risk_calc.connections.registry import (
+    get_evaluation_cache,
+    get_limits_connection,
+    get_shock_cube,
+)
+from climate_risk_calc.tools import calculator, timing
+from climate_risk_calc.tools.table_model import TableModel
+from climate_risk_calc.views.autocomplete import bind_autocomplete
+from climate_risk_calc.views.paged_table import PagedTable
+from climate_risk_calc.views.plot_panel import PlotPanel
+from climate_risk_calc.views.task_runner import TaskRunner
 
 
 class ScenarioExplorer(tk.Frame):
@@ -33,11 +37,18 @@ class ScenarioExplorer(tk.Frame):
         self.market_shock_plot_mode = "Market Shocks"
         self.loan_evaluation_mode = "Loan Evaluation"
         self.top_shock_mode = "Top Shocks"
-        self.top_shock_df = None
+        self.trajectory_mode = "Shock Trajectories"
         self.home_screen = None
+        self.info_text = None
+        self.task_runner = None
+        self.variable_values = []
+        self.plot_panel = None
+        self.table_frame = None
 
     def initialize(self):
-        self.lc = LimitsConnection()
+        self.lc = get_limits_connection()
+        self.info_text = tk.StringVar()
+        self.task_runner = TaskRunner(self, self.info_text.set)
         pd.set_option("display.float_format", "{:.2f}".format)
         self.columnconfigure(0, weight=1)
         self.columnconfigure(1, weight=3)
@@ -51,6 +62,19 @@ class ScenarioExplorer(tk.Frame):
         info_bar.columnconfigure(1, weight=4)
         info_bar.columnconfigure(2, weight=1)
         info_bar.rowconfigure(0, weight=1)
+        btn_cancel = tk.Button(
+            info_bar,
+            text="Cancel",
+            command=self.task_runner.cancel,
+        )
+        btn_cancel.grid(row=0, column=0, padx=5, pady=5, sticky=tk.NSEW)
+        lbl_info = tk.Label(
+            info_bar,
+            textvariable=self.info_text,
+            font="Arial 11",
+            background="lightblue",
+        )
+        lbl_info.grid(row=0, column=1, padx=10, pady=5, sticky="w")
         btn_back_home = tk.Button(
             info_bar,
             text="Home",
@@ -103,6 +127,11 @@ class ScenarioExplorer(tk.Frame):
         self.cbox_model.configure(values=self.lc.get_models())
         self.cbox_scenario = ttk.Combobox(self.selection_frame)
         self.cbox_variable = ttk.Combobox(self.selection_frame)
+        bind_autocomplete(
+            self.cbox_variable,
+            lambda: self.lc.variable_tree,
+            lambda: self.variable_values,
+        )
         self.cbox_region = ttk.Combobox(self.selection_frame)
         btn_load_data = tk.Button(
             master=self.selection_frame,
@@ -249,6 +278,7 @@ class ScenarioExplorer(tk.Frame):
                 self.market_shock_plot_mode,
                 self.loan_evaluation_mode,
                 self.top_shock_mode,
+                self.trajectory_mode,
             ]
         )
         self.mode_description = tk.StringVar()
@@ -279,129 +309,209 @@ class ScenarioExplorer(tk.Frame):
         self.plot_table_frame.grid_propagate(False)
 
     def plot_market_share(self):
-        frame_ms = tk.Frame(self.plot_table_frame, background="white")
-        frame_ms.columnconfigure(0, weight=1)
-        frame_ms.rowconfigure(0, weight=5)
-        frame_ms.rowconfigure(1, weight=1)
-        fig, ax = plt.subplots()
-        canvas = FigureCanvasTkAgg(fig, frame_ms)
-        navigation_toolbar = NavigationToolbar2Tk(canvas, frame_ms)
-        navigation_toolbar.grid(row=1, column=0, sticky=tk.NSEW, padx=5, pady=5)
-        canvas.get_tk_widget().grid(row=0, column=0, sticky=tk.NSEW)
-
-        variables = [self.cbox_variable.get()]
-        base_sector = str.rsplit(self.cbox_variable.get(), "|", 1)[0]
-        variables.append(base_sector)
-
-        dataframe = self.lc.execute_query(
-            model=self.cbox_model.get(),
-            scenario=self.cbox_scenario.get(),
-            region=self.cbox_region.get(),
-            variable=variables,
-        )
-        market_shares = climate_risk_calc.tools.calculator.get_market_shares(dataframe)
-        climate_risk_calc.tools.graph_designer.graph_market_shares(
-            market_shares, ax, self.cbox_variable.get()
+        model = self.cbox_model.get()
+        scenario = self.cbox_scenario.get()
+        region = self.cbox_region.get()
+        variable = self.cbox_variable.get()
+
+        @timing.spanned("ScenarioExplorer.plot_market_share")
+        def calculate(task):
+            models, scenarios, regions, variables = self.lc.expand_selection(
+                model=model, scenario=scenario, region=region, variable=variable
+            )
+            return get_shock_cube().market_shares(
+                models[0], scenarios, regions, variables[0]
+            )
+
+        self.task_runner.submit(
+            calculate,
+            lambda market_shares: self.draw_market_share(market_shares, variable),
+            description="Calculating market shares ...",
+            on_error=self.show_error,
+            selection=self.get_selection,
         )
-        canvas.draw()
 
-        frame_ms.grid(row=0, column=0, sticky=tk.NSEW)
-        frame_ms.tkraise()
+    @timing.spanned()
+    def draw_market_share(self, market_shares, variable):
+        import climate_risk_calc.tools.graph_designer
+
+        ax = self.get_plot_panel().new_axes()
+        climate_risk_calc.tools.graph_designer.graph_market_shares(
+            market_shares.to_iamdataframe(), ax, variable
+        )
+        self.plot_panel.draw()
 
     def plot_market_shocks(self):
-        frame_ms = tk.Frame(self.plot_table_frame, background="white")
-        frame_ms.columnconfigure(0, weight=1)
-        frame_ms.rowconfigure(0, weight=5)
-        frame_ms.rowconfigure(1, weight=1)
-        fig, ax = plt.subplots()
-        ax2 = ax.twinx()
-        canvas = FigureCanvasTkAgg(fig, frame_ms)
-        navigation_toolbar = NavigationToolbar2Tk(canvas, frame_ms)
-        navigation_toolbar.grid(row=1, column=0, sticky=tk.NSEW, padx=5, pady=5)
-        canvas.get_tk_widget().grid(row=0, column=0, sticky=tk.NSEW)
-
-        variables = [self.cbox_variable.get()]
-        base_sector = str.rsplit(self.cbox_variable.get(), "|", 1)[0]
-        variables.append(base_sector)
-
-        dataframe = self.lc.execute_query(
-            model=self.cbox_model.get(),
-            scenario=self.cbox_scenario.get(),
-            region=self.cbox_region.get(),
-            variable=variables,
-        )
-        market_shares = climate_risk_calc.tools.calculator.get_market_shares(dataframe)
-        market_shocks = climate_risk_calc.tools.calculator.get_market_share_shocks(dataframe)
+        model = self.cbox_model.get()
+        scenarios = self.cbox_scenario.get().split(",")
+        region = self.cbox_region.get()
+        variable = self.cbox_variable.get()
+
+        @timing.spanned("ScenarioExplorer.plot_market_shocks")
+        def calculate(task):
+            shock_cube = get_shock_cube()
+            market_shares = shock_cube.market_shares(
+                model, scenarios, [region], variable
+            )
+            task.check()
+            market_shocks = shock_cube.market_share_shocks(
+                model, scenarios[1], region, variable
+            )
+            return market_shares, market_shocks
+
+        self.task_runner.submit(
+            calculate,
+            lambda result: self.draw_market_shocks(*result, scenarios),
+            description="Calculating market share shocks ...",
+            on_error=self.show_error,
+            selection=self.get_selection,
+        )
+
+    @timing.spanned()
+    def draw_market_shocks(self, market_shares, market_shocks, scenarios):
+        import climate_risk_calc.tools.graph_designer
 
+        ax, ax2 = self.get_plot_panel().new_axes(twin=True)
         climate_risk_calc.tools.graph_designer.graph_market_shocks(
-            market_shares, market_shocks, self.cbox_scenario.get().split(","), ax, ax2
+            market_shares.to_iamdataframe(),
+            market_shocks.to_iamdataframe(),
+            scenarios,
+            ax,
+            ax2,
         )
-
-        frame_ms.grid(row=0, column=0, sticky=tk.NSEW)
-        frame_ms.tkraise()
+        self.plot_panel.draw()
 
     def evaluate_loans(self, rr, el, year, top=False, model=None, ref_scenario=None):
+        file_name = self.full_file_name
         if top:
-            # save top shocks after calculating once
-            if self.top_shock_df is None:
-                df = climate_risk_calc.tools.calculator.get_top_shocks(
+
+            @timing.spanned("ScenarioExplorer.evaluate_loans")
+            def calculate(task):
+                df = get_evaluation_cache().get_top_shocks(
                     year=year,
-                    file_name=self.full_file_name,
+                    file_name=file_name,
                     recovery_rate=rr,
                     elasticity=el,
+                    progress=task.progress,
                 )
                 # df = df.sort_values(by=["max_shock"], ascending=False)
-                self.top_shock_df = df
-                self.top_shock_df["total_neg"] = self.top_shock_df["total_neg"].astype(
-                    str
-                )
-                self.top_shock_df["min_shock"] = self.top_shock_df["min_shock"].astype(
-                    str
-                )
-                self.top_shock_df["project_VaR"] = self.top_shock_df[
-                    "project_VaR"
-                ].astype(str)
+                return TableModel.from_dataframe(df)
 
-            else:
-                df = self.top_shock_df
+            on_done = self.show_table
+            description = "Calculating top shocks ..."
         else:
-            df = climate_risk_calc.tools.calculator.get_shocks(
-                model=model,
-                ref_scenario=ref_scenario,
-                recovery_rate=rr,
-                elasticity=el,
-                year=year,
-                file_name=self.full_file_name,
+
+            @timing.spanned("ScenarioExplorer.evaluate_loans")
+            def calculate(task):
+                df = get_evaluation_cache().get_shocks(
+                    model=model,
+                    ref_scenario=ref_scenario,
+                    recovery_rate=rr,
+                    elasticity=el,
+                    year=year,
+                    file_name=file_name,
+                )
+                # sorted and formatted in the table model, only shown rows become text
+                table = TableModel.from_dataframe(df, decimals={"shock": 2})
+                table.sort([("shock", False)])
+                return table
+
+            on_done = self.show_table
+            description = "Calculating shocks ..."
+
+        self.task_runner.submit(
+            calculate,
+            on_done,
+            description=description,
+            on_error=self.show_error,
+            selection=self.get_selection,
+        )
+
+    @timing.spanned()
+    def plot_trajectories(self, rr, el):
+        file_name = self.full_file_name
+
+        @timing.spanned("ScenarioExplorer.plot_trajectories")
+        def calculate(task):
+            return calculator.get_portfolio_trajectories(
+                file_name=file_name, recovery_rate=rr, elasticity=el
             )
-            df = df.sort_values(["shock"], ascending=False)
-            df = df.round({"shock": 2})
-            df["shock"] = df["shock"].astype(str)
 
-        frame_ms = tk.Frame(self.plot_table_frame, background="white")
-        pt = Table(parent=frame_ms, dataframe=df)
-        pt.grid(row=1, column=1, sticky=tk.NSEW)
-        pt.update()
+        self.task_runner.submit(
+            calculate,
+            self.draw_trajectories,
+            description="Calculating shock trajectories ...",
+            on_error=self.show_error,
+            selection=self.get_selection,
+        )
+
+    @timing.spanned()
+    def draw_trajectories(self, trajectories):
+        import climate_risk_calc.tools.graph_designer
+
+        ax = self.get_plot_panel().new_axes()
+        climate_risk_calc.tools.graph_designer.graph_trajectories(trajectories, ax)
+        self.plot_panel.draw()
+
+    @timing.spanned()
+    def show_table(self, model):
+        """
+        Args:
+            model: TableModel of the rows to show
+        """
+        # the previous table is destroyed instead of stacking a new one on top
+        if self.table_frame is not None:
+            self.table_frame.destroy()
+        self.table_frame = PagedTable(self.plot_table_frame, model)
+        self.table_frame.grid(row=0, column=0, sticky=tk.NSEW, rowspan=2)
+        self.table_frame.tkraise()
+
+    def get_plot_panel(self):
+        """
+        Returns: PlotPanel shared by all plots of the explorer, created on first use
+        """
+        if self.plot_panel is None:
+            self.plot_panel = PlotPanel(self.plot_table_frame)
+            self.plot_panel.grid(row=0, column=0, sticky=tk.NSEW)
+        return self.plot_panel
+
+    def get_selection(self):
+        """
+        Returns: tuple of all selected values, a running task is stale once it changes
+        """
+        return (
+            self.mode,
+            self.cbox_model.get(),
+            self.cbox_scenario.get(),
+            self.cbox_variable.get(),
+            self.cbox_region.get(),
+            self.cbox_model_loans.get(),
+            self.cbox_reference_scenario_loans.get(),
+            self.year_slider.get(),
+            self.rrate_slider.get(),
+            self.elasticity_slider.get(),
+            self.full_file_name,
+        )
 
-        pt.show()
-        pt.update()
-        frame_ms.grid(row=0, column=0, sticky=tk.NSEW, rowspan=2)
-        frame_ms.tkraise()
-        pt.update()
+    def show_error(self, error):
+        self.info_text.set("")
+        messagebox.showwarning(message=str(error), title="Calculation error")
 
     def fill_boxes(self, event):
         model = self.cbox_model.get()
+        self.variable_values = self.lc.get_energy_variables(model)
         if self.mode == self.market_share_mode:
             self.cbox_scenario.configure(
                 values=self.lc.get_scenarios(model) + ["Sample scenarios (3)"]
             )
             self.cbox_region.configure(values=self.lc.get_regions(model) + ["sample"])
 
-            self.cbox_variable.configure(values=self.lc.get_energy_variables(model))
+            self.cbox_variable.configure(values=self.variable_values)
 
         elif self.mode == self.market_shock_plot_mode:
             self.cbox_scenario.configure(values=self.lc.get_scenario_comparisons())
             self.cbox_region.configure(values=self.lc.get_regions(model))
-            self.cbox_variable.configure(values=self.lc.get_energy_variables(model))
+            self.cbox_variable.configure(values=self.variable_values)
 
     def load_data(self):
         """
@@ -448,6 +558,10 @@ class ScenarioExplorer(tk.Frame):
                 year=int(self.year_slider.get()),
                 top=True,
             )
+        elif self.mode == self.trajectory_mode:
+            self.plot_trajectories(
+                rr=self.rrate_slider.get(), el=self.elasticity_slider.get()
+            )
 
     def switch_mode(self, event):
         self.mode = self.cbox_mode_picker.get()
@@ -475,6 +589,7 @@ class ScenarioExplorer(tk.Frame):
             self.cbox_reference_scenario_loans.set("")
             self.cbox_reference_scenario_loans.configure(state="normal")
             self.rrate_slider.set(0)
+            self.year_slider.configure(state="normal")
             self.year_slider.set("2030")
             self.elasticity_slider.set(1)
             self.mode_description.set("Table of potential losses")
@@ -486,12 +601,25 @@ class ScenarioExplorer(tk.Frame):
             self.cbox_reference_scenario_loans.set("")
             self.cbox_reference_scenario_loans.configure(state="disabled")
             self.rrate_slider.set(0)
+            self.year_slider.configure(state="normal")
             self.year_slider.set("2030")
             self.elasticity_slider.set(1)
             self.mode_description.set(
                 "Table of top negative and positive shocks on loans"
             )
 
+        elif self.mode == self.trajectory_mode:
+            self.selection_frame_loans.tkraise()
+            self.cbox_model_loans.set("")
+            self.cbox_model_loans.configure(state="disabled")
+            self.cbox_reference_scenario_loans.set("")
+            self.cbox_reference_scenario_loans.configure(state="disabled")
+            self.rrate_slider.set(0)
+            # all years are evaluated at once
+            self.year_slider.configure(state="disabled")
+            self.elasticity_slider.set(1)
+            self.mode_description.set("Plot of potential portfolio losses over time")
+
     def set_home_screen(self, frame):
         self.home_screen = frame
 
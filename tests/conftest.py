@@ -0,0 +1,119 @@
+import os
+
+import pandas as pd
+import pytest
+
+from climate_risk_calc.benchmarks import synthetic
+from climate_risk_calc.connections import registry
+from climate_risk_calc.connections.limits_connection import LimitsConnection
+from climate_risk_calc.tools.shock_cube import ShockCube
+
+
+@pytest.fixture(scope="session")
+def labels():
+    return synthetic.get_labels(
+        n_models=2, n_scenarios=5, n_regions=3, n_sectors=3, n_years=15
+    )
+
+
+@pytest.fixture(scope="session")
+def scenario_file(tmp_path_factory, labels):
+    """
+    IAMC-formatted CSV-file of synthetic scenario data in the layout of LIMITS.csv
+    """
+    file_name = str(tmp_path_factory.mktemp("scenarios") / "scenarios.csv")
+    synthetic.write_scenario_data(file_name, labels)
+    return file_name
+
+
+@pytest.fixture(scope="session")
+def limits_connection_factory(tmp_path_factory):
+    """
+    Returns: function creating a LimitsConnection over an IAMC-formatted CSV-file instead of
+        LIMITS.csv, with its own cache
+    """
+
+    def create(source_file, **kwargs):
+        connection_class = type(
+            "SyntheticLimitsConnection",
+            (LimitsConnection,),
+            {
+                "source_file": source_file,
+                "cache_dir": str(tmp_path_factory.mktemp("limits") / ".cache"),
+            },
+        )
+        return connection_class(**kwargs)
+
+    return create
+
+
+@pytest.fixture(scope="session")
+def limits_connection(limits_connection_factory, scenario_file):
+    """
+    LimitsConnection over the synthetic scenario data
+    """
+    return limits_connection_factory(scenario_file)
+
+
+@pytest.fixture(scope="session")
+def scenario_data(scenario_file):
+    """
+    The synthetic scenario data as long pandas dataframe with the columns of
+    IamDataFrame.data, read without pyam or the connections
+    """
+    wide = pd.read_csv(scenario_file, encoding="cp1252")
+    wide.columns = [c.lower() for c in wide.columns]
+    data = wide.melt(
+        id_vars=["model", "scenario", "region", "variable", "unit"],
+        var_name="year",
+        value_name="value",
+    )
+    data["year"] = data["year"].astype(int)
+    return data
+
+
+@pytest.fixture(scope="session")
+def reference_shocks(scenario_data):
+    """
+    Market shares (in percent) and market share shocks against the base scenario of every
+    sector, region and year of the synthetic data, computed with plain pandas merges like
+    the original pyam calculation
+    Returns: pandas dataframe with columns model, scenario, region, variable, year, share
+        and shock
+    """
+    keys = ["model", "scenario", "region", "year"]
+    data = scenario_data.drop(columns="unit")
+    base = data[data["variable"] == synthetic.BASE_SECTOR]
+    sectors = data[data["variable"] != synthetic.BASE_SECTOR]
+    shares = sectors.merge(base[keys + ["value"]], on=keys, suffixes=("", "_base"))
+    shares["share"] = shares["value"] / shares["value_base"] * 100
+    base_shares = shares[shares["scenario"] == "LIMITS-Base"]
+    shares = shares.merge(
+        base_shares[["model", "region", "variable", "year", "share"]],
+        on=["model", "region", "variable", "year"],
+        suffixes=("", "_base"),
+    )
+    shares["shock"] = (shares["share"] - shares["share_base"]) / shares["share_base"]
+    return shares[["model", "scenario", "region", "variable", "year", "share", "shock"]]
+
+
+@pytest.fixture(scope="session")
+def shock_cube(limits_connection):
+    return ShockCube(limits_connection)
+
+
+@pytest.fixture
+def shared_limits(limits_connection):
+    """
+    Makes the synthetic data the process-wide LIMITS data of the calculator
+    """
+    registry.use_limits_connection(limits_connection)
+    yield limits_connection
+    registry.reset()
+
+
+@pytest.fixture(scope="session")
+def portfolio(tmp_path_factory, labels):
+    file_name = str(tmp_path_factory.mktemp("portfolio") / "loans.csv")
+    synthetic.write_loans(file_name, 500, labels)
+    return file_name
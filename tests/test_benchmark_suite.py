@@ -0,0 +1,52 @@
+import copy
+
+import pytest
+
+from climate_risk_calc.benchmarks import suite
+
+BASELINE = {
+    "config": {"models": 4, "loans": [1000]},
+    "environment": {
+        "python": "3.11.7",
+        "numpy": "1.26.4",
+        "pandas": "2.2.2",
+        "machine": "x86_64",
+        "processor": "",
+        "cpus": 8,
+    },
+    "results": {"evaluate": {"best": 1.0}, "load": {"best": 0.001}},
+}
+
+
+def report(**results):
+    current = copy.deepcopy(BASELINE)
+    for name, best in results.items():
+        current["results"][name]["best"] = best
+    return current
+
+
+def test_regressions_beyond_the_tolerance_are_reported():
+    assert suite.compare(report(evaluate=1.2), BASELINE) == []
+    assert suite.compare(report(evaluate=1.3), BASELINE) == [("evaluate", 1.0, 1.3)]
+    # below MIN_DIFFERENCE slowdowns are noise
+    assert suite.compare(report(load=0.004), BASELINE) == []
+
+
+@pytest.mark.parametrize(
+    "key, value", [("cpus", 1), ("python", "3.12.0"), ("numpy", "2.0.0")]
+)
+def test_other_environments_are_not_compared(key, value, capsys):
+    current = report(evaluate=3.0)
+    current["environment"][key] = value
+
+    assert suite.environment_differences(current, BASELINE) == [
+        (key, BASELINE["environment"][key], value)
+    ]
+    assert suite.compare(current, BASELINE) is None
+    assert "--save-baseline" in capsys.readouterr().out
+
+
+def test_other_configurations_are_not_compared():
+    current = report(evaluate=3.0)
+    current["config"]["loans"] = [1000000]
+    assert suite.compare(current, BASELINE) is None
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from climate_risk_calc.tools import calculator
+
+
+def expected_shocks(reference_shocks, loans, model, scenario, year, rr=0, el=1):
+    """
+    Shock of every loan looked up loan by loan in the reference shocks, like the original
+    loop over the portfolio
+    """
+    keys = ["model", "scenario", "region", "variable", "year"]
+    shocks = reference_shocks.set_index(keys)["shock"].clip(upper=1)
+    loans = loans[["region", "sector", "amount"]]
+    return np.array(
+        [
+            amount * (1 - rr) * el * shocks[(model, scenario, region, sector, year)]
+            for region, sector, amount in loans.itertuples(index=False)
+        ]
+    )
+
+
+@pytest.mark.parametrize("year", [2005, 2030, 2100])
+def test_get_shocks_equals_the_loop_over_the_loans(
+    shared_limits, reference_shocks, labels, portfolio, year
+):
+    model, scenario = labels["models"][1], labels["scenarios"][2]
+    shocked = calculator.get_shocks(model, scenario, year, portfolio, 0.4, 1.5)
+
+    loans = pd.read_csv(portfolio)
+    pd.testing.assert_frame_equal(shocked[loans.columns], loans)
+    np.testing.assert_allclose(
+        shocked["shock"],
+        expected_shocks(reference_shocks, loans, model, scenario, year, 0.4, 1.5),
+        rtol=1e-12,
+    )
+
+
+def test_shock_table_has_one_clipped_shock_per_pair(
+    shared_limits, reference_shocks, labels
+):
+    model, scenario = labels["models"][0], labels["scenarios"][3]
+    pairs = pd.DataFrame(
+        {
+            "region": [labels["regions"][0], labels["regions"][1]] * 2,
+            "sector": [labels["sectors"][0]] * 2 + [labels["sectors"][2]] * 2,
+        }
+    )
+    table = calculator.get_shock_table(model, scenario, pd.concat([pairs, pairs]), 2050)
+
+    pd.testing.assert_frame_equal(table[["region", "sector"]], pairs)
+    expected = expected_shocks(
+        reference_shocks, pairs.assign(amount=1), model, scenario, 2050
+    )
+    np.testing.assert_allclose(table["shock"], expected, rtol=1e-12)
+    assert (table["shock"] <= 1).all()
+
+
+def test_unknown_pairs_are_an_error(shared_limits, labels):
+    pairs = pd.DataFrame({"region": ["NOWHERE"], "sector": [labels["sectors"][0]]})
+    with pytest.raises(ValueError):
+        calculator.get_shock_table(
+            labels["models"][0], labels["scenarios"][1], pairs, 2030
+        )
+
+
+def test_top_shocks_of_an_empty_grid(shared_limits, portfolio):
+    progress = []
+    for chunksize in [None, 100]:
+        top_shocks = calculator.get_top_shock_statistics(
+            2030, portfolio, models=[], chunksize=chunksize, progress=progress.append
+        )
+        assert len(top_shocks) == 0
+        assert list(top_shocks.columns[:2]) == ["model", "scenario"]
+    assert progress == []
+    assert len(calculator.get_top_shocks(2030, portfolio, models=[])) == 0
+
+
+def test_streamed_top_shocks_equal_the_loaded_portfolio(
+    shared_limits, labels, portfolio
+):
+    arguments = dict(
+        year=2030,
+        file_name=portfolio,
+        recovery_rate=0.4,
+        models=labels["models"],
+        scenarios="all",
+        confidence_level=[0.1, 0.95],
+    )
+    loaded = calculator.get_top_shock_statistics(**arguments)
+    streamed = calculator.get_top_shock_statistics(chunksize=64, **arguments)
+
+    assert len(loaded) == len(labels["models"]) * (len(labels["scenarios"]) - 1)
+    pd.testing.assert_frame_equal(loaded, streamed, rtol=1e-9)
+
+
+def test_progress_errors_abort_the_streamed_calculation(shared_limits, portfolio):
+    def progress(message):
+        raise InterruptedError(message)
+
+    with pytest.raises(InterruptedError):
+        calculator.get_top_shock_statistics(
+            2030, portfolio, chunksize=100, progress=progress
+        )
+
+
+def test_shock_trajectories_equal_the_yearly_shocks(
+    shared_limits, reference_shocks, labels, portfolio
+):
+    model, scenario = labels["models"][0], labels["scenarios"][4]
+    years = [2020, 2050, 2100]
+    trajectories = calculator.get_shock_trajectories(
+        model, scenario, portfolio, 0.2, 1.3, years=years
+    )
+
+    loans = pd.read_csv(portfolio)
+    for year in years:
+        np.testing.assert_allclose(
+            trajectories[year],
+            expected_shocks(reference_shocks, loans, model, scenario, year, 0.2, 1.3),
+            rtol=1e-12,
+        )
+
+
+def test_portfolio_trajectories_equal_the_sums_over_the_loans(
+    shared_limits, reference_shocks, labels, portfolio, tmp_path
+):
+    # offsetting amounts: the pairs sum positive and negative loans apart
+    loans = pd.read_csv(portfolio)
+    loans.loc[::3, "amount"] *= -1
+    file_name = str(tmp_path / "loans.csv")
+    loans.to_csv(file_name, index=False)
+    models = labels["models"]
+    trajectories = calculator.get_portfolio_trajectories(
+        file_name, 0.4, 1, scenarios="all", models=models
+    )
+
+    expected = []
+    for model, scenario in calculator.get_scenario_grid(models, "all"):
+        for year in labels["years"]:
+            shocks = expected_shocks(
+                reference_shocks, loans, model, scenario, year, 0.4, 1
+            )
+            negative = np.minimum(shocks, 0).sum()
+            expected.append(
+                (model, scenario, year, negative, np.maximum(shocks, 0).sum())
+            )
+    expected = pd.DataFrame(
+        expected, columns=["model", "scenario", "year", "total_neg", "total_pos"]
+    )
+    expected["total_neg_rel"] = expected["total_neg"] / loans["amount"].sum()
+    pd.testing.assert_frame_equal(
+        trajectories, expected, check_dtype=False, rtol=1e-9
+    )
@@ -0,0 +1,97 @@
+import re
+
+import pandas as pd
+import pytest
+
+from climate_risk_calc.benchmarks import synthetic
+
+SCENARIOS = [
+    "LIMITS-Base",
+    "LIMITS-RefPol-450",
+    "LIMITS-EE-450",
+    "LIMITS-RefPol-PC",
+    "LIMITS-StrPol-2030-500",
+    "LIMITS-StrPol-500",
+]
+EXCLUDED = "|".join(["-EE", "-PC", "2030-500"])
+
+
+@pytest.fixture(scope="module")
+def catalog_data(tmp_path_factory):
+    """
+    Scenario data whose models differ in scenarios, regions and variables, including the
+    scenarios the catalog leaves out
+    """
+    labels = synthetic.get_labels(n_models=3, n_regions=4, n_sectors=3)
+    labels["scenarios"] = SCENARIOS
+    file_name = str(tmp_path_factory.mktemp("catalog") / "scenarios.csv")
+    synthetic.write_scenario_data(file_name, labels)
+    data = pd.read_csv(file_name, encoding="cp1252")
+    models, regions = labels["models"], labels["regions"]
+    data = data[
+        ~((data["MODEL"] == models[1]) & (data["SCENARIO"] == "LIMITS-StrPol-500"))
+        & ~((data["MODEL"] == models[2]) & (data["REGION"] == regions[0]))
+        & ~((data["MODEL"] == models[2]) & (data["VARIABLE"] == labels["sectors"][1]))
+    ]
+    data.to_csv(file_name, index=False, encoding="cp1252")
+    return file_name, labels
+
+
+@pytest.fixture(scope="module")
+def connection(limits_connection_factory, catalog_data):
+    return limits_connection_factory(catalog_data[0])
+
+
+@pytest.fixture(scope="module")
+def expected(catalog_data):
+    """
+    The data as IamDataFrame.data holds it, the original queries ran on this order
+    """
+    data = pd.read_csv(catalog_data[0], encoding="cp1252")
+    data.columns = [c.lower() for c in data.columns]
+    return data.sort_values(["model", "scenario", "region", "variable", "unit"])
+
+
+def original_lists(data):
+    # the list methods of the connection before the catalog, on the rows of one model
+    scenarios = data["scenario"].unique().tolist()
+    variables = sorted(data["variable"].unique().tolist())
+    return {
+        "scenarios": [s for s in scenarios if not re.search(EXCLUDED, s)],
+        "regions": data["region"].unique().tolist(),
+        "energy_variables": [v for v in variables if "Energy" in v],
+    }
+
+
+def test_models(connection, expected):
+    assert connection.get_models() == expected["model"].unique().tolist()
+
+
+@pytest.mark.parametrize("model_index", [None, 0, 1, 2])
+def test_lists_equal_the_original_queries(
+    connection, expected, catalog_data, model_index
+):
+    if model_index is None:
+        model, rows = None, expected
+    else:
+        model = catalog_data[1]["models"][model_index]
+        rows = expected[expected["model"] == model]
+    lists = original_lists(rows)
+
+    assert connection.get_scenarios(model) == lists["scenarios"]
+    assert connection.get_regions(model) == lists["regions"]
+    assert connection.get_energy_variables(model) == lists["energy_variables"]
+
+
+@pytest.mark.parametrize("model_indices", [[2, 1], [0, 2], [0, 1, 2]])
+def test_lists_of_several_models(connection, expected, catalog_data, model_indices):
+    models = [catalog_data[1]["models"][i] for i in model_indices]
+    lists = original_lists(expected[expected["model"].isin(models)])
+
+    assert connection.get_scenarios(models) == lists["scenarios"]
+    assert connection.get_regions(models) == lists["regions"]
+    assert connection.get_energy_variables(models) == lists["energy_variables"]
+
+
+def test_unknown_model(connection):
+    assert connection.get_scenarios("NO MODEL") == []
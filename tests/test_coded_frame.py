@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from climate_risk_calc.benchmarks import synthetic
+from climate_risk_calc.connections.coded_frame import CodedFrame
+from climate_risk_calc.tools import calculator
+
+INDEX = ["model", "scenario", "region", "variable", "unit", "year"]
+
+
+@pytest.fixture(scope="module")
+def selection(labels):
+    return dict(
+        model=labels["models"][0],
+        scenario="LIMITS-Base," + labels["scenarios"][3],
+        region="all",
+        variable=[labels["sectors"][2], synthetic.BASE_SECTOR],
+    )
+
+
+@pytest.fixture(scope="module")
+def frame(limits_connection, selection):
+    return limits_connection.execute_query(**selection)
+
+
+def sorted_data(data):
+    return data.sort_values(INDEX).reset_index(drop=True)
+
+
+def test_data_equals_the_raw_rows(frame, scenario_data, selection):
+    expected = scenario_data[
+        (scenario_data["model"] == selection["model"])
+        & scenario_data["scenario"].isin(selection["scenario"].split(","))
+        & scenario_data["variable"].isin(selection["variable"])
+    ]
+    pd.testing.assert_frame_equal(
+        sorted_data(frame.data),
+        sorted_data(expected[INDEX + ["value"]]),
+        check_dtype=False,
+    )
+    assert frame.labels("scenario") == sorted(selection["scenario"].split(","))
+
+
+def test_filter_take_and_sort(frame, labels):
+    data = frame.data
+    region, years = labels["regions"][1], [2010, 2050]
+    filtered = frame.filter(region=region, year=years)
+    expected = data[(data["region"] == region) & data["year"].isin(years)]
+    pd.testing.assert_frame_equal(
+        filtered.data, expected.reset_index(drop=True), check_dtype=False
+    )
+
+    shuffled = frame.take(np.random.default_rng(0).permutation(len(frame)))
+    pd.testing.assert_frame_equal(
+        shuffled.sort().data, sorted_data(data), check_dtype=False
+    )
+
+
+def test_series_and_iamdataframe(frame):
+    series = frame.to_series()
+    assert list(series.index.names) == INDEX
+    np.testing.assert_array_equal(series.to_numpy(), frame.values)
+
+    iam_dataframe = frame.sort().to_iamdataframe()
+    pd.testing.assert_frame_equal(
+        sorted_data(iam_dataframe.data), sorted_data(frame.data), check_dtype=False
+    )
+    roundtrip = CodedFrame.from_iamdataframe(iam_dataframe)
+    pd.testing.assert_frame_equal(roundtrip.data, iam_dataframe.data, check_dtype=False)
+
+
+def reference_rows(reference_shocks, selection, scenario):
+    rows = reference_shocks[
+        (reference_shocks["model"] == selection["model"])
+        & (reference_shocks["scenario"] == scenario)
+        & (reference_shocks["variable"] == selection["variable"][0])
+    ]
+    return rows.sort_values(["region", "year"]).reset_index(drop=True)
+
+
+def test_market_shares(frame, reference_shocks, selection):
+    base = frame.filter(scenario="LIMITS-Base")
+    shares = calculator.get_market_shares(base).data
+
+    expected = reference_rows(reference_shocks, selection, "LIMITS-Base")
+    assert set(shares["variable"]) == {"Market Share"}
+    assert set(shares["unit"]) == {"unknown"}
+    assert shares["region"].tolist() == expected["region"].tolist()
+    assert shares["year"].tolist() == expected["year"].tolist()
+    np.testing.assert_allclose(shares["value"], expected["share"], rtol=1e-12)
+
+
+@pytest.mark.parametrize("show_till_2050", [False, True])
+def test_market_share_shocks(frame, reference_shocks, selection, show_till_2050):
+    shocks = calculator.get_market_share_shocks(
+        frame, show_till_2050=show_till_2050
+    ).data
+
+    scenario = selection["scenario"].split(",")[1]
+    expected = reference_rows(reference_shocks, selection, scenario)
+    if show_till_2050:
+        expected = expected[expected["year"] <= 2050]
+    assert set(shocks["scenario"]) == {scenario}
+    assert set(shocks["variable"]) == {"shock"}
+    assert shocks["region"].tolist() == expected["region"].tolist()
+    assert shocks["year"].tolist() == expected["year"].tolist()
+    np.testing.assert_allclose(shocks["value"], expected["shock"] * 100, rtol=1e-9)
+
+
+def test_market_share_shocks_need_two_scenarios(frame):
+    with pytest.raises(ValueError):
+        calculator.get_market_share_shocks(frame.filter(scenario="LIMITS-Base"))
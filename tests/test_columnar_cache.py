@@ -0,0 +1,53 @@
+import numpy as np
+
+from climate_risk_calc.connections import columnar_cache
+
+
+def store(tmp_path, columns):
+    cache_dir = str(tmp_path / "cache")
+    columnar_cache.store_columns(cache_dir, None, columns)
+    return columnar_cache.load_columns(cache_dir)[0]
+
+
+def test_only_file_mappings_are_reported_as_mapped(tmp_path):
+    mapped = store(tmp_path, {"value": np.arange(10.0)})["value"]
+    copy = mapped.astype(np.float32)
+
+    # the copy of an np.memmap is an np.memmap, but held in memory
+    assert isinstance(copy, np.memmap)
+    assert columnar_cache.is_mapped(mapped)
+    assert columnar_cache.is_mapped(mapped[2:5])
+    assert not columnar_cache.is_mapped(copy)
+    assert not columnar_cache.is_mapped(np.arange(10.0))
+    assert columnar_cache.memory_usage([mapped, copy]) == {"bytes": 120, "mapped": 80}
+
+
+def test_compact_columns_copies_are_plain_arrays(tmp_path):
+    columns = store(
+        tmp_path,
+        {
+            "model.levels": np.array(["A", "B"]),
+            "model.codes": np.array([0, 1, 1], dtype=np.int32),
+            "value": np.arange(3.0),
+        },
+    )
+    compact = columnar_cache.compact_columns(columns, np.float32)
+
+    assert compact["model.codes"].dtype == np.int8
+    assert compact["value"].dtype == np.float32
+    assert type(compact["model.codes"]) is np.ndarray
+    assert type(compact["value"]) is np.ndarray
+    assert compact["model.levels"] is columns["model.levels"]
+
+
+def test_float32_values_loaded_from_the_cache_are_resident(limits_connection):
+    # the session connection has written the cache, both connections load from it
+    connection_class = type(limits_connection)
+    usage = connection_class(float32=False).memory_usage()
+    assert usage["values"]["mapped"] == usage["values"]["bytes"] > 0
+
+    usage = connection_class(float32=True).memory_usage()
+    assert usage["values"]["mapped"] == 0
+    assert usage["values"]["bytes"] > 0
+    assert usage["codes"]["mapped"] == usage["codes"]["bytes"]
+    assert usage["total"]["mapped"] < usage["total"]["bytes"]
@@ -0,0 +1,88 @@
+import shutil
+
+import pandas as pd
+import pytest
+
+from climate_risk_calc.connections import registry
+from climate_risk_calc.tools import calculator
+from climate_risk_calc.tools.evaluation_cache import EvaluationCache
+
+# (recovery rate, elasticity) of the slider positions
+SLIDERS = [(0, 1), (0.4, 1), (0.25, 2.5), (1, 1)]
+
+
+@pytest.fixture
+def cache(shared_limits):
+    return EvaluationCache()
+
+
+@pytest.mark.parametrize("recovery_rate, elasticity", SLIDERS)
+def test_rescaled_shocks_equal_the_calculation(
+    cache, labels, portfolio, recovery_rate, elasticity
+):
+    model, scenario = labels["models"][0], labels["scenarios"][2]
+    # the entry is calculated for another slider position first
+    cache.get_shocks(model, scenario, 2030, portfolio, 0.1, 0.5)
+    shocked = cache.get_shocks(
+        model, scenario, 2030, portfolio, recovery_rate, elasticity
+    )
+
+    expected = calculator.get_shocks(
+        model, scenario, 2030, portfolio, recovery_rate, elasticity
+    )
+    pd.testing.assert_frame_equal(shocked, expected, rtol=1e-12)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize("recovery_rate, elasticity", SLIDERS + [(0, -1)])
+def test_rescaled_top_shocks_equal_the_calculation(
+    cache, labels, portfolio, recovery_rate, elasticity
+):
+    arguments = dict(models=labels["models"], scenarios="all", confidence_level=0.9)
+    cache.get_top_shocks(2030, portfolio, 0.5, 1.5, **arguments)
+    top_shocks = cache.get_top_shocks(
+        2030, portfolio, recovery_rate, elasticity, **arguments
+    )
+
+    expected = calculator.get_top_shocks(
+        2030, portfolio, recovery_rate, elasticity, **arguments
+    )
+    # the cache rounds the rescaled statistics, the calculation rounds them once
+    pd.testing.assert_frame_equal(top_shocks, expected, rtol=0, atol=0.0100001)
+
+
+def test_changed_portfolio_is_calculated_again(cache, labels, portfolio, tmp_path):
+    model, scenario = labels["models"][1], labels["scenarios"][1]
+    file_name = str(tmp_path / "loans.csv")
+    shutil.copy(portfolio, file_name)
+    cache.get_shocks(model, scenario, 2030, file_name)
+
+    loans = pd.read_csv(file_name)
+    loans.loc[0, "amount"] *= 2
+    loans.to_csv(file_name, index=False)
+    shocked = cache.get_shocks(model, scenario, 2030, file_name)
+
+    assert cache.misses == 2
+    pd.testing.assert_frame_equal(
+        shocked, calculator.get_shocks(model, scenario, 2030, file_name)
+    )
+
+
+def test_new_data_invalidates_the_entries(cache, shared_limits, labels, portfolio):
+    model, scenario = labels["models"][1], labels["scenarios"][1]
+    cache.get_shocks(model, scenario, 2030, portfolio)
+    registry.use_limits_connection(shared_limits)
+    cache.get_shocks(model, scenario, 2030, portfolio)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_entries_are_evicted_by_size(cache, labels, portfolio):
+    model = labels["models"][0]
+    cache.get_shocks(model, labels["scenarios"][1], 2030, portfolio)
+    cache.max_bytes = int(cache.size() * 1.5)
+    cache.get_shocks(model, labels["scenarios"][2], 2030, portfolio)
+    assert cache.size() <= cache.max_bytes
+
+    cache.get_shocks(model, labels["scenarios"][2], 2030, portfolio)
+    cache.get_shocks(model, labels["scenarios"][1], 2030, portfolio)
+    assert (cache.hits, cache.misses) == (1, 3)
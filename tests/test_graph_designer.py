@@ -0,0 +1,67 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pytest
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+from climate_risk_calc.tools import graph_designer
+
+SERIES = ["model", "scenario", "region", "variable", "unit"]
+
+
+@pytest.fixture(scope="module")
+def frame(limits_connection, labels):
+    frame = limits_connection.execute_query(
+        labels["models"][0], "all", "all", labels["sectors"][:2]
+    )
+    # a series with gaps and a series without any value in 2005
+    data = frame.data
+    gaps = (data["region"] == labels["regions"][0]) & data["year"].isin([2020, 2030])
+    first = (data["region"] == labels["regions"][1]) & (data["year"] == 2005)
+    return frame.take(~(gaps | first).to_numpy())
+
+
+@pytest.fixture(scope="module")
+def expected(frame):
+    return frame.data.pivot_table(index=SERIES, columns="year", values="value")
+
+
+def test_series_equal_the_pivot_table(frame, expected):
+    x, values, labels = graph_designer._series(frame)
+
+    np.testing.assert_array_equal(x, expected.columns.to_numpy(dtype=float))
+    np.testing.assert_array_equal(values, expected.to_numpy())
+    # only scenario, region and variable differ between the series
+    assert labels == [", ".join(key[1:4]) for key in expected.index]
+
+
+def test_series_graph_draws_every_series(frame, expected):
+    axis = Figure().add_subplot()
+    graph_designer.series_graph(frame, axis, "title", max_legend=5)
+
+    (collection,) = [c for c in axis.collections if isinstance(c, LineCollection)]
+    segments = collection.get_segments()
+    assert len(segments) == len(expected)
+    for segment, (_, row) in zip(segments, expected.iterrows()):
+        row = row.dropna()
+        np.testing.assert_array_equal(segment[:, 0], row.index.to_numpy(dtype=float))
+        np.testing.assert_array_equal(segment[:, 1], row.to_numpy())
+    legend = [t.get_text() for t in axis.get_legend().get_texts()]
+    assert legend[-1] == "... and " + str(len(expected) - 5) + " more"
+    assert len(legend) == 6
+    assert axis.get_xlabel() == "Year"
+    assert axis.get_ylabel() == "EJ/yr"
+
+
+@pytest.mark.parametrize("max_points", [2, 5, 14, 15, None])
+def test_decimate_keeps_first_and_last_time_step(frame, expected, max_points):
+    x, values, _ = graph_designer._series(frame)
+    kept_x, kept_values = graph_designer._decimate(x, values, max_points)
+
+    assert len(kept_x) == min(max_points or len(x), len(x))
+    assert kept_x[0] == x[0] and kept_x[-1] == x[-1]
+    columns = np.searchsorted(x, kept_x)
+    np.testing.assert_array_equal(kept_values, values[:, columns])
@@ -0,0 +1,110 @@
+"""
+The IIASA data path served by a LocalAPI over synthetic data, no network is used
+"""
+import pytest
+
+from climate_risk_calc.benchmarks import synthetic
+from climate_risk_calc.connections.iiasa_connection import IIASAConnection
+from climate_risk_calc.connections.iiasa_mirror import IIASAMirror
+from climate_risk_calc.connections.local_api import LocalAPI
+
+DATABASE = "local"
+
+
+@pytest.fixture
+def api(scenario_file):
+    return LocalAPI(scenario_file, database=DATABASE)
+
+
+@pytest.fixture
+def cache_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(IIASAConnection, "cache_root", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+@pytest.fixture
+def mirror(tmp_path, monkeypatch):
+    monkeypatch.setattr(IIASAMirror, "mirror_root", str(tmp_path / "mirror"))
+    return IIASAMirror(DATABASE)
+
+
+def query(connection, labels, scenario=None):
+    return connection.execute_query(
+        model=labels["models"][0],
+        scenario=scenario or labels["scenarios"][0],
+        region=labels["regions"][0],
+        variable=synthetic.BASE_SECTOR,
+    )
+
+
+def test_queries_are_served_from_the_cache(api, cache_root, labels):
+    connection = IIASAConnection(database=DATABASE, api=api, use_mirror=False)
+    first = query(connection, labels)
+    second = query(connection, labels)
+
+    assert api.query_count == 1
+    assert len(first) == len(labels["years"])
+    assert first.data.equals(second.data)
+
+
+def test_offline_serves_cached_queries(api, cache_root, labels):
+    query(IIASAConnection(database=DATABASE, api=api, use_mirror=False), labels)
+    offline = IIASAConnection(database=DATABASE, offline=True, use_mirror=False)
+
+    assert len(query(offline, labels)) == len(labels["years"])
+
+
+def test_offline_misses_raise_connection_error(cache_root, labels):
+    offline = IIASAConnection(database=DATABASE, offline=True, use_mirror=False)
+
+    with pytest.raises(ConnectionError):
+        query(offline, labels)
+    with pytest.raises(ConnectionError):
+        offline.get_models()
+
+
+def test_offline_needs_the_cache(cache_root):
+    with pytest.raises(ValueError):
+        IIASAConnection(database=DATABASE, offline=True, use_cache=False)
+
+
+def sync(mirror, api, labels):
+    return mirror.sync(
+        api,
+        models=labels["models"],
+        variables=[synthetic.BASE_SECTOR] + labels["sectors"],
+        regions=labels["regions"],
+    )
+
+
+def test_mirror_sync_only_fetches_changed_runs(api, mirror, labels):
+    n_runs = len(labels["models"]) * len(labels["scenarios"])
+    assert sync(mirror, api, labels) == {"fetched": n_runs, "kept": 0, "removed": 0}
+    queries = api.query_count
+
+    assert sync(mirror, api, labels) == {"fetched": 0, "kept": n_runs, "removed": 0}
+    assert api.query_count == queries
+
+    changed = (labels["models"][0], labels["scenarios"][1])
+    api.versions[changed] = 2
+    assert sync(mirror, api, labels) == {
+        "fetched": 1,
+        "kept": n_runs - 1,
+        "removed": 0,
+    }
+    # one query for the model of the changed run
+    assert api.query_count == queries + 1
+    data = mirror.load()
+    assert data.select(model=[changed[0]], scenario=[changed[1]]) is not None
+    assert len(data.columns["value"]) == len(api.data)
+
+
+def test_connection_serves_selections_from_the_mirror(api, mirror, cache_root, labels):
+    sync(mirror, api, labels)
+    queries = api.query_count
+    connection = IIASAConnection(database=DATABASE, api=api)
+
+    result = query(connection, labels, scenario=labels["scenarios"][2])
+    assert api.query_count == queries
+    assert len(result) == len(labels["years"])
+    assert connection.get_models() == labels["models"]
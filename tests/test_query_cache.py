@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from climate_risk_calc.connections import query_cache
+from climate_risk_calc.connections.query_cache import QueryCache
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(query_cache.time, "time", clock)
+    return clock
+
+
+def columns(size):
+    return {"value": np.random.default_rng(size).random(size)}
+
+
+def test_make_key_normalizes_parameters():
+    key, params = query_cache.make_key("db", model="GCAM", region=["B", "A", "A"])
+    assert params == {"database": "db", "model": ["GCAM"], "region": ["A", "B"]}
+    assert key == query_cache.make_key("db", region=["A", "B"], model=["GCAM"])[0]
+    assert key != query_cache.make_key("other", model="GCAM", region=["A", "B"])[0]
+    assert key != query_cache.make_key("db", model="GCAM", region=["A"])[0]
+
+
+def test_get_returns_stored_columns(tmp_path, clock):
+    cache = QueryCache(str(tmp_path))
+    key, params = query_cache.make_key("db", model="GCAM")
+    cache.put(key, params, columns(10), {"time_col": "year"})
+
+    stored, attributes = QueryCache(str(tmp_path)).get(key)
+    np.testing.assert_array_equal(stored["value"], columns(10)["value"])
+    assert attributes == {"time_col": "year"}
+    assert cache.get(query_cache.make_key("db", model="WITCH")[0]) is None
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = QueryCache(str(tmp_path), ttl=60)
+    key, params = query_cache.make_key("db", model="GCAM")
+    cache.put(key, params, columns(10))
+
+    clock.now += 60
+    assert cache.get(key) is not None
+    clock.now += 1
+    assert cache.get(key) is None
+    # offline the expired entry is still served
+    assert cache.get(key, allow_expired=True) is not None
+
+
+def test_least_recently_used_entries_are_evicted_by_size(tmp_path, clock):
+    cache = QueryCache(str(tmp_path))
+    keys = [query_cache.make_key("db", model=m) for m in ["A", "B", "C"]]
+    cache.put(*keys[0], columns(1000))
+    size = cache.size()
+    cache.max_bytes = int(size * 2.5)
+    clock.now += 1
+    cache.put(*keys[1], columns(1000))
+    clock.now += 1
+    # A becomes the most recently used entry
+    assert cache.get(keys[0][0]) is not None
+    clock.now += 1
+    cache.put(*keys[2], columns(1000))
+
+    assert cache.get(keys[0][0]) is not None
+    assert cache.get(keys[1][0]) is None
+    assert cache.get(keys[2][0]) is not None
+    assert cache.size() <= cache.max_bytes
+    assert not (tmp_path / (keys[1][0] + ".npz")).exists()
+
+
+def test_clear_removes_all_entries(tmp_path, clock):
+    cache = QueryCache(str(tmp_path))
+    key, params = query_cache.make_key("db", model="GCAM")
+    cache.put(key, params, columns(10))
+    cache.clear()
+    assert cache.size() == 0
+    assert cache.get(key) is None
@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from climate_risk_calc.tools.risk_statistics import (
+    ShockStatistics,
+    value_at_risk_position,
+)
+
+SHOCKS = np.array([-5.0, 3.0, -1.0, 0.5, -8.0, 2.0, -0.5, 1.0, -3.0, 4.0])
+
+
+def statistics(shocks, confidence_levels, chunk=None):
+    result = ShockStatistics(len(shocks), 100.0, confidence_levels)
+    chunk = chunk or max(len(shocks), 1)
+    for start in range(0, len(shocks), chunk):
+        result.update(shocks[start : start + chunk])
+    return result.result()
+
+
+def value_at_risk(shocks, confidence_level):
+    """
+    Value at Risk as the entry ceil(n * confidence_level) of the descending order
+    """
+    descending = sorted(shocks, reverse=True)
+    return descending[min(int(np.ceil(len(shocks) * confidence_level)), len(shocks) - 1)]
+
+
+def test_position_at_confidence_level_zero_is_the_largest_shock():
+    assert value_at_risk_position(10, 0) == 9
+    result = statistics(SHOCKS, [0])
+    assert result["project_VaR"] == [SHOCKS.max()]
+    assert result["expected_shortfall"] == [pytest.approx(SHOCKS.mean())]
+
+
+def test_position_at_confidence_level_one_is_the_smallest_shock():
+    assert value_at_risk_position(10, 1.0) == 0
+    result = statistics(SHOCKS, [1.0])
+    assert result["project_VaR"] == [SHOCKS.min()]
+    assert result["expected_shortfall"] == [SHOCKS.min()]
+
+
+@pytest.mark.parametrize("confidence_level", [0, 0.5, 0.95, 1.0])
+def test_single_entry(confidence_level):
+    assert value_at_risk_position(1, confidence_level) == 0
+    result = statistics(np.array([-2.5]), [confidence_level])
+    assert result["project_VaR"] == [-2.5]
+    assert result["expected_shortfall"] == [-2.5]
+
+
+def test_non_integer_tail_rounds_towards_the_larger_loss():
+    # (1 - 0.75) * 10 = 2.5 entries in the tail: the VaR is the 2nd smallest shock
+    assert value_at_risk_position(10, 0.75) == 1
+    result = statistics(SHOCKS, [0.75])
+    assert result["project_VaR"] == [-5.0]
+    assert result["expected_shortfall"] == [pytest.approx(-6.5)]
+
+
+@pytest.mark.parametrize("confidence_level", [0, 0.3, 0.75, 0.9, 0.95, 0.99, 1.0])
+@pytest.mark.parametrize("n_entries", [1, 2, 7, 10, 101])
+def test_value_at_risk_matches_the_sorted_definition(n_entries, confidence_level):
+    shocks = np.random.default_rng(n_entries).normal(size=n_entries)
+    result = statistics(shocks, [confidence_level], chunk=3)
+    var = value_at_risk(shocks, confidence_level)
+    assert result["project_VaR"] == [var]
+    assert result["expected_shortfall"] == [pytest.approx(shocks[shocks <= var].mean())]
+
+
+def test_chunks_give_the_same_result():
+    levels = [0.5, 0.75, 0.95]
+    assert statistics(SHOCKS, levels, chunk=3) == statistics(SHOCKS, levels)
+
+
+def test_totals():
+    result = statistics(SHOCKS, [0.95])
+    assert result["total_neg"] == -17.5
+    assert result["total_pos"] == 10.5
+    assert result["total_neg_rel"] == -0.175
+
+
+def test_empty_portfolio():
+    result = statistics(np.empty(0), [0.95])
+    assert np.isnan(result["project_VaR"][0])
+    assert np.isnan(result["expected_shortfall"][0])
+
+
+def test_missing_shocks_are_an_error():
+    result = ShockStatistics(len(SHOCKS), 100.0)
+    result.update(SHOCKS[:5])
+    with pytest.raises(ValueError):
+        result.result()
+
+
+@pytest.mark.parametrize("confidence_level", [-0.1, 1.5])
+def test_invalid_confidence_level(confidence_level):
+    with pytest.raises(ValueError):
+        value_at_risk_position(10, confidence_level)
+
+
+@pytest.mark.parametrize("confidence_level", [0.01, 0.05, 0.5, 0.95, 0.99])
+def test_only_the_shorter_tail_is_kept(confidence_level):
+    n_entries = 10000
+    shocks = np.random.default_rng(1).normal(size=n_entries)
+    result = ShockStatistics(n_entries, 1.0, [confidence_level])
+    for start in range(0, n_entries, 1000):
+        result.update(shocks[start : start + 1000])
+
+    kept = len(result.low) + len(result.high)
+    assert kept <= min(confidence_level, 1 - confidence_level) * n_entries + 1
+    var = value_at_risk(shocks, confidence_level)
+    assert result.result()["project_VaR"] == [var]
+    assert result.result()["expected_shortfall"] == [
+        pytest.approx(shocks[shocks <= var].mean())
+    ]
+
+
+def test_levels_on_both_sides():
+    levels = [0.1, 0.5, 0.95]
+    chunked = statistics(SHOCKS, levels, chunk=3)
+    assert chunked["project_VaR"] == [value_at_risk(SHOCKS, c) for c in levels]
+    assert chunked["expected_shortfall"] == pytest.approx(
+        [SHOCKS[SHOCKS <= value_at_risk(SHOCKS, c)].mean() for c in levels]
+    )
+
+
+def test_zero_total_amount():
+    result = ShockStatistics(len(SHOCKS), 0.0)
+    result.update(SHOCKS)
+    assert result.result()["total_neg_rel"] == 0.0
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from climate_risk_calc.connections.row_index import RowIndex
+
+LABELS = {"model": ["A", "B", "C"], "region": ["R1", "R2", "R3", "R4"]}
+
+
+@pytest.fixture(scope="module")
+def table():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "model": rng.integers(len(LABELS["model"]), size=1000),
+            # R4 has no rows
+            "region": rng.integers(len(LABELS["region"]) - 1, size=1000),
+        }
+    )
+
+
+@pytest.fixture(scope="module")
+def row_index(table):
+    return RowIndex(LABELS, {d: table[d].to_numpy() for d in LABELS})
+
+
+def expected_rows(table, **selection):
+    mask = np.ones(len(table), dtype=bool)
+    for dimension, labels in selection.items():
+        codes = [LABELS[dimension].index(l) for l in labels if l in LABELS[dimension]]
+        mask &= table[dimension].isin(codes).to_numpy()
+    return np.flatnonzero(mask)
+
+
+@pytest.mark.parametrize(
+    "selection",
+    [
+        {},
+        {"model": ["B"]},
+        {"model": ["C", "A"], "region": ["R2"]},
+        {"model": ["A"], "region": ["R4"]},
+        {"model": ["A", "unknown"], "region": ["R1", "R3"]},
+        {"region": []},
+    ],
+)
+def test_select_equals_the_boolean_mask(table, row_index, selection):
+    rows = row_index.select(**selection)
+    np.testing.assert_array_equal(rows, expected_rows(table, **selection))
+
+
+def test_rows_and_counts(table, row_index):
+    codes = np.array([0, 2])
+    rows = row_index.rows("region", codes)
+    np.testing.assert_array_equal(
+        np.sort(rows), np.flatnonzero(table["region"].isin(codes))
+    )
+    assert row_index.count("region", codes) == len(rows)
+    assert row_index.count("region", np.array([3])) == 0
+
+
+def test_precomputed_positions_are_used(table, row_index):
+    attached = RowIndex(
+        LABELS,
+        {d: table[d].to_numpy() for d in LABELS},
+        positions=row_index.positions,
+        offsets=row_index.offsets,
+    )
+    np.testing.assert_array_equal(
+        attached.select(model=["B"], region=["R1", "R2"]),
+        expected_rows(table, model=["B"], region=["R1", "R2"]),
+    )
+
+
+def test_execute_query_equals_the_pandas_filter(
+    limits_connection, scenario_data, labels
+):
+    selection = dict(
+        model=labels["models"][1],
+        scenario=",".join(labels["scenarios"][1:3]),
+        region=labels["regions"][:2],
+        variable=[labels["sectors"][0], "Secondary Energy|Electricity"],
+    )
+    result = limits_connection.execute_query(**selection).data
+
+    expected = scenario_data[
+        (scenario_data["model"] == selection["model"])
+        & scenario_data["scenario"].isin(labels["scenarios"][1:3])
+        & scenario_data["region"].isin(selection["region"])
+        & scenario_data["variable"].isin(selection["variable"])
+    ]
+    columns = ["model", "scenario", "region", "variable", "unit", "year"]
+    expected = expected.sort_values(columns).reset_index(drop=True)
+    result = result.sort_values(columns).reset_index(drop=True)
+    pd.testing.assert_frame_equal(
+        result[columns + ["value"]], expected[columns + ["value"]], check_dtype=False
+    )
+
+
+def test_execute_query_without_match(limits_connection, labels):
+    result = limits_connection.execute_query(
+        labels["models"][0], labels["scenarios"][0], "NOWHERE", labels["sectors"][0]
+    )
+    assert result is None
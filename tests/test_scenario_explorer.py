@@ -0,0 +1,57 @@
+"""
+The calculations submitted by the ScenarioExplorer run on the worker thread without any
+widget, so they are called here directly with a stand-in for the explorer
+"""
+from types import SimpleNamespace
+
+from climate_risk_calc.tools import calculator
+from climate_risk_calc.views.v_scenario_explorer import ScenarioExplorer
+
+
+def submitted_calculation(explorer_method, *args, **kwargs):
+    submitted = []
+    explorer = SimpleNamespace(
+        full_file_name=kwargs.pop("file_name"),
+        task_runner=SimpleNamespace(
+            submit=lambda func, on_done, **options: submitted.append(func)
+        ),
+        show_table=None,
+        show_error=None,
+        get_selection=None,
+    )
+    explorer_method(explorer, *args, **kwargs)
+    (calculate,) = submitted
+    return calculate
+
+
+def test_evaluate_loans_single_scenario(shared_limits, labels, portfolio):
+    model, scenario = labels["models"][0], labels["scenarios"][1]
+    calculate = submitted_calculation(
+        ScenarioExplorer.evaluate_loans,
+        0.4,
+        1,
+        2030,
+        model=model,
+        ref_scenario=scenario,
+        file_name=portfolio,
+    )
+    table = calculate(SimpleNamespace(progress=lambda message: None))
+
+    expected = calculator.get_shocks(model, scenario, 2030, portfolio, 0.4, 1)
+    expected = expected.sort_values(["shock"], ascending=False, kind="stable")
+    assert len(table) == len(expected)
+    assert table.column_names == ["region", "sector", "amount", "shock"]
+    first = table.page(0)[0]
+    assert first[3] == str(round(expected["shock"].iloc[0], 2))
+
+
+def test_evaluate_loans_top_shocks(shared_limits, portfolio):
+    calculate = submitted_calculation(
+        ScenarioExplorer.evaluate_loans, 0.4, 1, 2030, top=True, file_name=portfolio
+    )
+    table = calculate(SimpleNamespace(progress=lambda message: None))
+
+    assert len(table) == len(calculator.TOP_SHOCK_MODELS) * len(
+        calculator.TOP_SHOCK_SCENARIOS
+    )
+    assert table.column_names[:2] == ["model", "scenario"]
@@ -0,0 +1,91 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from climate_risk_calc.connections import registry, shared_data
+from climate_risk_calc.connections.shared_data import SharedData
+from climate_risk_calc.tools import calculator
+
+
+@pytest.fixture
+def shared(tmp_path, limits_connection, shock_cube):
+    with SharedData(limits_connection, shock_cube, root=str(tmp_path)) as shared:
+        yield shared
+
+
+def test_attached_data_equals_the_published_data(
+    shared, limits_connection, shock_cube
+):
+    connection, cube = shared_data.attach(shared.path)
+
+    own, attached = limits_connection.get_coded_data(), connection.get_coded_data()
+    assert attached[0] == own[0]
+    for dimension in own[1]:
+        np.testing.assert_array_equal(attached[1][dimension], own[1][dimension])
+    np.testing.assert_array_equal(attached[2], own[2])
+    np.testing.assert_array_equal(cube.shocks, shock_cube.shocks)
+    np.testing.assert_array_equal(cube.shares, shock_cube.shares)
+    assert connection.get_models() == limits_connection.get_models()
+    # nothing is copied into the attaching process
+    usage = connection.memory_usage()["total"]
+    assert usage["mapped"] == usage["bytes"]
+
+
+def test_shocks_on_attached_data(shared, shared_limits, labels, portfolio):
+    model, scenario = labels["models"][1], labels["scenarios"][3]
+    expected = calculator.get_shocks(model, scenario, 2030, portfolio, 0.4, 1)
+
+    registry.use_limits_connection(*shared_data.attach(shared.path))
+    shocked = calculator.get_shocks(model, scenario, 2030, portfolio, 0.4, 1)
+    pd.testing.assert_frame_equal(shocked, expected)
+
+
+def test_close_removes_the_data(tmp_path, limits_connection):
+    shared = SharedData(limits_connection, root=str(tmp_path))
+    path = shared.path
+    assert os.listdir(path)
+    shared.close()
+    assert not os.path.exists(path)
+    assert shared.path is None
+    with pytest.raises(ValueError):
+        shared_data.attach(path)
+    # closing twice is fine, e.g. close() and the exit hook
+    shared.close()
+
+
+def test_stale_data_of_dead_owners_is_removed(tmp_path, limits_connection):
+    dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                          capture_output=True, text=True, check=True)
+    stale = tmp_path / (shared_data.PREFIX + dead.stdout.strip() + "_x")
+    stale.mkdir()
+    unrelated = tmp_path / "other_1_x"
+    unrelated.mkdir()
+
+    with SharedData(limits_connection, root=str(tmp_path)) as shared:
+        assert not stale.exists()
+        assert unrelated.exists()
+        assert shared_data.remove_stale(str(tmp_path)) == 0
+        assert os.path.exists(shared.path)
+    assert os.listdir(tmp_path) == ["other_1_x"]
+
+
+def test_workers_use_the_shared_data(shared, shared_limits, labels, portfolio):
+    model, scenario = labels["models"][0], labels["scenarios"][2]
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=shared_data.initialize_worker,
+        initargs=(shared.path,),
+    ) as executor:
+        shocked = executor.submit(
+            calculator.get_shocks, model, scenario, 2030, portfolio, 0.4, 1
+        ).result()
+
+    expected = calculator.get_shocks(model, scenario, 2030, portfolio, 0.4, 1)
+    pd.testing.assert_frame_equal(shocked, expected)
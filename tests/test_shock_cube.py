@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from climate_risk_calc.benchmarks import synthetic
+
+
+@pytest.fixture(scope="module")
+def reference(reference_shocks):
+    keys = ["model", "scenario", "region", "variable", "year"]
+    return reference_shocks.set_index(keys)
+
+
+def test_every_share_and_shock_matches(shock_cube, reference):
+    for key, row in reference.iloc[::7].iterrows():
+        assert shock_cube.market_share(*key) == pytest.approx(row["share"], rel=1e-12)
+        assert shock_cube.shock(*key) == pytest.approx(
+            row["shock"], rel=1e-9, abs=1e-12
+        )
+
+
+def test_lookup_shocks(shock_cube, reference_shocks, labels):
+    model, scenario, year = labels["models"][1], labels["scenarios"][4], 2040
+    expected = reference_shocks[
+        (reference_shocks["model"] == model)
+        & (reference_shocks["scenario"] == scenario)
+        & (reference_shocks["year"] == year)
+    ]
+    shocks = shock_cube.lookup_shocks(
+        model, scenario, expected["region"], expected["variable"], year
+    )
+    np.testing.assert_allclose(shocks, expected["shock"], rtol=1e-9)
+
+
+def test_market_shares(shock_cube, reference_shocks, labels):
+    model, variable = labels["models"][0], labels["sectors"][1]
+    scenarios, regions = labels["scenarios"][:3], labels["regions"][1:]
+    frame = shock_cube.market_shares(model, scenarios, regions, variable).data
+
+    expected = reference_shocks[
+        (reference_shocks["model"] == model)
+        & reference_shocks["scenario"].isin(scenarios)
+        & reference_shocks["region"].isin(regions)
+        & (reference_shocks["variable"] == variable)
+    ].sort_values(["scenario", "region", "year"])
+    assert frame["scenario"].tolist() == expected["scenario"].tolist()
+    assert frame["region"].tolist() == expected["region"].tolist()
+    assert frame["year"].tolist() == expected["year"].tolist()
+    assert set(frame["variable"]) == {"Market Share"}
+    np.testing.assert_allclose(frame["value"], expected["share"], rtol=1e-12)
+
+
+@pytest.mark.parametrize("as_percent", [True, False])
+def test_market_share_shocks(shock_cube, reference_shocks, labels, as_percent):
+    model, scenario = labels["models"][1], labels["scenarios"][2]
+    region, variable = labels["regions"][2], labels["sectors"][0]
+    frame = shock_cube.market_share_shocks(
+        model, scenario, region, variable, as_percent=as_percent
+    ).data
+
+    expected = reference_shocks[
+        (reference_shocks["model"] == model)
+        & (reference_shocks["scenario"] == scenario)
+        & (reference_shocks["region"] == region)
+        & (reference_shocks["variable"] == variable)
+    ].sort_values("year")
+    assert frame["year"].tolist() == expected["year"].tolist()
+    assert set(frame["variable"]) == {"shock"}
+    scale = 100 if as_percent else 1
+    np.testing.assert_allclose(frame["value"], expected["shock"] * scale, rtol=1e-9)
+
+
+def test_unknown_labels_are_an_error(shock_cube, labels):
+    scenario, region = labels["scenarios"][1], labels["regions"][0]
+    with pytest.raises(ValueError):
+        shock_cube.shock("NO MODEL", scenario, region, labels["sectors"][0], 2030)
+    # the base sector has no base sector of its own in the data
+    with pytest.raises(ValueError):
+        shock_cube.market_share(
+            labels["models"][0], scenario, region, synthetic.BASE_SECTOR, 2030
+        )
+
+
+def test_lookup_shock_trajectories(shock_cube, reference, labels):
+    model, scenario = labels["models"][0], labels["scenarios"][3]
+    regions = [labels["regions"][0], labels["regions"][2], labels["regions"][0]]
+    variables = [labels["sectors"][1], labels["sectors"][1], labels["sectors"][2]]
+    years = [2100, 2010, 2030]
+    shocks = shock_cube.lookup_shock_trajectories(
+        model, scenario, regions, variables, years
+    )
+
+    expected = [
+        [reference.loc[(model, scenario, r, v, y), "shock"] for y in years]
+        for r, v in zip(regions, variables)
+    ]
+    np.testing.assert_allclose(shocks, expected, rtol=1e-9)
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from climate_risk_calc.tools.table_model import TableModel
+
+
+@pytest.fixture(scope="module")
+def loans(portfolio):
+    loans = pd.read_csv(portfolio)
+    loans["shock"] = np.random.default_rng(0).normal(scale=1000, size=len(loans))
+    return loans
+
+
+def formatted(df):
+    # as the table showed them before: shock rounded to 2 decimals, str() of the rest
+    df = df.round({"shock": 2})
+    return [tuple(str(v) for v in row) for row in df.itertuples(index=False)]
+
+
+def pages(model, page_size):
+    return [
+        row for n in range(model.n_pages(page_size)) for row in model.page(n, page_size)
+    ]
+
+
+@pytest.mark.parametrize("page_size", [7, 100, 1000])
+def test_pages_equal_the_sorted_dataframe(loans, page_size):
+    model = TableModel.from_dataframe(loans, decimals={"shock": 2})
+    model.sort([("shock", False)])
+
+    expected = loans.sort_values("shock", ascending=False, kind="stable")
+    assert model.n_pages(page_size) == -(-len(loans) // page_size)
+    second = expected.iloc[page_size : 2 * page_size]
+    assert model.page(1, page_size) == formatted(second)
+    assert pages(model, page_size) == formatted(expected)
+
+
+def test_sort_by_several_keys(loans):
+    model = TableModel.from_dataframe(loans, decimals={"shock": 2})
+    model.sort([("region", True), ("sector", False), ("amount", True)])
+
+    expected = loans.sort_values(
+        ["region", "sector", "amount"], ascending=[True, False, True], kind="stable"
+    )
+    assert pages(model, 100) == formatted(expected)
+
+
+def test_filters(loans, labels):
+    model = TableModel.from_dataframe(loans, decimals={"shock": 2})
+    model.sort([("amount", False)])
+    model.set_filter("shock", "<= -500")
+    technology = labels["sectors"][1].rsplit("|", 1)[1]
+    model.set_filter("sector", technology.upper())
+
+    selected = loans["sector"].str.lower().str.contains(technology.lower())
+    expected = loans[(loans["shock"] <= -500) & selected]
+    expected = expected.sort_values("amount", ascending=False, kind="stable")
+    assert 0 < len(model) == len(expected)
+    assert pages(model, 10) == formatted(expected)
+
+    model.set_filter("shock", "")
+    model.clear_filters()
+    assert len(model) == len(loans)
+    with pytest.raises(ValueError):
+        model.set_filter("amount", "large")
+
+
+def test_empty_table():
+    model = TableModel.from_dataframe(pd.DataFrame({"region": [], "amount": []}))
+    assert len(model) == 0
+    assert model.n_pages() == 1
+    assert model.page(0) == []
+
+
+def test_coded_frame_rows(limits_connection, labels):
+    frame = limits_connection.execute_query(
+        labels["models"][0], "all", labels["regions"][0], labels["sectors"][0]
+    )
+    model = TableModel.from_coded_frame(frame)
+
+    assert model.column_names == frame.index + ["value"]
+    rows = frame.data.itertuples(index=False)
+    expected = [tuple(str(v) for v in row) for row in rows]
+    assert model.rows(0, len(model)) == expected
@@ -0,0 +1,103 @@
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from climate_risk_calc.tools import calculator, timing
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    monkeypatch.setattr(timing, "_spans", deque(maxlen=5))
+    monkeypatch.setattr(timing, "_span_total", 0)
+    timing.enable_spans()
+    yield
+    timing.enable_spans(False)
+
+
+def record(*names):
+    for name in names:
+        with timing.span(name):
+            pass
+
+
+def test_spans_are_bounded(spans):
+    record(*["stage"] * 12)
+
+    assert timing.span_count() == 12
+    assert len(timing._spans) == 5
+    assert timing.span_statistics()["stage"]["count"] == 5
+
+
+def test_since_counts_all_recorded_spans(spans):
+    record("a", "a", "a")
+    first = timing.span_count()
+    record("b", "b")
+    assert list(timing.span_statistics(since=first)) == ["b"]
+
+    # the spans before first are dropped, the ones after it are kept
+    record("c", "c", "c")
+    assert timing.span_statistics(since=first)["b"]["count"] == 2
+    assert timing.span_statistics(since=first)["c"]["count"] == 3
+
+    # spans after first were dropped as well
+    record("d", "d")
+    assert "b" not in timing.span_statistics(since=first)
+    assert timing.span_statistics(since=timing.span_count()) == {}
+
+
+def test_clear_spans_keeps_the_count(spans):
+    record("a", "a")
+    timing.clear_spans()
+    assert timing.span_count() == 2
+    assert timing.span_statistics() == {}
+    record("b")
+    assert timing.span_statistics(since=2)["b"]["count"] == 1
+
+
+def test_write_spans_reports_dropped_spans(spans, tmp_path):
+    record(*["stage"] * 7)
+    file_name = str(tmp_path / "spans.json")
+    timing.write_spans(file_name)
+
+    with open(file_name, encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["dropped"] == 2
+    assert len(report["spans"]) == 5
+
+
+def test_disabled_spans_are_not_recorded(spans):
+    timing.enable_spans(False)
+    record("a")
+    assert timing.span_count() == 0
+
+
+def test_propagated_spans_are_nested_under_the_submitting_span(spans, tmp_path):
+    def work(i):
+        with timing.span("work"):
+            return i
+
+    with timing.span("outer"):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            assert list(executor.map(timing.propagated(work), range(3))) == [0, 1, 2]
+        # without propagation the worker spans are roots
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(work, 0).result()
+
+    file_name = str(tmp_path / "stacks.txt")
+    timing.write_folded_stacks(file_name)
+    with open(file_name, encoding="utf-8") as f:
+        paths = {line.rsplit(" ", 1)[0] for line in f}
+    assert paths == {"outer", "outer;work", "work"}
+
+
+def test_top_shock_cells_are_nested_in_the_flame_graph(
+    spans, monkeypatch, shared_limits, portfolio
+):
+    monkeypatch.setattr(timing, "_spans", deque(maxlen=10000))
+    calculator.get_top_shock_statistics(2030, portfolio, max_workers=2)
+
+    paths = [path for name, path, *_ in timing._spans if name == "get_shock_table"]
+    assert paths
+    assert all(path.startswith("get_top_shock_statistics;") for path in paths)